@@ -11,15 +11,31 @@ from pathlib import Path
 from typing import Any
 
 try:
-    from customer_doc_triage.triage.engine import infer_priority
-    from customer_doc_triage.triage.policies import find_required_missing_fields, should_escalate
+    from customer_doc_triage.ingest.compression import (
+        COMPRESSIONS,
+        open_compressed,
+        with_compression,
+    )
+    from customer_doc_triage.triage.policies import (
+        find_required_missing_fields,
+        infer_priority,
+        should_escalate,
+    )
 except ModuleNotFoundError:
     repo_root = Path(__file__).resolve().parents[5]
     core_src = repo_root / "use_cases" / "customer_doc_triage" / "src"
     if str(core_src) not in sys.path:
         sys.path.insert(0, str(core_src))
-    from customer_doc_triage.triage.engine import infer_priority
-    from customer_doc_triage.triage.policies import find_required_missing_fields, should_escalate
+    from customer_doc_triage.ingest.compression import (
+        COMPRESSIONS,
+        open_compressed,
+        with_compression,
+    )
+    from customer_doc_triage.triage.policies import (
+        find_required_missing_fields,
+        infer_priority,
+        should_escalate,
+    )
 
 DOC_TYPES = [
     "incident_report",
@@ -71,6 +87,12 @@ def parse_args() -> argparse.Namespace:
         default=0.30,
         help="Fraction of cases to inject with edge-case behavior.",
     )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default=None,
+        help="Write samples/gold compressed (e.g. samples.jsonl.gz) for archived corpora.",
+    )
     return parser.parse_args()
 
 
@@ -268,7 +290,7 @@ def generate_case(index: int, randomizer: random.Random, edge_rate: float) -> Ge
 
 
 def write_jsonl(path: Path, rows: list[dict[str, Any]]) -> None:
-    with path.open("w", encoding="utf-8") as handle:
+    with open_compressed(path, "w", encoding="utf-8") as handle:
         for row in rows:
             handle.write(json.dumps(row, ensure_ascii=False) + "\n")
 
@@ -286,8 +308,8 @@ def main() -> None:
         sample_rows.append(case.sample)
         gold_rows.append(case.gold)
 
-    samples_path = args.data_dir / "samples.jsonl"
-    gold_path = args.data_dir / "gold.jsonl"
+    samples_path = with_compression(args.data_dir / "samples.jsonl", args.compress)
+    gold_path = with_compression(args.data_dir / "gold.jsonl", args.compress)
 
     write_jsonl(samples_path, sample_rows)
     write_jsonl(gold_path, gold_rows)
@@ -2,26 +2,33 @@
 from __future__ import annotations
 
 import argparse
-import json
+from contextlib import nullcontext
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
-from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.batch.pipeline import triage_batch
 from customer_doc_triage.eval.harness import run_eval
-from customer_doc_triage.workflow.pipeline import run_workflow
-
-
-def _read_jsonl(path: Path, limit: int | None = None) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            raw = line.strip()
-            if not raw:
-                continue
-            rows.append(json.loads(raw))
-            if limit is not None and len(rows) >= limit:
-                break
-    return rows
+from customer_doc_triage.ingest import COMPRESSIONS, Quarantine, iter_triage_inputs, load_corpus
+from customer_doc_triage.telemetry import (
+    PROFILE_KINDS,
+    OtlpJsonFileExporter,
+    configure_tracing,
+    print_profile,
+    profile_stage,
+    profiling,
+    shutdown_tracing,
+)
+from customer_doc_triage.triage.schemas import TriageInput
+
+
+def _read_samples(
+    path: Path, quarantine: Quarantine, snapshot: Path | None, limit: int | None = None
+) -> list[TriageInput]:
+    if snapshot is None:
+        return list(islice(iter_triage_inputs(path, quarantine), limit))
+    # A snapshot always covers the whole file; --limit only trims what runs.
+    return load_corpus(path, quarantine, snapshot)[:limit]
 
 
 def _short_result(decision: Any) -> dict[str, Any]:
@@ -39,18 +46,17 @@ def _short_result(decision: Any) -> dict[str, Any]:
     }
 
 
-def _run_per_case(samples: list[dict[str, Any]], mode: str, max_cases_to_print: int = 8) -> None:
-    decisions: list[dict[str, Any]] = []
+def _run_per_case(samples: list[TriageInput], mode: str, max_cases_to_print: int = 8) -> None:
+    if mode not in {"workflow", "agent"}:
+        raise ValueError(f"Unsupported mode for per-case execution: {mode}")
 
-    for sample in samples:
-        if mode == "workflow":
-            decision = run_workflow(sample, max_retries=1)
-        elif mode == "agent":
-            decision = run_agentic(sample, max_tool_calls=6, timeout_ms=2_000)
-        else:
-            raise ValueError(f"Unsupported mode for per-case execution: {mode}")
-
-        decisions.append(_short_result(decision))
+    with profile_stage(mode):
+        decisions = [
+            _short_result(decision)
+            for decision in triage_batch(
+                samples, mode=mode, max_retries=1, max_tool_calls=6, timeout_ms=2_000
+            )
+        ]
 
     print({"mode": mode, "cases": len(decisions)})
     for row in decisions[:max_cases_to_print]:
@@ -59,7 +65,8 @@ def _run_per_case(samples: list[dict[str, Any]], mode: str, max_cases_to_print:
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Run agents_vs_workflows in VS Code-friendly modes (workflow/agent/both/eval)."
+        description="Run agents_vs_workflows in VS Code-friendly modes (workflow/agent/both/eval).",
+        fromfile_prefix_chars="@",
     )
 
     experiment_dir = Path(__file__).resolve().parents[1]
@@ -96,15 +103,89 @@ def parse_args() -> argparse.Namespace:
         default=10,
         help="Max number of sample rows to run for workflow/agent/both modes.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes to shard the corpus across in eval mode.",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Stream samples and score incrementally in eval mode.",
+    )
+    parser.add_argument(
+        "--trace-out",
+        type=Path,
+        default=None,
+        help="Append OTLP/JSON spans for every run to this file.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        default=None,
+        help="Binary snapshot of the parsed samples; rebuilt only when samples change.",
+    )
+    parser.add_argument(
+        "--doc-ids",
+        nargs="+",
+        default=None,
+        help="Only evaluate these doc_ids in eval mode, e.g. to re-run failures (@file works).",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default=None,
+        help="Write the eval predictions CSV and summary JSON compressed.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="SQLite result cache for eval mode; unchanged documents are served from it.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_KINDS,
+        default=None,
+        help="Profile each stage with cProfile (cpu) or tracemalloc (mem) into <out>/profile.",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=15,
+        help="Hotspot rows to print with --profile.",
+    )
 
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-
+    if args.trace_out is not None:
+        configure_tracing(OtlpJsonFileExporter(args.trace_out))
+    try:
+        with profiling(args.profile) if args.profile else nullcontext() as profiler:
+            _run(args)
+    finally:
+        shutdown_tracing()
+    if profiler is not None:
+        print_profile(profiler, args.out / "profile", args.profile_top, args.workers)
+
+
+def _run(args: argparse.Namespace) -> None:
     if args.mode == "eval":
-        result = run_eval(samples_path=args.samples, gold_path=args.gold, output_dir=args.out)
+        result = run_eval(
+            samples_path=args.samples,
+            gold_path=args.gold,
+            output_dir=args.out,
+            workers=args.workers,
+            streaming=args.streaming,
+            snapshot_path=args.snapshot,
+            doc_ids=args.doc_ids,
+            compression=args.compress,
+            cache_path=args.cache,
+        )
         print(
             {
                 "mode": "eval",
@@ -112,11 +193,16 @@ def main() -> None:
                 "summary_json": result["summary_json"],
                 "summary_md": result["summary_md"],
                 "predictions_csv": result["predictions_csv"],
+                "quarantined_rows": result["quarantined_rows"],
+                "cache": result["cache"],
             }
         )
         return
 
-    samples = _read_jsonl(args.samples, limit=args.limit)
+    with profile_stage("ingest"), Quarantine(args.out / "quarantine.jsonl") as quarantine:
+        samples = _read_samples(args.samples, quarantine, args.snapshot, limit=args.limit)
+    if quarantine.count:
+        print({"quarantined_rows": quarantine.count, "quarantine": str(quarantine.path)})
 
     if args.mode in {"workflow", "agent"}:
         _run_per_case(samples, mode=args.mode)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+from customer_doc_triage.eval.benchmarks import (
+    BENCHMARK_NAMES,
+    DEFAULT_REGRESSION_THRESHOLD,
+    benchmark_report,
+    find_regressions,
+    pad_content,
+    run_benchmarks,
+)
+from generate_synthetic_data import generate_case
+
+
+def _int_list(raw: str) -> list[int]:
+    return [int(value) for value in raw.split(",") if value.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark triage hot paths and fail on throughput regressions."
+    )
+    experiment_dir = Path(__file__).resolve().parents[1]
+
+    parser.add_argument(
+        "--sizes",
+        type=_int_list,
+        default=[200, 1_000],
+        help="Comma-separated corpus sizes to generate.",
+    )
+    parser.add_argument(
+        "--doc-lengths",
+        type=_int_list,
+        default=[0, 4_000],
+        help="Comma-separated content lengths in characters; 0 keeps generated length.",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Timed passes per benchmark.")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the synthetic corpus.")
+    parser.add_argument(
+        "--edge-rate", type=float, default=0.30, help="Edge-case rate for the synthetic corpus."
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=BENCHMARK_NAMES,
+        default=list(BENCHMARK_NAMES),
+        help="Run only these benchmarks.",
+    )
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=experiment_dir / "eval_outputs" / "benchmarks.json",
+        help="Where to write this run's results as JSON.",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Baseline JSON from an earlier run; exit non-zero on regressions against it.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        help="Allowed fractional throughput drop before a benchmark counts as regressed.",
+    )
+    return parser.parse_args()
+
+
+def _corpus(
+    count: int, seed: int, edge_rate: float
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    randomizer = random.Random(seed)
+    cases = [generate_case(index, randomizer, edge_rate) for index in range(1, count + 1)]
+    return [case.sample for case in cases], [case.gold for case in cases]
+
+
+def main() -> None:
+    args = parse_args()
+    results = []
+    for size in args.sizes:
+        samples, gold_rows = _corpus(size, args.seed, args.edge_rate)
+        for doc_length in args.doc_lengths:
+            for result in run_benchmarks(
+                pad_content(samples, doc_length),
+                gold_rows,
+                doc_length=doc_length,
+                repeats=args.repeats,
+                names=args.only,
+            ):
+                results.append(result)
+                print(
+                    f"{result.key:<58} {result.docs_per_s:>12,.0f} docs/s"
+                    f" {result.best_ns / size / 1_000:>10.2f} us/doc"
+                )
+
+    report = benchmark_report(results)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print({"benchmarks": len(results), "results_json": str(args.out)})
+
+    if args.baseline is None:
+        return
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    regressions = find_regressions(report, baseline, args.threshold)
+    for regression in regressions:
+        print({"regression": regression})
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
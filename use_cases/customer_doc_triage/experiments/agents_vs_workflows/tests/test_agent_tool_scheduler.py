@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from time import perf_counter
+
+from customer_doc_triage.agent.pipeline import arun_agentic, run_agentic
+from customer_doc_triage.agent.scheduler import tool_waves
+from customer_doc_triage.agent.tools import TOOL_SPECS
+
+
+def _agent_input(**overrides):
+    payload = {
+        "doc_id": "DOC-SCH-001",
+        "channel": "portal",
+        "customer_id": "CUST-3",
+        "customer_tier": "growth",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "access request",
+        "content": "Grant privileged admin role to a contractor for the audit.",
+        "metadata": {"requested_role": "admin", "justification": "audit"},
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_tool_waves_only_serialize_declared_dependencies():
+    assert tool_waves(
+        ["detect_doc_type", "lookup_policy_context", "risk_scan", "check_completeness"]
+    ) == [["detect_doc_type", "lookup_policy_context", "risk_scan"], ["check_completeness"]]
+    assert tool_waves(["check_completeness", "detect_doc_type"]) == [
+        ["check_completeness", "detect_doc_type"]
+    ]
+    assert tool_waves([]) == []
+
+
+def test_independent_tools_run_concurrently_on_executor(monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+
+    for tool_name in ("detect_doc_type", "lookup_policy_context", "risk_scan"):
+        spec = TOOL_SPECS[tool_name]
+
+        def gated(triage_input, features, context, deadline, _func=spec.func):
+            barrier.wait()
+            return _func(triage_input, features, context, deadline)
+
+        monkeypatch.setitem(TOOL_SPECS, tool_name, replace(spec, func=gated))
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        decision = run_agentic(_agent_input(), tool_executor=executor)
+
+    assert decision.decision_trace.tool_calls == 4
+    assert decision.required_missing_fields == ["approval_reference"]
+    assert decision.decision_trace.steps[-2:] == ["tool:check_completeness", "assemble_candidate"]
+
+
+def test_budget_violation_runs_allowed_prefix_before_failing_closed():
+    decision = run_agentic(_agent_input(), max_tool_calls=2)
+
+    assert decision.escalate is True
+    assert decision.decision_trace.tool_calls == 2
+    assert decision.decision_trace.steps[-1] == "guardrail_tool_budget_exceeded"
+
+
+def _slow_spec(tool_name: str, func):
+    return replace(TOOL_SPECS[tool_name], func=func)
+
+
+def test_slow_tool_on_executor_fails_closed_at_deadline(monkeypatch):
+    release = threading.Event()
+    seen_budgets = []
+
+    def stalled_risk_scan(triage_input, features, context, deadline):
+        seen_budgets.append(deadline.remaining_ms())
+        release.wait(timeout=5)
+        return {"risk_tokens": [], "risk_score": 0}
+
+    monkeypatch.setitem(TOOL_SPECS, "risk_scan", _slow_spec("risk_scan", stalled_risk_scan))
+
+    started = perf_counter()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        decision = run_agentic(_agent_input(), timeout_ms=50, tool_executor=executor)
+        waited_s = perf_counter() - started
+        release.set()
+
+    assert waited_s < 1.0
+    assert 0 < seen_budgets[0] <= 50
+    assert decision.escalate is True
+    assert "timeout" in decision.escalation_reason.lower()
+    assert decision.decision_trace.steps[-1] == "guardrail_timeout"
+    assert "tool:check_completeness" not in decision.decision_trace.steps
+
+
+def test_slow_async_tool_is_cancelled_at_deadline(monkeypatch):
+    cancelled = []
+
+    async def stalled_risk_scan(triage_input, features, context, deadline):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {"risk_tokens": [], "risk_score": 0}
+
+    monkeypatch.setitem(TOOL_SPECS, "risk_scan", _slow_spec("risk_scan", stalled_risk_scan))
+
+    started = perf_counter()
+    decision = asyncio.run(arun_agentic(_agent_input(), timeout_ms=50))
+
+    assert perf_counter() - started < 1.0
+    assert cancelled == [True]
+    assert decision.decision_trace.steps[-1] == "guardrail_timeout"
+
+
+def test_slow_sync_tool_does_not_block_the_event_loop(monkeypatch):
+    release = threading.Event()
+
+    def stalled_risk_scan(triage_input, features, context, deadline):
+        release.wait(timeout=5)
+        return {"risk_tokens": [], "risk_score": 0}
+
+    monkeypatch.setitem(TOOL_SPECS, "risk_scan", _slow_spec("risk_scan", stalled_risk_scan))
+
+    async def run_with_heartbeat():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        beating = asyncio.ensure_future(heartbeat())
+        started = perf_counter()
+        decision = await arun_agentic(_agent_input(), timeout_ms=100)
+        waited_s = perf_counter() - started
+        release.set()
+        beating.cancel()
+        return decision, ticks, waited_s
+
+    decision, ticks, waited_s = asyncio.run(run_with_heartbeat())
+
+    assert waited_s < 1.0
+    assert ticks >= 5
+    assert decision.decision_trace.steps[-1] == "guardrail_timeout"
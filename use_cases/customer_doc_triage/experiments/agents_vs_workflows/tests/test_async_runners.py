@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from customer_doc_triage.agent.pipeline import arun_agentic, run_agentic
+from customer_doc_triage.agent.tools import TOOL_SPECS, ToolSpec, risk_scan_tool
+from customer_doc_triage.batch.pipeline import atriage_batch
+from customer_doc_triage.workflow.pipeline import arun_workflow, run_workflow
+
+
+def _input(**overrides):
+    payload = {
+        "doc_id": "DOC-AS-001",
+        "channel": "email",
+        "customer_id": "CUST-9",
+        "customer_tier": "enterprise",
+        "region": "EU",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "access request",
+        "content": "Need temporary privileged admin access for contractor migration.",
+        "metadata": {
+            "requested_role": "admin",
+            "justification": "migration",
+            "approval_reference": "CHG-9",
+        },
+    }
+    payload.update(overrides)
+    return payload
+
+
+def _comparable(decision) -> dict:
+    payload = decision.model_dump()
+    trace = payload["decision_trace"]
+    trace.pop("elapsed_ms")
+    trace.pop("elapsed_ns")
+    trace["tool_stats"] = {name: stats["calls"] for name, stats in trace["tool_stats"].items()}
+    trace["spans"] = [span["name"] for span in trace["spans"]]
+    return payload
+
+
+@pytest.mark.parametrize(
+    "guardrails",
+    [{}, {"allowlist": {"detect_doc_type"}}, {"max_tool_calls": 1}, {"timeout_ms": -1}],
+)
+def test_arun_agentic_matches_sync_guardrail_semantics(guardrails):
+    async_decision = asyncio.run(arun_agentic(_input(), **guardrails))
+    sync_decision = run_agentic(_input(), **guardrails)
+
+    assert _comparable(async_decision) == _comparable(sync_decision)
+
+
+def test_arun_workflow_keeps_fail_closed_semantics():
+    payload = _input(metadata={"_force_validation_failure": True})
+
+    async_decision = asyncio.run(arun_workflow(payload, max_retries=1))
+
+    assert _comparable(async_decision) == _comparable(run_workflow(payload, max_retries=1))
+    assert async_decision.escalate is True
+
+
+def test_atriage_batch_bounds_concurrency_and_preserves_order(monkeypatch):
+    in_flight = 0
+    peak = 0
+
+    async def slow_risk_scan(triage_input, features, context, deadline):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return risk_scan_tool(triage_input, features)
+
+    monkeypatch.setitem(
+        TOOL_SPECS,
+        "risk_scan",
+        ToolSpec(name="risk_scan", func=slow_risk_scan, outputs=("risk_tokens", "risk_score")),
+    )
+    inputs = [_input(doc_id=f"DOC-AS-{index:03d}") for index in range(12)]
+
+    decisions = asyncio.run(atriage_batch(inputs, mode="agent", concurrency=4))
+
+    assert [decision.doc_id for decision in decisions] == [item["doc_id"] for item in inputs]
+    assert all("tool:risk_scan" in decision.decision_trace.steps for decision in decisions)
+    assert 1 < peak <= 4
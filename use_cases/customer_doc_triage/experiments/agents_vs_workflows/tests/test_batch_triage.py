@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.agent.tools import TOOL_SPECS
+from customer_doc_triage.batch import pipeline as batch_pipeline
+from customer_doc_triage.batch.pipeline import triage_batch
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+SAMPLES_PATH = Path(__file__).resolve().parents[1] / "data" / "samples.jsonl"
+
+
+def _samples(limit: int = 60) -> list[dict]:
+    with SAMPLES_PATH.open("r", encoding="utf-8") as handle:
+        rows = [json.loads(line) for line in handle if line.strip()]
+    rows = rows[:limit]
+    rows[0] = {**rows[0], "metadata": {**rows[0]["metadata"], "_force_retry_once": True}}
+    rows[1] = {**rows[1], "metadata": {**rows[1]["metadata"], "_force_validation_failure": True}}
+    return rows
+
+
+def _comparable(decision) -> dict:
+    payload = decision.model_dump()
+    trace = payload["decision_trace"]
+    trace.pop("elapsed_ms")
+    trace.pop("elapsed_ns")
+    trace["tool_stats"] = {name: stats["calls"] for name, stats in trace["tool_stats"].items()}
+    trace["spans"] = [span["name"] for span in trace["spans"]]
+    return payload
+
+
+def test_triage_batch_workflow_matches_single_document_runner():
+    samples = _samples()
+
+    batch = triage_batch(samples, mode="workflow", max_retries=1)
+    single = [run_workflow(sample, max_retries=1) for sample in samples]
+
+    assert [_comparable(decision) for decision in batch] == [
+        _comparable(decision) for decision in single
+    ]
+
+
+@pytest.mark.parametrize(
+    "guardrails",
+    [
+        {},
+        {"max_tool_calls": 3},
+        {"allowlist": {"detect_doc_type", "extract_metadata", "check_completeness"}},
+        {"timeout_ms": -1},
+    ],
+)
+def test_triage_batch_agent_matches_single_document_runner(guardrails):
+    samples = _samples()
+
+    batch = triage_batch(samples, mode="agent", **guardrails)
+    single = [run_agentic(sample, **guardrails) for sample in samples]
+
+    assert [_comparable(decision) for decision in batch] == [
+        _comparable(decision) for decision in single
+    ]
+
+
+def test_triage_batch_reroutes_only_rows_whose_own_tool_call_overran(monkeypatch):
+    original = TOOL_SPECS["extract_metadata"]
+
+    def extract(triage_input, features, context, deadline):
+        if triage_input.doc_id == "DOC-SLOW":
+            time.sleep(0.05)
+        return original.func(triage_input, features, context, deadline)
+
+    spec = replace(original, func=extract, timeout_ms=20)
+    monkeypatch.setitem(TOOL_SPECS, "extract_metadata", spec)
+    samples = [
+        {**sample, "doc_id": "DOC-SLOW" if index == 3 else sample["doc_id"]}
+        for index, sample in enumerate(_samples(limit=10)[2:])
+    ]
+
+    batch = triage_batch(samples, mode="agent")
+
+    timed_out = [
+        decision.doc_id
+        for decision in batch
+        if decision.decision_trace.steps[-1] == "guardrail_tool_timeout:extract_metadata"
+    ]
+    assert timed_out == ["DOC-SLOW"]
+    assert len({decision.decision_trace.elapsed_ns for decision in batch}) > 1
+    for decision in batch:
+        trace = decision.decision_trace
+        if decision.doc_id != "DOC-SLOW":
+            assert trace.elapsed_ns == sum(span.duration_ns for span in trace.spans)
+
+
+def test_triage_batch_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        triage_batch(_samples(limit=2), mode="hybrid")  # type: ignore[arg-type]
+
+
+def test_triage_batch_raises_instead_of_dropping_unfilled_rows(monkeypatch):
+    column_stage = batch_pipeline._triage_workflow_batch
+
+    def drops_a_row(*args, **kwargs):
+        decisions = column_stage(*args, **kwargs)
+        decisions[1] = None
+        return decisions
+
+    monkeypatch.setattr(batch_pipeline, "_triage_workflow_batch", drops_a_row)
+    with pytest.raises(RuntimeError, match=r"\[1\]"):
+        triage_batch(_samples(limit=3))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import pytest
+from customer_doc_triage.eval.benchmarks import (
+    BENCHMARK_NAMES,
+    benchmark_report,
+    find_regressions,
+    pad_content,
+    run_benchmarks,
+)
+from customer_doc_triage.triage.keywords import scan_keywords
+
+
+def _corpus() -> tuple[list[dict], list[dict]]:
+    samples = [
+        {
+            "doc_id": "DOC-BENCH-001",
+            "channel": "email",
+            "customer_id": "CUST-1",
+            "customer_tier": "growth",
+            "region": "NA",
+            "submitted_at": "2026-02-16T12:00:00Z",
+            "doc_type_hint": "billing dispute",
+            "content": "Customer disputes invoice due to duplicate charge.",
+            "metadata": {"issue_type": "duplicate charge"},
+        },
+        {
+            "doc_id": "DOC-BENCH-002",
+            "channel": "portal",
+            "customer_id": "CUST-2",
+            "customer_tier": "enterprise",
+            "region": "EU",
+            "submitted_at": "2026-02-16T12:05:00Z",
+            "doc_type_hint": None,
+            "content": "Production incident: api-gateway latency spiked to 640ms.",
+            "metadata": {"service": "api-gateway", "region": "EU", "has_logs": True},
+        },
+    ]
+    gold = [
+        {
+            "doc_id": "DOC-BENCH-001",
+            "true_doc_type": "billing_dispute",
+            "required_missing_fields": ["invoice_id"],
+        },
+        {
+            "doc_id": "DOC-BENCH-002",
+            "true_doc_type": "incident_report",
+            "required_missing_fields": ["request_id_examples"],
+        },
+    ]
+    return samples, gold
+
+
+def test_suite_times_every_hot_path_at_the_requested_length():
+    samples, gold = _corpus()
+    results = run_benchmarks(pad_content(samples, 600), gold, doc_length=600, repeats=1)
+
+    report = benchmark_report(results)
+    assert [result.name for result in results] == list(BENCHMARK_NAMES)
+    assert "run_agentic[n=2,len=600]" in report["results"]
+    assert all(entry["docs_per_s"] > 0 for entry in report["results"].values())
+    with pytest.raises(ValueError):
+        run_benchmarks(samples, gold, names=["nope"])
+
+
+def test_padding_reaches_length_without_adding_keywords():
+    samples, _ = _corpus()
+    padded = pad_content(samples, 2_000)
+
+    assert [len(sample["content"]) for sample in padded] == [2_000, 2_000]
+    for original, longer in zip(samples, padded):
+        assert scan_keywords(longer["content"]) == scan_keywords(original["content"])
+    assert pad_content(samples, 0) is samples
+
+
+def test_regressions_are_throughput_drops_beyond_threshold():
+    baseline = {
+        "results": {
+            "score[n=2,len=0]": {"docs_per_s": 1_000.0},
+            "run_workflow[n=2,len=0]": {"docs_per_s": 1_000.0},
+        }
+    }
+    report = {
+        "results": {
+            "score[n=2,len=0]": {"docs_per_s": 700.0},
+            "run_workflow[n=2,len=0]": {"docs_per_s": 900.0},
+            "run_agentic[n=2,len=0]": {"docs_per_s": 1.0},
+        }
+    }
+
+    regressions = find_regressions(report, baseline, threshold=0.2)
+
+    assert regressions == [
+        {
+            "benchmark": "score[n=2,len=0]",
+            "baseline_docs_per_s": 1_000.0,
+            "docs_per_s": 700.0,
+            "change": -0.3,
+        }
+    ]
+    assert find_regressions(report, baseline, threshold=0.5) == []
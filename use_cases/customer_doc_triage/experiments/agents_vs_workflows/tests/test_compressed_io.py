@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.ingest import (
+    COMPRESSIONS,
+    JsonlIndex,
+    detect_compression,
+    iter_lines,
+    iter_triage_inputs,
+    open_compressed,
+    with_compression,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _read_csv(path: Path) -> list[dict[str, str]]:
+    with open_compressed(path, "r", encoding="utf-8", newline="") as handle:
+        return [
+            {key: value for key, value in row.items() if not key.startswith("elapsed")}
+            for row in csv.DictReader(handle)
+        ]
+
+
+@pytest.mark.parametrize("compression", COMPRESSIONS)
+def test_round_trip_detects_extension_and_magic_bytes(tmp_path, compression):
+    path = with_compression(tmp_path / "rows.jsonl", compression)
+    with open_compressed(path, "w", encoding="utf-8") as handle:
+        handle.write('{"doc_id": "DOC-1"}\r\n\n  {"doc_id": "DOC-2"}')
+
+    renamed = path.rename(tmp_path / "archived.jsonl")
+    assert detect_compression(path) == compression
+    assert detect_compression(renamed) == compression
+    # Small blocks force lines to straddle decompressed chunk boundaries.
+    assert list(iter_lines(renamed, block_size=5)) == [
+        (1, b'{"doc_id": "DOC-1"}'),
+        (3, b'{"doc_id": "DOC-2"}'),
+    ]
+
+
+def test_plain_files_are_not_treated_as_compressed(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"doc_id": "DOC-1"}\n', encoding="utf-8")
+
+    assert detect_compression(path) is None
+    assert detect_compression(tmp_path / "missing.jsonl") is None
+    with pytest.raises(ValueError):
+        with_compression(path, "zip")
+
+
+def test_offset_index_refuses_compressed_corpora(tmp_path):
+    path = tmp_path / "gold.jsonl.gz"
+    path.write_bytes(gzip.compress(b'{"doc_id": "DOC-1"}\n'))
+
+    with pytest.raises(ValueError, match="compressed"):
+        JsonlIndex.open(path)
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_eval_reads_and_writes_compressed_files(tmp_path, streaming):
+    with (DATA_DIR / "samples.jsonl").open("rb") as handle:
+        sample_lines = handle.readlines()[:25]
+    with (DATA_DIR / "gold.jsonl").open("rb") as handle:
+        gold_lines = handle.readlines()[:25]
+    samples_path = tmp_path / "samples.jsonl"
+    gold_path = tmp_path / "gold.jsonl"
+    samples_path.write_bytes(b"".join(sample_lines))
+    gold_path.write_bytes(b"".join(gold_lines))
+    samples_gz = tmp_path / "samples.jsonl.gz"
+    gold_xz = tmp_path / "gold.jsonl.xz"
+    samples_gz.write_bytes(gzip.compress(b"".join(sample_lines)))
+    with open_compressed(gold_xz, "wb") as handle:
+        handle.write(b"".join(gold_lines))
+
+    plain = run_eval(samples_path, gold_path, tmp_path / "plain", streaming=streaming)
+    packed = run_eval(
+        samples_gz, gold_xz, tmp_path / "packed", streaming=streaming, compression="bz2"
+    )
+
+    assert packed["predictions_csv"].endswith("per_case_predictions.csv.bz2")
+    assert packed["summary_json"].endswith("ab_eval_summary.json.bz2")
+    assert _read_csv(Path(packed["predictions_csv"])) == _read_csv(Path(plain["predictions_csv"]))
+    with open_compressed(Path(packed["summary_json"]), "r", encoding="utf-8") as handle:
+        assert json.load(handle)["corpus_size"] == plain["summary"]["corpus_size"] == 25
+    assert list(iter_triage_inputs(samples_gz)) == list(iter_triage_inputs(samples_path))
+
+    doc_ids = [json.loads(sample_lines[9])["doc_id"], json.loads(sample_lines[2])["doc_id"]]
+    selected = run_eval(
+        samples_gz, gold_xz, tmp_path / "selected", streaming=streaming, doc_ids=doc_ids
+    )
+    assert [row["doc_id"] for row in _read_csv(Path(selected["predictions_csv"]))][:2] == [
+        doc_ids[1],
+        doc_ids[0],
+    ]
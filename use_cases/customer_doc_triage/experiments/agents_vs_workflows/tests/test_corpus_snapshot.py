@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from customer_doc_triage.eval import ModeConfig, replay
+from customer_doc_triage.ingest import (
+    CorpusSnapshot,
+    iter_corpus,
+    iter_triage_inputs,
+    load_corpus,
+    open_current_snapshot,
+)
+
+
+def _sample(index: int) -> dict:
+    return {
+        "doc_id": f"DOC-SNAP-{index:03d}",
+        "channel": "portal",
+        "customer_id": f"CUST-{index}",
+        "customer_tier": "enterprise" if index % 2 else None,
+        "region": "EU",
+        "submitted_at": "2026-02-16T12:00:00+02:00",
+        "doc_type_hint": None,
+        "content": f"Requesting temporary admin permissions for contractor {index}.",
+        "metadata": {"requested_role": "admin", "nested": {"values": [1, 2.5, None, True]}},
+    }
+
+
+@pytest.fixture
+def samples_path(tmp_path):
+    path = tmp_path / "samples.jsonl"
+    path.write_text("".join(json.dumps(_sample(index)) + "\n" for index in range(12)))
+    return path
+
+
+def test_snapshot_round_trips_validated_inputs(samples_path, tmp_path):
+    snapshot_path = tmp_path / "corpus.snap"
+    parsed = load_corpus(samples_path, snapshot_path=snapshot_path)
+
+    with CorpusSnapshot(snapshot_path) as snapshot:
+        assert len(snapshot) == 12
+        assert list(snapshot) == parsed == list(iter_triage_inputs(samples_path))
+        assert snapshot[-1] == parsed[-1]
+        assert snapshot[3].submitted_at == parsed[3].submitted_at
+        assert snapshot[3].model_dump() == parsed[3].model_dump()
+        with pytest.raises(IndexError):
+            snapshot[12]
+
+
+def test_snapshot_is_reused_until_the_source_changes(samples_path, tmp_path):
+    snapshot_path = tmp_path / "corpus.snap"
+    load_corpus(samples_path, snapshot_path=snapshot_path)
+    built_at = snapshot_path.stat().st_mtime_ns
+
+    assert len(load_corpus(samples_path, snapshot_path=snapshot_path)) == 12
+    assert snapshot_path.stat().st_mtime_ns == built_at
+
+    with samples_path.open("a") as handle:
+        handle.write(json.dumps(_sample(99)) + "\n")
+    assert open_current_snapshot(snapshot_path, samples_path) is None
+    assert len(load_corpus(samples_path, snapshot_path=snapshot_path)) == 13
+
+
+def test_partial_reads_never_leave_a_snapshot(samples_path, tmp_path):
+    snapshot_path = tmp_path / "corpus.snap"
+    corpus = iter_corpus(samples_path, snapshot_path=snapshot_path)
+    next(corpus)
+    corpus.close()
+
+    assert os.listdir(tmp_path) == ["samples.jsonl"]
+    (tmp_path / "garbage.snap").write_bytes(b"not a snapshot")
+    assert open_current_snapshot(tmp_path / "garbage.snap", samples_path) is None
+
+
+def test_replay_runs_each_config_over_one_parsed_corpus(samples_path):
+    corpus = load_corpus(samples_path)
+    configs = [
+        ModeConfig("workflow", "workflow"),
+        ModeConfig("agent_budget_6", "agent"),
+        ModeConfig("agent_budget_1", "agent", max_tool_calls=1),
+    ]
+
+    predictions = replay(corpus, configs)
+
+    assert list(predictions) == ["workflow", "agent_budget_6", "agent_budget_1"]
+    assert {row["mode"] for row in predictions["agent_budget_1"]} == {"agent_budget_1"}
+    assert all(
+        row["decision_trace"]["steps"][-1].startswith("guardrail_tool_budget_exceeded")
+        for row in predictions["agent_budget_1"]
+    )
+    with pytest.raises(ValueError):
+        replay(corpus, [ModeConfig("agent", "agent"), ModeConfig("agent", "workflow")])
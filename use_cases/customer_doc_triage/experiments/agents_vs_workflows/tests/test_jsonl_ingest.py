@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.ingest import (
+    IngestError,
+    Quarantine,
+    iter_json_objects,
+    iter_triage_inputs,
+)
+from customer_doc_triage.triage.schemas import TriageInput
+
+
+def _sample(index: int) -> dict:
+    return {
+        "doc_id": f"DOC-INGEST-{index:03d}",
+        "channel": "email",
+        "customer_id": f"CUST-{index}",
+        "customer_tier": "growth",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "billing dispute",
+        "content": "Customer disputes invoice due to duplicate charge.",
+        "metadata": {"issue_type": "duplicate charge", "invoice_id": f"INV-{index}"},
+    }
+
+
+def _write_corpus(path, lines: list[str]) -> None:
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_bytes_validation_matches_dict_validation_across_block_boundaries(tmp_path):
+    rows = [_sample(index) for index in range(20)]
+    path = tmp_path / "samples.jsonl"
+    _write_corpus(path, [json.dumps(row) + "\r" for row in rows] + ["", "   "])
+
+    parsed = list(iter_triage_inputs(path, block_size=37))
+
+    assert parsed == [TriageInput(**row) for row in rows]
+
+
+def test_malformed_rows_are_quarantined_with_line_numbers(tmp_path):
+    path = tmp_path / "samples.jsonl"
+    _write_corpus(
+        path,
+        [
+            json.dumps(_sample(1)),
+            "{not json",
+            "",
+            json.dumps({**_sample(2), "channel": "fax"}),
+            json.dumps(_sample(3)),
+        ],
+    )
+
+    with Quarantine(tmp_path / "out" / "quarantine.jsonl") as quarantine:
+        parsed = list(iter_triage_inputs(path, quarantine))
+
+    assert [item.doc_id for item in parsed] == ["DOC-INGEST-001", "DOC-INGEST-003"]
+    records = [json.loads(line) for line in quarantine.path.read_text().splitlines()]
+    assert [record["line"] for record in records] == [2, 4]
+    assert records[0]["raw"] == "{not json"
+    assert records[1]["error"].startswith("channel:")
+
+    with pytest.raises(IngestError, match="samples.jsonl:2"):
+        list(iter_triage_inputs(path))
+
+
+def test_gold_rows_need_an_object_with_doc_id(tmp_path):
+    path = tmp_path / "gold.jsonl"
+    _write_corpus(path, ['{"doc_id": "DOC-1"}', "[1, 2]", '{"true_doc_type": "x"}'])
+
+    with Quarantine(tmp_path / "quarantine.jsonl") as quarantine:
+        rows = list(iter_json_objects(path, quarantine, "doc_id"))
+
+    assert rows == [{"doc_id": "DOC-1"}]
+    assert quarantine.count == 2
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_eval_skips_quarantined_rows_instead_of_failing(tmp_path, streaming):
+    samples_path = tmp_path / "samples.jsonl"
+    _write_corpus(samples_path, [json.dumps(_sample(1)), '{"doc_id": "DOC-BAD"}'])
+    gold_path = tmp_path / "gold.jsonl"
+    _write_corpus(gold_path, ["garbage"])
+    stale = tmp_path / "out" / "quarantine.jsonl"
+    stale.parent.mkdir()
+    stale.write_text("stale\n")
+
+    result = run_eval(samples_path, gold_path, tmp_path / "out", streaming=streaming)
+
+    assert result["summary"]["corpus_size"] == 1
+    assert result["quarantined_rows"] == 2
+    assert len(stale.read_text().splitlines()) == 2
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_snapshot_runs_report_the_rows_quarantined_when_it_was_built(tmp_path, streaming):
+    samples_path = tmp_path / "samples.jsonl"
+    _write_corpus(samples_path, [json.dumps(_sample(1)), "{broken", json.dumps(_sample(2)), "[]"])
+    gold_path = tmp_path / "gold.jsonl"
+    _write_corpus(gold_path, [])
+    snapshot_path = tmp_path / "corpus.snap"
+
+    runs = [
+        run_eval(
+            samples_path,
+            gold_path,
+            tmp_path / f"out-{attempt}",
+            streaming=streaming,
+            snapshot_path=snapshot_path,
+        )
+        for attempt in range(2)
+    ]
+
+    first, second = runs
+    assert [run["summary"]["corpus_size"] for run in runs] == [2, 2]
+    assert first["quarantined_rows"] == second["quarantined_rows"] == 2
+    rows = Path(second["quarantine"]).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(row)["line"] for row in rows] == [2, 4]
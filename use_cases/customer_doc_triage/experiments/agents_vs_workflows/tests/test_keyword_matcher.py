@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import random
+
+from customer_doc_triage.triage.keywords import KEYWORD_MATCHER, KeywordMatcher
+
+
+def test_keyword_matcher_finds_overlapping_and_nested_keywords():
+    matcher = KeywordMatcher(["error", "error rate", "rate", "he", "she", "hers"])
+
+    hits = matcher.scan("Ushers saw the ERROR RATE climb")
+
+    assert hits == {"error", "error rate", "rate", "he", "she", "hers"}
+
+
+def test_keyword_matcher_matches_naive_substring_scan():
+    randomizer = random.Random(7)
+    vocabulary = sorted(KEYWORD_MATCHER.keywords) + ["lorem", "ipsum", "x", " ", "Admin", "SOC"]
+
+    for _ in range(200):
+        content = "".join(
+            randomizer.choice(vocabulary)[: randomizer.randint(1, 12)]
+            for _ in range(randomizer.randint(1, 40))
+        )
+        expected = {keyword for keyword in KEYWORD_MATCHER.keywords if keyword in content.lower()}
+        assert KEYWORD_MATCHER.scan(content) == expected
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import replace
+
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.agent.tools import TOOL_SPECS
+from customer_doc_triage.batch.pipeline import triage_batch
+from customer_doc_triage.eval.latency import LatencyHistogram, bucket_key, bucket_upper_ns
+from customer_doc_triage.eval.metrics import MetricsAccumulator
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+
+def _payload():
+    return {
+        "doc_id": "DOC-LAT-001",
+        "channel": "email",
+        "customer_id": "CUST-7",
+        "customer_tier": "growth",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "billing dispute",
+        "content": "Customer disputes invoice due to duplicate charge.",
+        "metadata": {"issue_type": "duplicate charge", "invoice_id": "INV-7"},
+    }
+
+
+def test_runners_record_nanosecond_elapsed_alongside_clamped_ms():
+    for decision in (run_workflow(_payload()), run_agentic(_payload())):
+        trace = decision.decision_trace
+        assert trace.elapsed_ns > 0
+        assert trace.elapsed_ms == max(1, trace.elapsed_ns // 1_000_000)
+
+
+def test_bucket_bounds_keep_relative_error_small():
+    randomizer = random.Random(3)
+    for value in [0, 1, 255, 256, 257, 10**6, 2**40 + 12345] + [
+        randomizer.randrange(1, 10**12) for _ in range(500)
+    ]:
+        upper = bucket_upper_ns(bucket_key(value))
+        assert value <= upper
+        assert upper - value <= max(0, value) / 128
+
+
+def test_percentiles_track_the_tail_and_merge_like_a_single_histogram():
+    randomizer = random.Random(5)
+    values = [randomizer.randrange(50_000, 200_000) for _ in range(9_990)]
+    values += [randomizer.randrange(40_000_000, 60_000_000) for _ in range(10)]
+    randomizer.shuffle(values)
+
+    whole = LatencyHistogram()
+    left, right = LatencyHistogram(), LatencyHistogram()
+    for index, value in enumerate(values):
+        whole.record(value)
+        (left if index % 2 else right).record(value)
+    merged = LatencyHistogram().merge(left).merge(right)
+
+    summary = whole.summary()
+    assert merged.summary() == summary
+    assert summary["count"] == 10_000
+    assert summary["p99_ms"] < 0.21
+    assert 40.0 <= summary["p99_9_ms"] <= summary["max_ms"] == max(values) / 1_000_000
+    ordered = sorted(values)
+    assert abs(whole.percentile_ns(50) - ordered[4_999]) <= ordered[4_999] / 128
+
+
+def test_batch_rows_with_different_latencies_report_different_percentiles(monkeypatch):
+    original = TOOL_SPECS["extract_metadata"]
+
+    def extract(triage_input, features, context, deadline):
+        time.sleep(int(triage_input.doc_id.rsplit("-", 1)[1]) / 1_000)
+        return original.func(triage_input, features, context, deadline)
+
+    monkeypatch.setitem(TOOL_SPECS, "extract_metadata", replace(original, func=extract))
+    samples = [{**_payload(), "doc_id": f"DOC-LAT-{delay_ms}"} for delay_ms in range(0, 40, 4)]
+
+    accumulator = MetricsAccumulator(latency=True)
+    for decision in triage_batch(samples, mode="agent"):
+        accumulator.add(decision.model_dump(), None)
+    latency = accumulator.finalize()["latency"]
+
+    assert latency["count"] == 10
+    assert latency["p50_ms"] < latency["p90_ms"] < latency["max_ms"]
+    assert 16.0 <= latency["p50_ms"] < 30.0
+    assert latency["max_ms"] >= 36.0
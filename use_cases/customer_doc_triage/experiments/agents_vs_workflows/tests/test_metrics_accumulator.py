@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import random
+from itertools import pairwise
+from pathlib import Path
+from statistics import mean
+
+import pytest
+from customer_doc_triage.batch.pipeline import triage_batch
+from customer_doc_triage.eval.metrics import MetricsAccumulator, distinct_step_patterns, score
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _load(name: str) -> list[dict]:
+    with (DATA_DIR / name).open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+@pytest.fixture(scope="module")
+def scored_corpus():
+    gold = {row["doc_id"]: row for row in _load("gold.jsonl")}
+    predictions = {
+        mode: [
+            decision.model_dump() for decision in triage_batch(_load("samples.jsonl"), mode=mode)
+        ]
+        for mode in ("workflow", "agent")
+    }
+    # A prediction without gold still counts towards the accuracy denominators.
+    predictions["agent"].append({**predictions["agent"][0], "doc_id": "DOC-NO-GOLD"})
+    return predictions, gold
+
+
+def test_score_matches_direct_computation(scored_corpus):
+    predictions, gold = scored_corpus
+
+    for mode_predictions in predictions.values():
+        summary = score(mode_predictions, gold, latency=True)
+        scored = [(row, gold[row["doc_id"]]) for row in mode_predictions if row["doc_id"] in gold]
+        flagged = [gold_row["escalate"] for row, gold_row in scored if row["escalate"]]
+        actual = [row["escalate"] for row, gold_row in scored if gold_row["escalate"]]
+        recalls = [
+            len(set(row["required_missing_fields"]) & set(gold_row["required_missing_fields"]))
+            / len(gold_row["required_missing_fields"])
+            if gold_row["required_missing_fields"]
+            else 1.0
+            for row, gold_row in scored
+        ]
+        traces = [row["decision_trace"] for row in mode_predictions]
+
+        assert summary["doc_type_accuracy"] == sum(
+            row["doc_type"] == gold_row["true_doc_type"] for row, gold_row in scored
+        ) / len(mode_predictions)
+        assert summary["queue_accuracy"] == sum(
+            row["recommended_queue"] == gold_row["recommended_queue"] for row, gold_row in scored
+        ) / len(mode_predictions)
+        assert summary["escalation_precision"] == sum(flagged) / len(flagged)
+        assert summary["escalation_recall"] == sum(actual) / len(actual)
+        assert summary["missing_field_recall"] == mean(recalls)
+        assert summary["avg_elapsed_ms"] == mean(trace["elapsed_ms"] for trace in traces)
+        assert summary["avg_tool_calls"] == mean(trace["tool_calls"] for trace in traces)
+        assert summary["distinct_step_patterns"] == distinct_step_patterns(mode_predictions)
+        edge_cases = [
+            bool(gold_row["escalate"] or gold_row["required_missing_fields"])
+            for _, gold_row in scored
+        ]
+        assert summary["slices"]["slice:edge_case"]["count"] == sum(edge_cases)
+        assert sum(
+            slice_metrics["count"]
+            for label, slice_metrics in summary["slices"].items()
+            if label.startswith("doc_type:")
+        ) == len(scored)
+        for slice_metrics in summary["slices"].values():
+            assert slice_metrics.pop("latency")["count"] == slice_metrics["count"]
+
+        # Without the latency report no histogram is recorded or returned.
+        plain = score(mode_predictions, gold)
+        assert "latency" not in plain and "stage_latency" not in plain
+        assert all("latency" not in slice_metrics for slice_metrics in plain["slices"].values())
+        del summary["latency"], summary["stage_latency"]
+        assert plain == summary
+
+
+def test_merged_shard_accumulators_finalize_to_serial_summary(scored_corpus):
+    predictions, gold = scored_corpus
+    randomizer = random.Random(11)
+
+    for mode_predictions in predictions.values():
+        cuts = sorted(randomizer.sample(range(1, len(mode_predictions)), 5))
+        bounds = [0, *cuts, len(mode_predictions)]
+        merged = MetricsAccumulator()
+        for start, end in pairwise(bounds):
+            shard = MetricsAccumulator()
+            for prediction in mode_predictions[start:end]:
+                shard.add(prediction, gold.get(prediction["doc_id"]))
+            merged.merge(shard)
+
+        assert json.dumps(merged.finalize()) == json.dumps(score(mode_predictions, gold))
+
+
+def test_empty_accumulator_finalizes_to_zeroes():
+    assert score([], {}) == MetricsAccumulator().merge(MetricsAccumulator()).finalize()
+    assert score([], {})["avg_elapsed_ms"] == 0.0
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+from customer_doc_triage.agent import tools as agent_tools
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.telemetry import REGISTRY, MetricsRegistry, serve_metrics
+from customer_doc_triage.telemetry.instruments import DECISION_LATENCY, DECISIONS, GUARDRAIL_BLOCKS
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+
+def _payload(**metadata_overrides):
+    return {
+        "doc_id": "DOC-METRICS-001",
+        "channel": "email",
+        "customer_id": "CUST-7",
+        "customer_tier": "growth",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "billing dispute",
+        "content": "Customer disputes invoice due to duplicate charge.",
+        "metadata": {"issue_type": "duplicate charge", "invoice_id": "INV-7", **metadata_overrides},
+    }
+
+
+def test_counters_sum_updates_from_many_threads():
+    registry = MetricsRegistry()
+    counter = registry.counter("jobs_total", "Jobs.", ("kind",))
+
+    def work():
+        for _ in range(1_000):
+            counter.labels("a").inc()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.labels(kind="a").value() == 8_000
+    with pytest.raises(ValueError):
+        counter.labels("a").inc(-1)
+    with pytest.raises(ValueError):
+        registry.counter("jobs_total", "Duplicate.")
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    registry.gauge("depth", 'Queue "depth".').set(2)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+        '# HELP depth Queue "depth".',
+        "# TYPE depth gauge",
+        "depth 2",
+    ]
+
+
+def test_registering_the_same_definition_returns_the_live_metric():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests.", ("mode",))
+    counter.labels(mode="workflow").inc()
+
+    assert registry.counter("requests_total", "Requests.", ("mode",)) is counter
+    with pytest.raises(ValueError, match="requests_total"):
+        registry.gauge("requests_total", "Requests.", ("mode",))
+    with pytest.raises(ValueError, match="requests_total"):
+        registry.counter("requests_total", "Requests.", ("channel",))
+    assert 'requests_total{mode="workflow"} 1' in registry.render()
+
+
+def test_reloading_the_tools_module_keeps_the_cache_gauge():
+    gauge = REGISTRY.get("triage_tool_cache_entries")
+    namespace = dict(vars(agent_tools))
+    try:
+        importlib.reload(agent_tools)
+    finally:
+        vars(agent_tools).update(namespace)
+
+    assert REGISTRY.get("triage_tool_cache_entries") is gauge
+    assert "\ntriage_tool_cache_entries " in REGISTRY.render()
+
+
+def test_runners_record_outcomes_guardrails_and_latency():
+    fail_closed = DECISIONS.labels("workflow", "fail_closed").value()
+    budget_blocks = GUARDRAIL_BLOCKS.labels("agent", "guardrail_tool_budget_exceeded").value()
+    agent_latency_count = DECISION_LATENCY.labels("agent").snapshot()[0][-1]
+
+    run_workflow(_payload(_force_validation_failure=True))
+    run_agentic(_payload(), max_tool_calls=1)
+
+    assert DECISIONS.labels("workflow", "fail_closed").value() == fail_closed + 1
+    assert (
+        GUARDRAIL_BLOCKS.labels("agent", "guardrail_tool_budget_exceeded").value()
+        == budget_blocks + 1
+    )
+    assert DECISION_LATENCY.labels("agent").snapshot()[0][-1] == agent_latency_count + 1
+
+
+def test_scrape_endpoint_serves_text_exposition():
+    registry = MetricsRegistry()
+    registry.counter("scrapes_total", "Scrapes.").inc(3)
+    server = serve_metrics(0, registry=registry)
+    try:
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        with urlopen(f"{base_url}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert "scrapes_total 3" in response.read().decode("utf-8")
+        with pytest.raises(HTTPError):
+            urlopen(f"{base_url}/other")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import csv
+import json
+from itertools import pairwise
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.ingest import (
+    IngestError,
+    JsonlIndex,
+    Quarantine,
+    build_offset_index,
+    default_index_path,
+    iter_json_objects,
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _write_lines(path: Path, lines: list[str]) -> Path:
+    path.write_bytes("".join(lines).encode("utf-8"))
+    return path
+
+
+def test_index_looks_up_rows_by_doc_id_with_later_rows_winning(tmp_path):
+    source = _write_lines(
+        tmp_path / "gold.jsonl",
+        [
+            json.dumps({"doc_id": "DOC-B", "version": 1}) + "\r\n",
+            "\n",
+            "   " + json.dumps({"doc_id": "DOC-A", "version": 1}) + "  \n",
+            json.dumps({"doc_id": "DOC-É", "version": 1}) + "\n",
+            json.dumps({"doc_id": "DOC-B", "version": 2}),
+        ],
+    )
+
+    with JsonlIndex.open(source) as index:
+        assert index.index_path == default_index_path(source)
+        assert len(index) == 4
+        assert index.get("DOC-B") == {"doc_id": "DOC-B", "version": 2}
+        assert index.get("DOC-É") == {"doc_id": "DOC-É", "version": 1}
+        assert index.get("DOC-Z") is None
+        assert index.line_number(index.row_of("DOC-A")) == 3
+        assert index.missing(["DOC-A", "DOC-Z", "DOC-Z"]) == ["DOC-Z"]
+        assert index.rows_for(["DOC-B", "DOC-A"]) == [1, 3]
+        assert list(index.rows(1, 3)) == list(iter_json_objects(source))[1:3]
+
+
+def test_malformed_rows_are_quarantined_or_raise(tmp_path):
+    source = _write_lines(
+        tmp_path / "gold.jsonl",
+        [json.dumps({"doc_id": "DOC-A"}) + "\n", "{not json\n", json.dumps({"id": 1}) + "\n"],
+    )
+
+    with pytest.raises(IngestError, match=":2:"):
+        build_offset_index(source)
+    assert not default_index_path(source).exists()
+
+    with (
+        Quarantine(tmp_path / "quarantine.jsonl") as quarantine,
+        JsonlIndex.open(source, quarantine=quarantine) as index,
+    ):
+        assert len(index) == 1
+    assert quarantine.count == 2
+
+
+def test_stale_index_is_rebuilt_when_the_source_changes(tmp_path):
+    source = _write_lines(tmp_path / "gold.jsonl", [json.dumps({"doc_id": "DOC-A"}) + "\n"])
+    JsonlIndex.open(source).close()
+
+    with source.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps({"doc_id": "DOC-B"}) + "\n")
+    with pytest.raises(ValueError, match="stale"):
+        JsonlIndex(source)
+    with JsonlIndex.open(source) as index:
+        assert index.missing(["DOC-A", "DOC-B"]) == []
+
+    default_index_path(source).write_bytes(b"not an index")
+    with JsonlIndex.open(source) as index:
+        assert len(index) == 2
+
+
+def test_shard_ranges_cover_every_row_once(tmp_path):
+    source = _write_lines(
+        tmp_path / "samples.jsonl",
+        [json.dumps({"doc_id": f"DOC-{row}", "pad": "x" * (row % 7)}) + "\n" for row in range(50)],
+    )
+
+    with JsonlIndex.open(source) as index:
+        for count in (1, 3, 8, 80):
+            ranges = index.shard_ranges(count)
+            assert ranges[0][0] == 0 and ranges[-1][1] == 50
+            assert all(left[1] == right[0] for left, right in pairwise(ranges))
+            assert len(ranges) <= count
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_run_eval_replays_only_selected_doc_ids(tmp_path, streaming):
+    with (DATA_DIR / "samples.jsonl").open("r", encoding="utf-8") as handle:
+        sample_lines = handle.readlines()[:30]
+    with (DATA_DIR / "gold.jsonl").open("r", encoding="utf-8") as handle:
+        gold_lines = handle.readlines()[:30]
+    samples_path = _write_lines(tmp_path / "samples.jsonl", sample_lines)
+    gold_path = _write_lines(tmp_path / "gold.jsonl", gold_lines)
+    doc_ids = [json.loads(line)["doc_id"] for line in sample_lines]
+    selected = [doc_ids[12], doc_ids[3], doc_ids[25]]
+
+    result = run_eval(
+        samples_path, gold_path, tmp_path / "out", streaming=streaming, doc_ids=selected
+    )
+
+    with Path(result["predictions_csv"]).open(encoding="utf-8", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    expected = [doc_ids[3], doc_ids[12], doc_ids[25]]
+    assert result["summary"]["corpus_size"] == 3
+    assert [row["doc_id"] for row in rows if row["mode"] == "workflow"] == expected
+    assert default_index_path(samples_path).exists()
+
+    with pytest.raises(ValueError, match="DOC-MISSING"):
+        run_eval(samples_path, gold_path, tmp_path / "out", doc_ids=["DOC-MISSING"])
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.eval.harness import run_eval
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+TIMING_COLUMNS = {"elapsed_ms", "elapsed_ns"}
+
+
+def _predictions(output_dir: Path) -> list[dict]:
+    with (output_dir / "per_case_predictions.csv").open("r", encoding="utf-8") as handle:
+        return [
+            {key: value for key, value in row.items() if key not in TIMING_COLUMNS}
+            for row in csv.DictReader(handle)
+        ]
+
+
+def _summary(output_dir: Path) -> dict:
+    summary = json.loads((output_dir / "ab_eval_summary.json").read_text(encoding="utf-8"))
+    for metrics in summary["modes"].values():
+        for usage in metrics["tool_usage"].values():
+            usage.pop("total_elapsed_ms")
+            usage.pop("avg_elapsed_ms")
+        metrics.pop("avg_elapsed_ms")
+        metrics.pop("latency")
+        metrics["stage_latency"] = {
+            stage: latency["count"] for stage, latency in metrics["stage_latency"].items()
+        }
+        for slice_metrics in metrics["slices"].values():
+            slice_metrics.pop("latency")
+    return summary
+
+
+def test_sharded_eval_matches_serial_run_in_corpus_order(tmp_path: Path):
+    samples_path = tmp_path / "samples.jsonl"
+    with (DATA_DIR / "samples.jsonl").open("r", encoding="utf-8") as handle:
+        samples_path.write_text("".join(handle.readlines()[:50]), encoding="utf-8")
+
+    serial = run_eval(samples_path, DATA_DIR / "gold.jsonl", tmp_path / "serial")
+    sharded = run_eval(samples_path, DATA_DIR / "gold.jsonl", tmp_path / "sharded", workers=3)
+
+    assert _predictions(tmp_path / "sharded") == _predictions(tmp_path / "serial")
+    assert _summary(tmp_path / "sharded") == _summary(tmp_path / "serial")
+    assert sharded["summary"]["corpus_size"] == serial["summary"]["corpus_size"] == 50
+
+
+def test_eval_rejects_non_positive_workers(tmp_path: Path):
+    with pytest.raises(ValueError):
+        run_eval(DATA_DIR / "samples.jsonl", DATA_DIR / "gold.jsonl", tmp_path, workers=0)
@@ -6,8 +6,12 @@ import pytest
 from pydantic import ValidationError
 
 from customer_doc_triage.triage.policies import (
+    REQUIRED_FIELDS_BY_DOC_TYPE,
     find_required_missing_fields,
+    infer_priority,
+    present_fields_mask,
     recommend_queue,
+    resolve_policy,
     should_escalate,
 )
 from customer_doc_triage.triage.schemas import DecisionTrace, TriageDecision, TriageInput
@@ -130,4 +134,21 @@ def test_validate_triage_decision_reports_queue_and_missing_field_mismatch():
 
     violations = validate_triage_decision(triage_input, decision)
     assert any("recommended_queue mismatch" in violation for violation in violations)
-    assert any("required_missing_fields mismatch" in violation for violation in violations)
\ No newline at end of file
+    assert any("required_missing_fields mismatch" in violation for violation in violations)
+
+
+def test_resolve_policy_table_matches_rule_evaluation_for_every_combination():
+    for doc_type, required in REQUIRED_FIELDS_BY_DOC_TYPE.items():
+        for tier in ("enterprise", "growth", "standard", None):
+            for mask in range(1 << len(required)):
+                metadata = {field: "x" for bit, field in enumerate(required) if mask & (1 << bit)}
+                missing = find_required_missing_fields(doc_type, metadata)
+                priority, severity = infer_priority(doc_type, tier, missing)
+                escalate, reason = should_escalate(doc_type, tier, missing, priority)
+
+                outcome = resolve_policy(doc_type, tier, present_fields_mask(doc_type, metadata))
+
+                assert outcome.required_missing_fields == tuple(missing)
+                assert (outcome.priority, outcome.severity) == (priority, severity)
+                assert outcome.queue == recommend_queue(doc_type)
+                assert (outcome.escalate, outcome.escalation_reason) == (escalate, reason)
@@ -86,4 +86,9 @@ def test_eval_harness_generates_summary_and_artifacts(tmp_path: Path):
 
     assert (output_dir / "ab_eval_summary.json").exists()
     assert (output_dir / "ab_eval_summary.md").exists()
-    assert (output_dir / "per_case_predictions.csv").exists()
\ No newline at end of file
+    assert (output_dir / "per_case_predictions.csv").exists()
+
+    escalate = summary["modes"]["workflow"]["confusion_matrices"]["escalate"]
+    assert sum(map(sum, escalate["matrix"])) == 2
+    markdown = (output_dir / "ab_eval_summary.md").read_text(encoding="utf-8")
+    assert "### agent: recommended_queue" in markdown
\ No newline at end of file
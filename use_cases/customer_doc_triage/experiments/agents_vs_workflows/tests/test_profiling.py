@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import pstats
+
+import pytest
+from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.telemetry import StageProfiler, profile_stage, profiling
+
+
+def _samples(count: int) -> list[dict]:
+    return [
+        {
+            "doc_id": f"DOC-PROF-{index:03d}",
+            "channel": "email",
+            "customer_id": f"CUST-{index}",
+            "customer_tier": "growth",
+            "region": "NA",
+            "submitted_at": "2026-02-16T12:00:00Z",
+            "doc_type_hint": "billing dispute",
+            "content": "Customer disputes invoice due to duplicate charge.",
+            "metadata": {"issue_type": "duplicate charge", "invoice_id": f"INV-{index}"},
+        }
+        for index in range(count)
+    ]
+
+
+def _busy(n: int) -> int:
+    return sum(value * value for value in range(n))
+
+
+def test_cpu_profile_covers_eval_stages(tmp_path):
+    samples_path = tmp_path / "samples.jsonl"
+    samples_path.write_text("".join(json.dumps(row) + "\n" for row in _samples(4)))
+    gold_path = tmp_path / "gold.jsonl"
+    gold_path.write_text("")
+
+    with profiling("cpu") as profiler:
+        run_eval(samples_path, gold_path, tmp_path / "out")
+    written = profiler.write(tmp_path / "profile")
+
+    assert profiler.stages == ["ingest", "workflow", "agent", "score", "write"]
+    assert {path.name for path in written} >= {"cpu-agent.pstats", "cpu-agent.collapsed"}
+    assert pstats.Stats(str(tmp_path / "profile" / "cpu-workflow.pstats")).total_calls > 0
+    collapsed = (tmp_path / "profile" / "cpu-agent.collapsed").read_text().splitlines()
+    assert collapsed and all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    assert "| Stage | Function | Calls | Self s | Cumulative s |" in profiler.hotspot_table(5)
+
+
+def test_nested_stage_suspends_parent():
+    profiler = StageProfiler("cpu")
+    with profiler.stage("outer"), profiler.stage("inner"):
+        _busy(200_000)
+
+    outer = {func[2] for func in pstats.Stats(profiler._cpu["outer"]).stats}
+    inner = {func[2] for func in pstats.Stats(profiler._cpu["inner"]).stats}
+    assert "_busy" in inner and "_busy" not in outer
+
+
+def test_mem_profile_attributes_allocations_to_stage(tmp_path):
+    with profiling("mem") as profiler:
+        with profile_stage("ingest"):
+            retained = [bytearray(1024) for _ in range(256)]
+        with profile_stage("score"):
+            pass
+    written = profiler.write(tmp_path)
+
+    top = profiler.hotspots(1)[0]
+    assert top["stage"] == "ingest" and top["self"] >= 256 * 1024
+    assert profiler.stage_totals()["ingest"] >= 256 * 1024
+    assert (tmp_path / "mem-ingest.tracemalloc") in written
+    assert "test_profiling.py" in (tmp_path / "mem-ingest.collapsed").read_text()
+    assert len(retained) == 256
+
+
+def test_profile_stage_is_noop_without_profiler_and_rejects_nesting():
+    with profile_stage("ingest"):
+        pass
+    with profiling("cpu"), pytest.raises(RuntimeError), profiling("mem"):
+        pass
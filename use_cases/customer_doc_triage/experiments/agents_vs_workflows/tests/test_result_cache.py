@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.eval import ModeConfig, ResultCache, replay, run_eval
+from customer_doc_triage.eval.result_cache import input_digest, is_cacheable
+from customer_doc_triage.ingest import load_corpus
+from customer_doc_triage.triage.schemas import TriageInput
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _copy_corpus(tmp_path: Path, rows: int) -> tuple[Path, Path]:
+    samples_path = tmp_path / "samples.jsonl"
+    gold_path = tmp_path / "gold.jsonl"
+    for name, target in (("samples.jsonl", samples_path), ("gold.jsonl", gold_path)):
+        with (DATA_DIR / name).open("rb") as handle:
+            target.write_bytes(b"".join(handle.readlines()[:rows]))
+    return samples_path, gold_path
+
+
+def _csv_without_elapsed(path: Path) -> list[dict[str, str]]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        return [
+            {key: value for key, value in row.items() if not key.startswith("elapsed")}
+            for row in csv.DictReader(handle)
+        ]
+
+
+def test_input_digest_ignores_metadata_key_order():
+    row = json.loads((DATA_DIR / "samples.jsonl").read_text(encoding="utf-8").splitlines()[0])
+    reordered = {**row, "metadata": dict(reversed(list(row["metadata"].items())))}
+
+    assert input_digest(TriageInput(**row)) == input_digest(TriageInput(**reordered))
+    assert input_digest(TriageInput(**row)) != input_digest(
+        TriageInput(**{**row, "content": row["content"] + " Updated."})
+    )
+
+
+def test_keys_cover_mode_parameters_and_engine_fingerprint(tmp_path):
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        base = cache.key("digest", ModeConfig("agent", "agent"))
+        assert cache.key("digest", ModeConfig("renamed", "agent")) == base
+        for config in (
+            ModeConfig("agent", "workflow"),
+            ModeConfig("agent", "agent", max_retries=2),
+            ModeConfig("agent", "agent", max_tool_calls=1),
+            ModeConfig("agent", "agent", timeout_ms=10),
+        ):
+            assert cache.key("digest", config) != base
+    with ResultCache(tmp_path / "cache.sqlite", fingerprint="other-engine") as cache:
+        assert cache.key("digest", ModeConfig("agent", "agent")) != base
+
+
+def test_replay_only_runs_new_documents(tmp_path):
+    samples_path, _ = _copy_corpus(tmp_path, 12)
+    corpus = load_corpus(samples_path)
+    configs = [
+        ModeConfig("workflow", "workflow"),
+        ModeConfig("budget_1", "agent", max_tool_calls=1),
+    ]
+
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        first = replay(corpus[:8], configs, cache=cache)
+        assert (cache.hits, cache.misses) == (0, 16)
+        second = replay(corpus, configs, cache=cache)
+        assert (cache.hits, cache.misses) == (16, 24)
+
+    uncached = replay(corpus, configs)
+    for name in ("workflow", "budget_1"):
+        assert second[name][:8] == first[name]
+        assert [row["doc_id"] for row in second[name]] == [item.doc_id for item in corpus]
+        assert {row["mode"] for row in second[name]} == {name}
+        strip = [{**row, "decision_trace": None} for row in second[name]]
+        assert strip == [{**row, "decision_trace": None} for row in uncached[name]]
+
+
+def test_timeouts_are_never_cached(tmp_path):
+    prediction = {"decision_trace": {"steps": ["plan", "guardrail_timeout"]}}
+    assert not is_cacheable(prediction)
+
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        assert cache.put_many([("k1", prediction), ("k2", {"decision_trace": {"steps": []}})]) == 1
+        assert list(cache.get_many(["k1", "k2"])) == ["k2"]
+
+
+def test_run_eval_prunes_results_from_other_engine_versions(tmp_path):
+    samples_path, gold_path = _copy_corpus(tmp_path, 4)
+    cache_path = tmp_path / "cache.sqlite"
+    stale = {"decision_trace": {"steps": []}}
+    with ResultCache(cache_path, fingerprint="old-engine") as cache:
+        cache.put_many([("old-1", stale), ("old-2", stale)])
+
+    result = run_eval(samples_path, gold_path, tmp_path / "out", cache_path=cache_path)
+
+    assert result["cache"]["pruned"] == 2
+    with ResultCache(cache_path) as cache:
+        assert cache.get_many(["old-1", "old-2"]) == {}
+        assert cache.prune() == 0
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_run_eval_serves_unchanged_documents_from_cache(tmp_path, streaming):
+    samples_path, gold_path = _copy_corpus(tmp_path, 20)
+    cache_path = tmp_path / "cache.sqlite"
+
+    def run(name: str) -> dict:
+        return run_eval(
+            samples_path, gold_path, tmp_path / name, streaming=streaming, cache_path=cache_path
+        )
+
+    cold = run("cold")
+    warm = run("warm")
+
+    assert cold["cache"]["hits"] == 0
+    assert warm["cache"] == {"path": str(cache_path), "hits": 40, "misses": 0, "pruned": 0}
+    for mode in ("workflow", "agent"):
+        assert cold["summary"]["modes"][mode]["cached_rows"] == 0
+        assert cold["summary"]["modes"][mode]["latency"]["count"] == 20
+        # Cached rows carry timings from the cold run, so they are not latency samples.
+        assert warm["summary"]["modes"][mode]["cached_rows"] == 20
+        assert warm["summary"]["modes"][mode]["latency"]["count"] == 0
+        assert warm["summary"]["modes"][mode]["avg_elapsed_ms"] == 0.0
+    assert "| workflow | 0 | 20 |" in Path(warm["summary_md"]).read_text(encoding="utf-8")
+    assert warm["summary"]["modes"]["workflow"]["doc_type_accuracy"] == pytest.approx(
+        cold["summary"]["modes"]["workflow"]["doc_type_accuracy"]
+    )
+    assert _csv_without_elapsed(Path(warm["predictions_csv"])) == _csv_without_elapsed(
+        Path(cold["predictions_csv"])
+    )
+
+    lines = samples_path.read_text(encoding="utf-8").splitlines(keepends=True)
+    edited = json.loads(lines[4])
+    edited["content"] += " Please also check the invoice."
+    lines[4] = json.dumps(edited) + "\n"
+    samples_path.write_text("".join(lines), encoding="utf-8")
+
+    delta = run("delta")
+    assert delta["cache"]["misses"] == 2
+    assert delta["cache"]["hits"] == 38
+    assert delta["summary"]["modes"]["agent"]["latency"]["count"] == 1
+    assert delta["summary"]["modes"]["agent"]["cached_rows"] == 19
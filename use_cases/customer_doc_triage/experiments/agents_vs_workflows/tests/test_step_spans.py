@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.eval.metrics import score
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+
+def _payload(**metadata_overrides):
+    return {
+        "doc_id": "DOC-SPAN-001",
+        "channel": "email",
+        "customer_id": "CUST-7",
+        "customer_tier": "growth",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "billing dispute",
+        "content": "Customer disputes invoice due to duplicate charge.",
+        "metadata": {"issue_type": "duplicate charge", "invoice_id": "INV-7", **metadata_overrides},
+    }
+
+
+def _assert_spans_fit_trace(trace) -> None:
+    starts = [span.start_ns for span in trace.spans]
+    assert starts == sorted(starts)
+    for span in trace.spans:
+        assert span.start_ns + span.duration_ns <= trace.elapsed_ns
+
+
+def test_workflow_spans_cover_each_attempt_and_fail_closed_assembly():
+    trace = run_workflow(_payload(_force_validation_failure=True)).decision_trace
+
+    assert [span.name for span in trace.spans] == [
+        "parse_input",
+        "classify_and_plan",
+        "build_candidate_attempt_0",
+        "validate_candidate",
+        "build_candidate_attempt_1",
+        "validate_candidate",
+        "escalate_fail_closed",
+    ]
+    _assert_spans_fit_trace(trace)
+
+
+def test_agent_spans_record_each_tool():
+    trace = run_agentic(_payload()).decision_trace
+    names = [span.name for span in trace.spans]
+
+    assert names[:2] == ["parse_input", "agent_plan_start"]
+    assert [name for name in names if name.startswith("tool:")] == [
+        step for step in trace.steps if step.startswith("tool:")
+    ]
+    assert "assemble_candidate" in names
+    _assert_spans_fit_trace(trace)
+
+
+def test_score_reports_per_stage_latency():
+    predictions = [
+        decision.model_dump() for decision in (run_workflow(_payload()), run_agentic(_payload()))
+    ]
+    stage_latency = score(predictions, {}, latency=True)["stage_latency"]
+
+    assert list(stage_latency) == sorted(stage_latency)
+    assert stage_latency["parse_input"]["count"] == 2
+    assert all(latency["max_ms"] >= latency["p50_ms"] for latency in stage_latency.values())
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from customer_doc_triage.eval.gold_index import GoldIndex
+from customer_doc_triage.eval.harness import run_eval
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _strip_timings(summary: dict) -> dict:
+    for metrics in summary["modes"].values():
+        metrics.pop("avg_elapsed_ms")
+        metrics.pop("tool_usage")
+        metrics.pop("latency")
+        metrics["stage_latency"] = {
+            stage: latency["count"] for stage, latency in metrics["stage_latency"].items()
+        }
+        for slice_metrics in metrics["slices"].values():
+            slice_metrics.pop("latency")
+    return summary
+
+
+def _csv_without_elapsed(path: Path) -> list[list[str]]:
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.rsplit(",", 2)[0].split(",") for line in lines]
+
+
+def test_streaming_eval_matches_in_memory_eval(tmp_path: Path):
+    with (DATA_DIR / "samples.jsonl").open("r", encoding="utf-8") as handle:
+        sample_lines = handle.readlines()[:40]
+    with (DATA_DIR / "gold.jsonl").open("r", encoding="utf-8") as handle:
+        gold_lines = handle.readlines()[:35]
+
+    samples_path = tmp_path / "samples.jsonl"
+    gold_path = tmp_path / "gold.jsonl"
+    samples_path.write_text("".join(sample_lines), encoding="utf-8")
+    gold_path.write_text("".join(gold_lines), encoding="utf-8")
+
+    in_memory = run_eval(samples_path, gold_path, tmp_path / "in_memory")
+    streamed = run_eval(
+        samples_path, gold_path, tmp_path / "streamed", streaming=True, chunk_size=7
+    )
+
+    assert _strip_timings(streamed["summary"]) == _strip_timings(in_memory["summary"])
+    assert _csv_without_elapsed(Path(streamed["predictions_csv"])) == _csv_without_elapsed(
+        Path(in_memory["predictions_csv"])
+    )
+    assert sorted(path.name for path in (tmp_path / "streamed").iterdir()) == [
+        "ab_eval_summary.json",
+        "ab_eval_summary.md",
+        "per_case_predictions.csv",
+    ]
+
+
+def test_gold_index_returns_latest_row_per_doc_id(tmp_path: Path):
+    gold_path = tmp_path / "gold.jsonl"
+    rows = [
+        {"doc_id": "DOC-1", "escalate": False},
+        {"doc_id": "DOC-2", "escalate": True},
+        {"doc_id": "DOC-1", "escalate": True},
+    ]
+    gold_path.write_text("\n".join(json.dumps(row) for row in rows) + "\n\n", encoding="utf-8")
+
+    with GoldIndex.build(gold_path, tmp_path / "gold.sqlite", batch_size=2) as index:
+        found = index.get_many(["DOC-1", "DOC-3", "DOC-1"])
+
+    assert found == {"DOC-1": {"doc_id": "DOC-1", "escalate": True}}
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import pytest
+from customer_doc_triage.agent.pipeline import arun_agentic, run_agentic
+from customer_doc_triage.agent.tools import TOOL_SPECS, ToolSpec, register_tool
+from customer_doc_triage.batch import triage_batch
+from customer_doc_triage.eval.metrics import score
+
+
+def _agent_input(**overrides):
+    payload = {
+        "doc_id": "DOC-REG-001",
+        "channel": "portal",
+        "customer_id": "CUST-4",
+        "customer_tier": "enterprise",
+        "region": "EU",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "access request",
+        "content": "Grant privileged admin role to a contractor for the audit.",
+        "metadata": {"requested_role": "admin", "justification": "audit"},
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_registry_declares_cost_class_and_rejects_bad_budgets(monkeypatch):
+    assert TOOL_SPECS["lookup_policy_context"].cost_class == "io"
+    assert TOOL_SPECS["lookup_policy_context"].timeout_ms == 500
+
+    with pytest.raises(ValueError):
+        register_tool(ToolSpec(name="broken", func=lambda *args: {}, timeout_ms=0))
+
+    monkeypatch.setitem(TOOL_SPECS, "risk_scan", TOOL_SPECS["risk_scan"])
+    spec = register_tool(replace(TOOL_SPECS["risk_scan"], cost_class="expensive"))
+    assert TOOL_SPECS["risk_scan"] is spec
+
+
+def test_tool_stats_record_calls_and_wall_time_per_tool():
+    trace = run_agentic(_agent_input()).decision_trace
+
+    assert {name: stats.calls for name, stats in trace.tool_stats.items()} == {
+        "detect_doc_type": 1,
+        "lookup_policy_context": 1,
+        "risk_scan": 1,
+        "check_completeness": 1,
+    }
+    assert all(stats.elapsed_ms >= 0.0 for stats in trace.tool_stats.values())
+
+
+def test_per_tool_timeout_fails_closed_inline(monkeypatch):
+    def slow_lookup(triage_input, features, context, deadline):
+        time.sleep(0.05)
+        return {"customer_tier": None, "region": None, "requires_heightened_review": False}
+
+    spec = replace(TOOL_SPECS["lookup_policy_context"], func=slow_lookup, timeout_ms=10)
+    monkeypatch.setitem(TOOL_SPECS, "lookup_policy_context", spec)
+
+    decision = run_agentic(_agent_input(), timeout_ms=2_000)
+
+    assert decision.escalate is True
+    assert decision.decision_trace.steps[-1] == "guardrail_tool_timeout:lookup_policy_context"
+    assert "lookup_policy_context" in decision.escalation_reason
+
+
+def test_per_tool_timeout_stops_waiting_on_executor(monkeypatch):
+    release = threading.Event()
+
+    def stalled_lookup(triage_input, features, context, deadline):
+        release.wait(timeout=5)
+        return {"customer_tier": None, "region": None, "requires_heightened_review": False}
+
+    spec = replace(TOOL_SPECS["lookup_policy_context"], func=stalled_lookup, timeout_ms=20)
+    monkeypatch.setitem(TOOL_SPECS, "lookup_policy_context", spec)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        decision = run_agentic(_agent_input(), timeout_ms=2_000, tool_executor=executor)
+        waited_s = time.perf_counter() - started
+        release.set()
+
+    assert waited_s < 1.0
+    assert decision.decision_trace.steps[-1] == "guardrail_tool_timeout:lookup_policy_context"
+
+
+@pytest.mark.parametrize("path", ["inline", "executor", "batch", "async"])
+def test_coroutine_tools_run_on_every_path(monkeypatch, path):
+    sync_risk_scan = TOOL_SPECS["risk_scan"].func
+    expected = run_agentic(_agent_input()).model_dump(exclude={"decision_trace"})
+
+    async def async_risk_scan(triage_input, features, context, deadline):
+        await asyncio.sleep(0)
+        return sync_risk_scan(triage_input, features, context, deadline)
+
+    monkeypatch.setitem(TOOL_SPECS, "risk_scan", TOOL_SPECS["risk_scan"])
+    register_tool(replace(TOOL_SPECS["risk_scan"], func=async_risk_scan))
+
+    if path == "inline":
+        decision = run_agentic(_agent_input())
+    elif path == "executor":
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            decision = run_agentic(_agent_input(), tool_executor=executor)
+    elif path == "batch":
+        (decision,) = triage_batch([_agent_input()], mode="agent")
+    else:
+        decision = asyncio.run(arun_agentic(_agent_input()))
+
+    assert decision.model_dump(exclude={"decision_trace"}) == expected
+    assert decision.decision_trace.tool_stats["risk_scan"].calls == 1
+
+
+def test_tool_usage_aggregates_across_a_run():
+    samples = [
+        _agent_input(doc_id=f"DOC-REG-{index:03d}") for index in range(5)
+    ]
+    predictions = [decision.model_dump() for decision in triage_batch(samples, mode="agent")]
+
+    usage = score(predictions, {})["tool_usage"]
+
+    assert usage["detect_doc_type"]["calls"] == 5
+    assert usage["check_completeness"]["calls"] == 5
+    assert "extract_metadata" not in usage
+    assert usage["risk_scan"]["avg_elapsed_ms"] == pytest.approx(
+        usage["risk_scan"]["total_elapsed_ms"] / 5
+    )
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from dataclasses import replace
+
+import pytest
+from customer_doc_triage.agent import tools as agent_tools
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.agent.tools import (
+    TOOL_SPECS,
+    ToolResultCache,
+    get_tool_cache,
+    set_tool_cache,
+    tool_cache_key,
+)
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.schemas import TriageInput
+
+
+@pytest.fixture
+def fresh_cache():
+    cache = ToolResultCache(max_entries=64)
+    previous = set_tool_cache(cache)
+    yield cache
+    set_tool_cache(previous)
+
+
+def _agent_input(**overrides):
+    payload = {
+        "doc_id": "DOC-CACHE-001",
+        "channel": "portal",
+        "customer_id": "CUST-5",
+        "customer_tier": "enterprise",
+        "region": "EU",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "access request",
+        "content": "Grant privileged admin role to a contractor for the audit.",
+        "metadata": {"requested_role": "admin", "justification": "audit"},
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = ToolResultCache(max_entries=2, ttl_s=None)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+
+    cache.put("c", 3)
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.stats() == {"size": 2, "hits": 2, "misses": 1, "evictions": 1}
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(agent_tools, "monotonic", lambda: now[0])
+    cache = ToolResultCache(ttl_s=10.0)
+    cache.put("key", "value")
+
+    now[0] += 5.0
+    assert cache.get("key") == (True, "value")
+    now[0] += 6.0
+    assert cache.get("key") == (False, None)
+    assert len(cache) == 0
+
+
+def test_repeat_requests_hit_cache_with_per_tool_keys(fresh_cache):
+    first = run_agentic(_agent_input())
+    after_first = fresh_cache.stats()
+    second = run_agentic(
+        _agent_input(
+            doc_id="DOC-CACHE-002", customer_id="CUST-6", submitted_at="2026-02-17T09:00:00Z"
+        )
+    )
+
+    assert after_first["hits"] == 0
+    assert after_first["size"] == 3
+    assert fresh_cache.stats()["hits"] == 3
+    assert second.model_dump(exclude={"doc_id", "decision_trace"}) == first.model_dump(
+        exclude={"doc_id", "decision_trace"}
+    )
+
+    run_agentic(_agent_input(doc_id="DOC-CACHE-003", region="NA"))
+    assert fresh_cache.stats()["size"] == 4
+
+
+def test_swapping_a_tool_implementation_bypasses_stale_entries(fresh_cache, monkeypatch):
+    run_agentic(_agent_input())
+    calls = []
+
+    def counting_lookup(triage_input, features, context, deadline):
+        calls.append(triage_input.doc_id)
+        return {"customer_tier": "enterprise", "region": "EU", "requires_heightened_review": True}
+
+    spec = replace(TOOL_SPECS["lookup_policy_context"], func=counting_lookup)
+    monkeypatch.setitem(TOOL_SPECS, "lookup_policy_context", spec)
+    run_agentic(_agent_input(doc_id="DOC-CACHE-004"))
+    run_agentic(_agent_input(doc_id="DOC-CACHE-005"))
+
+    assert calls == ["DOC-CACHE-004"]
+
+
+def test_cache_is_opt_in():
+    assert get_tool_cache() is None
+    decision = run_agentic(_agent_input())
+    assert decision.decision_trace.tool_calls == 4
+
+
+def test_doc_type_key_digests_content(fresh_cache):
+    triage_input = TriageInput(**_agent_input(content="Grant admin role for the audit. " * 2_000))
+    key = tool_cache_key(
+        TOOL_SPECS["detect_doc_type"], triage_input, TriageFeatures(triage_input), {}
+    )
+
+    assert triage_input.content not in key[2]
+    assert len(repr(key)) < 500
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.telemetry import (
+    BatchSpanProcessor,
+    InMemorySpanExporter,
+    OtlpJsonFileExporter,
+    SpanData,
+    configure_tracing,
+    force_flush,
+    shutdown_tracing,
+    span,
+)
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _payload():
+    return {
+        "doc_id": "DOC-TRACE-001",
+        "channel": "email",
+        "customer_id": "CUST-7",
+        "customer_tier": "growth",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "billing dispute",
+        "content": "Customer disputes invoice due to duplicate charge.",
+        "metadata": {"issue_type": "duplicate charge", "invoice_id": "INV-7"},
+    }
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    configure_tracing(exporter)
+    yield exporter
+    shutdown_tracing()
+
+
+def test_runners_export_request_span_with_step_children(exporter):
+    decision = run_agentic(_payload())
+    assert force_flush()
+
+    root = next(item for item in exporter.spans if item.name == "triage.agent")
+    children = [item for item in exporter.spans if item.parent_span_id == root.span_id]
+    assert root.parent_span_id is None
+    assert root.attributes["triage.doc_id"] == "DOC-TRACE-001"
+    assert root.end_unix_ns - root.start_unix_ns == decision.decision_trace.elapsed_ns
+    assert [child.name for child in children] == [
+        step.name for step in decision.decision_trace.spans
+    ]
+    assert all(child.trace_id == root.trace_id for child in children)
+    assert all(root.start_unix_ns <= child.start_unix_ns for child in children)
+    assert {child.attributes.get("triage.tool") for child in children} >= {"detect_doc_type"}
+
+
+def test_decisions_nest_under_the_active_span(exporter):
+    with span("caller") as caller:
+        run_workflow(_payload())
+    force_flush()
+
+    root = next(item for item in exporter.spans if item.name == "triage.workflow")
+    assert (root.trace_id, root.parent_span_id) == (caller.trace_id, caller.span_id)
+
+
+def test_no_spans_without_an_exporter():
+    shutdown_tracing()
+    with span("ignored") as current:
+        run_workflow(_payload())
+    assert current is None
+    assert force_flush()
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path: Path):
+    trace_path = tmp_path / "traces.jsonl"
+    configure_tracing(OtlpJsonFileExporter(trace_path))
+    try:
+        samples_path = tmp_path / "samples.jsonl"
+        with (DATA_DIR / "samples.jsonl").open("r", encoding="utf-8") as handle:
+            samples_path.write_text("".join(handle.readlines()[:5]), encoding="utf-8")
+        run_eval(samples_path, DATA_DIR / "gold.jsonl", tmp_path / "out")
+    finally:
+        shutdown_tracing()
+
+    spans = [
+        item
+        for line in trace_path.read_text(encoding="utf-8").splitlines()
+        for resource in json.loads(line)["resourceSpans"]
+        for scope in resource["scopeSpans"]
+        for item in scope["spans"]
+    ]
+    by_name = {item["name"]: item for item in spans}
+    assert by_name["eval.run"]["attributes"][2] == {
+        "key": "eval.corpus_size",
+        "value": {"intValue": "5"},
+    }
+    assert by_name["eval.run_modes"]["parentSpanId"] == by_name["eval.run"]["spanId"]
+    assert sum(item["name"].startswith("triage.") for item in spans) == 10
+    assert all(len(item["traceId"]) == 32 and len(item["spanId"]) == 16 for item in spans)
+
+
+def test_batch_processor_drops_instead_of_blocking_when_full():
+    exporter = InMemorySpanExporter()
+    processor = BatchSpanProcessor(
+        exporter, max_queue_size=4, max_export_batch_size=4, schedule_delay_s=60.0
+    )
+    processor.on_end(
+        [SpanData(trace_id=1, span_id=index + 1, name="s", start_unix_ns=0) for index in range(6)]
+    )
+    processor.shutdown()
+
+    assert processor.dropped_spans == 2
+    assert len(exporter.spans) == 4
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import pytest
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.keywords import KEYWORD_MATCHER
+from customer_doc_triage.triage.schemas import TriageInput
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+
+def _input(**overrides) -> TriageInput:
+    payload = {
+        "doc_id": "DOC-FT-001",
+        "channel": "attachment",
+        "customer_id": "CUST-55",
+        "customer_tier": "growth",
+        "region": "APAC",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "billing dispute",
+        "content": "Incident follow-up: invoice shows an unexpected overage charge.",
+        "metadata": {"issue_type": "overage"},
+    }
+    payload.update(overrides)
+    return TriageInput(**payload)
+
+
+@pytest.fixture
+def scan_counter(monkeypatch):
+    calls = []
+    original = KEYWORD_MATCHER.scan_lowered
+
+    def counting_scan(content_lower: str) -> frozenset[str]:
+        calls.append(content_lower)
+        return original(content_lower)
+
+    monkeypatch.setattr(KEYWORD_MATCHER, "scan_lowered", counting_scan)
+    return calls
+
+
+def test_triage_features_derive_doc_types_and_missing_fields():
+    features = TriageFeatures(_input())
+
+    assert features.hinted_doc_type == "billing_dispute"
+    assert features.content_doc_type == "billing_dispute"
+    assert features.metadata_keys == {"issue_type"}
+    assert features.missing_fields("billing_dispute") == ["invoice_id"]
+    assert features.present_mask("billing_dispute") == 0b01
+
+
+def test_workflow_retry_and_fail_closed_paths_scan_content_once(scan_counter):
+    decision = run_workflow(
+        _input(metadata={"issue_type": "overage", "_force_validation_failure": True}),
+        max_retries=2,
+    )
+
+    assert decision.decision_trace.retry_count == 2
+    assert decision.escalate is True
+    assert len(scan_counter) == 1
+
+
+def test_agent_plan_and_tools_share_one_content_scan(scan_counter):
+    decision = run_agentic(_input())
+
+    assert "tool:risk_scan" in decision.decision_trace.steps
+    assert len(scan_counter) == 1
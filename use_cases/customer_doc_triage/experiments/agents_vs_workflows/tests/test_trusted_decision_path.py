@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import pytest
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.batch.pipeline import triage_batch
+from customer_doc_triage.triage import validation
+from customer_doc_triage.triage.schemas import DecisionTrace, TriageDecision, TriageInput
+from customer_doc_triage.triage.validation import (
+    FORCE_VALIDATION_ENV,
+    VALIDATION_SAMPLE_RATE_ENV,
+    configure_validation_sampling,
+    requires_validation,
+    validate_triage_decision,
+)
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+
+@pytest.fixture
+def restore_sampling():
+    original = configure_validation_sampling()
+    yield
+    configure_validation_sampling(sample_rate=original.sample_rate, force=original.force)
+
+
+def _input(**overrides) -> TriageInput:
+    payload = {
+        "doc_id": "DOC-TR-001",
+        "channel": "api",
+        "customer_id": "CUST-77",
+        "customer_tier": "enterprise",
+        "region": "NA",
+        "submitted_at": "2026-02-16T12:00:00Z",
+        "doc_type_hint": "incident report",
+        "content": "Production outage with elevated error rate.",
+        "metadata": {"service": "auth-service", "region": "NA"},
+    }
+    payload.update(overrides)
+    return TriageInput(**payload)
+
+
+def test_validation_sampling_rate_bounds_and_force_switch(restore_sampling):
+    doc_ids = [f"DOC-{index:05d}" for index in range(2_000)]
+
+    configure_validation_sampling(sample_rate=0.0, force=False)
+    assert not any(requires_validation(doc_id) for doc_id in doc_ids)
+
+    configure_validation_sampling(sample_rate=0.25)
+    sampled = sum(requires_validation(doc_id) for doc_id in doc_ids)
+    assert 300 < sampled < 700
+    assert sampled == sum(requires_validation(doc_id) for doc_id in doc_ids)
+
+    configure_validation_sampling(force=True)
+    assert all(requires_validation(doc_id) for doc_id in doc_ids)
+
+    with pytest.raises(ValueError):
+        configure_validation_sampling(sample_rate=1.5)
+
+
+def test_sampling_reads_the_environment_on_first_use(monkeypatch):
+    monkeypatch.setattr(validation, "_sampling", None)
+    monkeypatch.setenv(VALIDATION_SAMPLE_RATE_ENV, "0.5")
+    monkeypatch.setenv(FORCE_VALIDATION_ENV, "true")
+    assert configure_validation_sampling() == validation.ValidationSampling(0.5, True)
+
+    for raw in ("2", "-0.1", "nan", "five percent"):
+        monkeypatch.setattr(validation, "_sampling", None)
+        monkeypatch.setenv(VALIDATION_SAMPLE_RATE_ENV, raw)
+        with pytest.raises(ValueError, match=VALIDATION_SAMPLE_RATE_ENV):
+            requires_validation("DOC-1")
+
+
+@pytest.mark.parametrize("force", [False, True])
+def test_runners_produce_same_decisions_with_or_without_forced_validation(restore_sampling, force):
+    configure_validation_sampling(sample_rate=0.0, force=force)
+    triage_input = _input()
+
+    workflow_decision = run_workflow(triage_input)
+    agent_decision = run_agentic(triage_input)
+
+    assert workflow_decision.escalate is True
+    assert workflow_decision.confidence == 0.78
+    assert agent_decision.confidence == 0.84
+    assert validate_triage_decision(triage_input, workflow_decision) == []
+    assert validate_triage_decision(triage_input, agent_decision) == []
+
+
+def test_batch_rows_pass_every_field_to_model_construct(restore_sampling, monkeypatch):
+    # model_construct resolves omitted default_factory fields through a slow
+    # signature lookup, which would make batch assembly slower than validating.
+    for model in (TriageDecision, DecisionTrace):
+
+        def checked(_fields_set=None, *, _model=model, _original=model.model_construct, **values):
+            assert set(values) == set(_model.model_fields), _model.__name__
+            return _original(_fields_set, **values)
+
+        monkeypatch.setattr(model, "model_construct", checked)
+    configure_validation_sampling(sample_rate=0.0, force=False)
+    triage_input = _input()
+
+    triage_batch([triage_input, _input(doc_id="DOC-TR-002")], mode="workflow")
+    triage_batch([triage_input, _input(doc_id="DOC-TR-002")], mode="agent")
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from customer_doc_triage.batch.pipeline import triage_batch
+from customer_doc_triage.eval.metrics import score
+from customer_doc_triage.eval.vectorized import score_vectorized
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _load(name: str) -> list[dict]:
+    with (DATA_DIR / name).open("r", encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+@pytest.fixture(scope="module")
+def scored_corpus():
+    gold = {row["doc_id"]: row for row in _load("gold.jsonl")}
+    predictions = [decision.model_dump() for decision in triage_batch(_load("samples.jsonl"))]
+    predictions.append({**predictions[0], "doc_id": "DOC-NO-GOLD"})
+    predictions[1] = {
+        **predictions[1],
+        "doc_type": None,
+        "required_missing_fields": ["approval_reference", "unexpected_field"],
+    }
+    return predictions, gold
+
+
+def test_vectorized_score_matches_python_score(scored_corpus):
+    predictions, gold = scored_corpus
+
+    assert json.dumps(score_vectorized(predictions, gold)) == json.dumps(score(predictions, gold))
+    assert score_vectorized([], {}) == score([], {})
+    cached = [index % 3 == 0 for index in range(len(predictions))]
+    assert json.dumps(score_vectorized(predictions, gold, cached)) == json.dumps(
+        score(predictions, gold, cached)
+    )
+    assert json.dumps(score_vectorized(predictions, gold, cached, latency=True)) == json.dumps(
+        score(predictions, gold, cached, latency=True)
+    )
+
+
+def test_confusion_matrices_count_gold_rows_against_predictions(scored_corpus):
+    predictions, gold = scored_corpus
+    matrices = score_vectorized(predictions, gold)["confusion_matrices"]
+
+    scored = [prediction for prediction in predictions if prediction["doc_id"] in gold]
+    escalate = matrices["escalate"]
+    false_positives = sum(
+        1
+        for prediction in scored
+        if prediction["escalate"] and not gold[prediction["doc_id"]]["escalate"]
+    )
+    assert escalate["matrix"][escalate["labels"].index(False)][
+        escalate["labels"].index(True)
+    ] == false_positives
+
+    doc_type = matrices["doc_type"]
+    assert sum(map(sum, doc_type["matrix"])) == len(scored)
+    assert None in doc_type["labels"]
+    correct = sum(doc_type["matrix"][index][index] for index in range(len(doc_type["labels"])))
+    assert correct / len(predictions) == score(predictions, gold)["doc_type_accuracy"]
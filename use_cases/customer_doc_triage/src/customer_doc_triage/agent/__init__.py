@@ -1,3 +1,3 @@
-from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.agent.pipeline import arun_agentic, run_agentic
 
-__all__ = ["run_agentic"]
+__all__ = ["arun_agentic", "run_agentic"]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import perf_counter
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class ToolTimeoutExceeded(DeadlineExceeded):
+    def __init__(self, tool_name: str) -> None:
+        super().__init__(f"tool '{tool_name}' exceeded its timeout budget")
+        self.tool_name = tool_name
+
+
+@dataclass(frozen=True)
+class Deadline:
+    expires_at: float
+
+    @classmethod
+    def after_ms(cls, start_time: float, timeout_ms: int) -> Deadline:
+        return cls(expires_at=start_time + timeout_ms / 1000)
+
+    def capped(self, timeout_ms: int | None) -> Deadline:
+        if timeout_ms is None:
+            return self
+        return Deadline(expires_at=min(self.expires_at, perf_counter() + timeout_ms / 1000))
+
+    def remaining_s(self) -> float:
+        return max(0.0, self.expires_at - perf_counter())
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining_s() * 1000)
+
+    def expired(self) -> bool:
+        return perf_counter() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired():
+            raise DeadlineExceeded("agent timeout budget exceeded")
@@ -1,110 +1,96 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
 from time import perf_counter
 
+from customer_doc_triage.agent.deadline import Deadline, DeadlineExceeded, ToolTimeoutExceeded
 from customer_doc_triage.agent.planner import plan
-from customer_doc_triage.agent.tools import (
-    TOOL_ALLOWLIST,
-    check_completeness_tool,
-    detect_doc_type_tool,
-    extract_metadata_tool,
-    lookup_policy_context_tool,
-    risk_scan_tool,
+from customer_doc_triage.agent.scheduler import (
+    ToolOutcome,
+    arun_tool_wave,
+    record_tool_call,
+    run_tool_wave,
+    tool_waves,
 )
+from customer_doc_triage.agent.tools import TOOL_ALLOWLIST, ToolContext
+from customer_doc_triage.telemetry.instruments import record_decision
+from customer_doc_triage.telemetry.tracer import export_decision
 from customer_doc_triage.triage.engine import (
+    SpanRecorder,
     build_decision,
     build_fail_closed_decision,
-    detect_doc_type,
     elapsed_ms_since,
+    stamp_elapsed,
 )
-from customer_doc_triage.triage.schemas import TriageDecision, TriageInput
-from customer_doc_triage.triage.validation import validate_triage_decision
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.schemas import DocType, ToolCallStats, TriageDecision, TriageInput
+from customer_doc_triage.triage.validation import requires_validation, validate_triage_decision
 
+_TIMEOUT_VIOLATION = ("guardrail_timeout", "Guardrail violation: agent timeout budget exceeded")
 
-def run_agentic(
-    triage_input: TriageInput | dict,
-    *,
-    allowlist: set[str] | None = None,
-    max_tool_calls: int = 6,
-    timeout_ms: int = 2_000,
-) -> TriageDecision:
-    start_time = perf_counter()
-    parsed_input = triage_input if isinstance(triage_input, TriageInput) else TriageInput(**triage_input)
-    effective_allowlist = allowlist or TOOL_ALLOWLIST
-
-    steps = ["parse_input", "agent_plan_start"]
-    planned_tools = plan(parsed_input)
-    tool_calls = 0
-    inferred_doc_type = detect_doc_type(parsed_input.content, parsed_input.doc_type_hint)
-    _agent_context: dict[str, object] = {}
-
-    for tool_name in planned_tools:
-        if tool_name not in effective_allowlist:
-            return build_fail_closed_decision(
-                parsed_input,
-                mode="agent",
-                steps=steps + [f"guardrail_allowlist_block:{tool_name}"],
-                tool_calls=tool_calls,
-                retry_count=0,
-                elapsed_ms=elapsed_ms_since(start_time),
-                failure_reason=f"Guardrail violation: tool '{tool_name}' not in allowlist",
-            )
 
-        if tool_calls >= max_tool_calls:
-            return build_fail_closed_decision(
-                parsed_input,
-                mode="agent",
-                steps=steps + ["guardrail_tool_budget_exceeded"],
-                tool_calls=tool_calls,
-                retry_count=0,
-                elapsed_ms=elapsed_ms_since(start_time),
-                failure_reason="Guardrail violation: max tool calls exceeded",
-            )
-
-        if elapsed_ms_since(start_time) > timeout_ms:
-            return build_fail_closed_decision(
-                parsed_input,
-                mode="agent",
-                steps=steps + ["guardrail_timeout"],
-                tool_calls=tool_calls,
-                retry_count=0,
-                elapsed_ms=elapsed_ms_since(start_time),
-                failure_reason="Guardrail violation: agent timeout budget exceeded",
-            )
+def _tool_timeout_violation(tool_name: str) -> tuple[str, str]:
+    return (
+        f"guardrail_tool_timeout:{tool_name}",
+        f"Guardrail violation: tool '{tool_name}' exceeded its timeout budget",
+    )
 
-        steps.append(f"tool:{tool_name}")
 
-        if tool_name == "detect_doc_type":
-            result = detect_doc_type_tool(parsed_input)
-            inferred_doc_type = result["doc_type"]
-            _agent_context[tool_name] = result
-        elif tool_name == "extract_metadata":
-            _agent_context[tool_name] = extract_metadata_tool(parsed_input)
-        elif tool_name == "check_completeness":
-            _agent_context[tool_name] = check_completeness_tool(parsed_input, inferred_doc_type)
-        elif tool_name == "lookup_policy_context":
-            _agent_context[tool_name] = lookup_policy_context_tool(parsed_input)
-        elif tool_name == "risk_scan":
-            _agent_context[tool_name] = risk_scan_tool(parsed_input)
+def _split_at_guardrail(
+    planned_tools: list[str], *, allowlist: set[str], max_tool_calls: int
+) -> tuple[list[str], tuple[str, str] | None]:
+    for index, tool_name in enumerate(planned_tools):
+        if tool_name not in allowlist:
+            return planned_tools[:index], (
+                f"guardrail_allowlist_block:{tool_name}",
+                f"Guardrail violation: tool '{tool_name}' not in allowlist",
+            )
+        if index >= max_tool_calls:
+            return planned_tools[:index], (
+                "guardrail_tool_budget_exceeded",
+                "Guardrail violation: max tool calls exceeded",
+            )
+    return planned_tools, None
 
-        tool_calls += 1
 
+def _assemble_decision(
+    parsed_input: TriageInput,
+    features: TriageFeatures,
+    *,
+    steps: list[str],
+    tool_calls: int,
+    inferred_doc_type: DocType | None,
+    tool_stats: dict[str, ToolCallStats],
+    start_time: float,
+    spans: SpanRecorder,
+) -> TriageDecision:
     steps.append("assemble_candidate")
-    decision = build_decision(
-        parsed_input,
-        mode="agent",
-        doc_type=inferred_doc_type,
-        steps=steps,
-        tool_calls=tool_calls,
-        retry_count=0,
-        elapsed_ms=elapsed_ms_since(start_time),
-        model_name="heuristic-agent-v1",
-        confidence=0.84,
-        rationale="Dynamic agentic triage with guardrailed tool orchestration.",
-    )
+    trusted = not requires_validation(parsed_input.doc_id)
+    with spans.span("assemble_candidate"):
+        decision = build_decision(
+            parsed_input,
+            mode="agent",
+            doc_type=inferred_doc_type or features.hinted_doc_type,
+            steps=steps,
+            tool_calls=tool_calls,
+            retry_count=0,
+            elapsed_ms=elapsed_ms_since(start_time),
+            model_name="heuristic-agent-v1",
+            confidence=0.84,
+            rationale="Dynamic agentic triage with guardrailed tool orchestration.",
+            features=features,
+            tool_stats=tool_stats,
+        )
 
-    violations = validate_triage_decision(parsed_input, decision)
-    if violations:
+    if trusted:
+        return decision
+    with spans.span("validate_candidate"):
+        violations = validate_triage_decision(parsed_input, decision, features)
+    if not violations:
+        return decision
+
+    with spans.span("final_validation_fail_closed"):
         return build_fail_closed_decision(
             parsed_input,
             mode="agent",
@@ -113,7 +99,227 @@ def run_agentic(
             retry_count=0,
             elapsed_ms=elapsed_ms_since(start_time),
             failure_reason="Final schema/policy validation failed",
+            features=features,
+            tool_stats=tool_stats,
+        )
+
+
+@dataclass
+class _AgentRun:
+    # Everything run_agentic and arun_agentic share; they differ only in how a
+    # wave of tools is executed.
+    parsed_input: TriageInput
+    features: TriageFeatures
+    waves: list[list[str]]
+    violation: tuple[str, str] | None
+    deadline: Deadline
+    start_time: float
+    spans: SpanRecorder
+    steps: list[str] = field(default_factory=lambda: ["parse_input", "agent_plan_start"])
+    tool_calls: int = 0
+    tool_context: ToolContext = field(default_factory=dict)
+    tool_stats: dict[str, ToolCallStats] = field(default_factory=dict)
+
+    @classmethod
+    def start(
+        cls,
+        triage_input: TriageInput | dict,
+        *,
+        allowlist: set[str] | None,
+        max_tool_calls: int,
+        timeout_ms: int,
+        start_time: float,
+        spans: SpanRecorder,
+    ) -> _AgentRun:
+        with spans.span("parse_input"):
+            parsed_input = (
+                triage_input
+                if isinstance(triage_input, TriageInput)
+                else TriageInput(**triage_input)
+            )
+        with spans.span("agent_plan_start"):
+            features = TriageFeatures(parsed_input)
+            planned_tools = plan(parsed_input, features)
+            runnable_tools, violation = _split_at_guardrail(
+                planned_tools,
+                allowlist=allowlist or TOOL_ALLOWLIST,
+                max_tool_calls=max_tool_calls,
+            )
+        return cls(
+            parsed_input=parsed_input,
+            features=features,
+            waves=tool_waves(runnable_tools),
+            violation=violation,
+            deadline=Deadline.after_ms(start_time, timeout_ms),
+            start_time=start_time,
+            spans=spans,
+        )
+
+    def begin_wave(self, wave: list[str]) -> bool:
+        if self.deadline.expired():
+            self.violation = _TIMEOUT_VIOLATION
+            return False
+        self.steps.extend(f"tool:{tool_name}" for tool_name in wave)
+        self.tool_calls += len(wave)
+        return True
+
+    def fail(self, exc: DeadlineExceeded) -> None:
+        if isinstance(exc, ToolTimeoutExceeded):
+            self.violation = _tool_timeout_violation(exc.tool_name)
+        else:
+            self.violation = _TIMEOUT_VIOLATION
+
+    def record_wave(self, wave: list[str], outcomes: list[ToolOutcome]) -> None:
+        for tool_name, (result, started_ns, elapsed_ns) in zip(wave, outcomes):
+            self.tool_context.update(result)
+            record_tool_call(self.tool_stats, tool_name, elapsed_ns / 1_000_000)
+            self.spans.record(f"tool:{tool_name}", started_ns, elapsed_ns)
+
+    def finish(self) -> TriageDecision:
+        if self.violation is not None:
+            step, failure_reason = self.violation
+            with self.spans.span(step):
+                return build_fail_closed_decision(
+                    self.parsed_input,
+                    mode="agent",
+                    steps=self.steps + [step],
+                    tool_calls=self.tool_calls,
+                    retry_count=0,
+                    elapsed_ms=elapsed_ms_since(self.start_time),
+                    failure_reason=failure_reason,
+                    features=self.features,
+                    tool_stats=self.tool_stats,
+                )
+
+        return _assemble_decision(
+            self.parsed_input,
+            self.features,
+            steps=self.steps,
+            tool_calls=self.tool_calls,
+            inferred_doc_type=self.tool_context.get("doc_type"),
+            tool_stats=self.tool_stats,
+            start_time=self.start_time,
+            spans=self.spans,
         )
 
-    decision.decision_trace.elapsed_ms = elapsed_ms_since(start_time)
+
+def run_agentic(
+    triage_input: TriageInput | dict,
+    *,
+    allowlist: set[str] | None = None,
+    max_tool_calls: int = 6,
+    timeout_ms: int = 2_000,
+    tool_executor: Executor | None = None,
+) -> TriageDecision:
+    """Triage one document with planned tool calls under the given guardrails.
+
+    timeout_ms is checked after each tool returns. It only interrupts a tool
+    that is still running when tool_executor is given; arun_agentic always
+    enforces it.
+    """
+    start_time = perf_counter()
+    spans = SpanRecorder(start_time)
+    decision = _run_agentic(
+        triage_input,
+        allowlist=allowlist,
+        max_tool_calls=max_tool_calls,
+        timeout_ms=timeout_ms,
+        tool_executor=tool_executor,
+        start_time=start_time,
+        spans=spans,
+    )
+    stamp_elapsed(decision, start_time, spans)
+    record_decision(decision)
+    export_decision(decision)
+    return decision
+
+
+def _run_agentic(
+    triage_input: TriageInput | dict,
+    *,
+    allowlist: set[str] | None,
+    max_tool_calls: int,
+    timeout_ms: int,
+    tool_executor: Executor | None,
+    start_time: float,
+    spans: SpanRecorder,
+) -> TriageDecision:
+    run = _AgentRun.start(
+        triage_input,
+        allowlist=allowlist,
+        max_tool_calls=max_tool_calls,
+        timeout_ms=timeout_ms,
+        start_time=start_time,
+        spans=spans,
+    )
+    for wave in run.waves:
+        if not run.begin_wave(wave):
+            break
+        try:
+            outcomes = run_tool_wave(
+                wave,
+                run.parsed_input,
+                run.features,
+                run.tool_context,
+                run.deadline,
+                executor=tool_executor,
+            )
+        except DeadlineExceeded as exc:
+            run.fail(exc)
+            break
+        run.record_wave(wave, outcomes)
+    return run.finish()
+
+
+async def arun_agentic(
+    triage_input: TriageInput | dict,
+    *,
+    allowlist: set[str] | None = None,
+    max_tool_calls: int = 6,
+    timeout_ms: int = 2_000,
+) -> TriageDecision:
+    start_time = perf_counter()
+    spans = SpanRecorder(start_time)
+    decision = await _arun_agentic(
+        triage_input,
+        allowlist=allowlist,
+        max_tool_calls=max_tool_calls,
+        timeout_ms=timeout_ms,
+        start_time=start_time,
+        spans=spans,
+    )
+    stamp_elapsed(decision, start_time, spans)
+    record_decision(decision)
+    export_decision(decision)
     return decision
+
+
+async def _arun_agentic(
+    triage_input: TriageInput | dict,
+    *,
+    allowlist: set[str] | None,
+    max_tool_calls: int,
+    timeout_ms: int,
+    start_time: float,
+    spans: SpanRecorder,
+) -> TriageDecision:
+    run = _AgentRun.start(
+        triage_input,
+        allowlist=allowlist,
+        max_tool_calls=max_tool_calls,
+        timeout_ms=timeout_ms,
+        start_time=start_time,
+        spans=spans,
+    )
+    for wave in run.waves:
+        if not run.begin_wave(wave):
+            break
+        try:
+            outcomes = await arun_tool_wave(
+                wave, run.parsed_input, run.features, run.tool_context, run.deadline
+            )
+        except DeadlineExceeded as exc:
+            run.fail(exc)
+            break
+        run.record_wave(wave, outcomes)
+    return run.finish()
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.keywords import INCIDENT_PLAN_TOKENS, PRIVILEGED_PLAN_TOKENS
 from customer_doc_triage.triage.schemas import TriageInput
 
 
-def plan(triage_input: TriageInput) -> list[str]:
-    content = triage_input.content.lower()
+def plan(triage_input: TriageInput, features: TriageFeatures | None = None) -> list[str]:
+    keyword_hits = (features or TriageFeatures(triage_input)).keyword_hits
 
-    if any(token in content for token in ("admin", "contractor", "privileged", "regulated")):
+    if any(token in keyword_hits for token in PRIVILEGED_PLAN_TOKENS):
         return [
             "detect_doc_type",
             "lookup_policy_context",
@@ -14,7 +16,7 @@ def plan(triage_input: TriageInput) -> list[str]:
             "check_completeness",
         ]
 
-    if any(token in content for token in ("incident", "latency", "outage", "error")):
+    if any(token in keyword_hits for token in INCIDENT_PLAN_TOKENS):
         return [
             "detect_doc_type",
             "extract_metadata",
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from concurrent.futures import Executor, wait
+from time import perf_counter_ns
+from typing import Any
+
+from customer_doc_triage.agent.deadline import Deadline, DeadlineExceeded, ToolTimeoutExceeded
+from customer_doc_triage.agent.tools import (
+    TOOL_SPECS,
+    ToolContext,
+    ToolSpec,
+    get_tool_cache,
+    invoke_tool,
+    tool_cache_key,
+)
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.schemas import ToolCallStats, TriageInput
+
+
+def tool_waves(
+    planned_tools: list[str], specs: dict[str, ToolSpec] | None = None
+) -> list[list[str]]:
+    specs = specs or TOOL_SPECS
+    levels: list[int] = []
+
+    # A tool depends on any earlier planned tool that produces one of its inputs;
+    # tools at the same level have no such edge and can run concurrently.
+    for index, tool_name in enumerate(planned_tools):
+        inputs = set(specs[tool_name].inputs)
+        upstream = [
+            levels[earlier]
+            for earlier in range(index)
+            if inputs & set(specs[planned_tools[earlier]].outputs)
+        ]
+        levels.append(max(upstream) + 1 if upstream else 0)
+
+    waves: list[list[str]] = [[] for _ in range(max(levels) + 1)] if levels else []
+    for tool_name, level in zip(planned_tools, levels):
+        waves[level].append(tool_name)
+    return waves
+
+
+# (result, started_ns, elapsed_ns) on the perf_counter_ns clock.
+ToolOutcome = tuple[Any, int, int]
+
+
+def record_tool_call(
+    tool_stats: dict[str, ToolCallStats], tool_name: str, elapsed_ms: float
+) -> None:
+    stats = tool_stats.get(tool_name)
+    if stats is None:
+        stats = tool_stats[tool_name] = ToolCallStats()
+    stats.calls += 1
+    stats.elapsed_ms += elapsed_ms
+
+
+def _deadline_error(
+    tool_name: str, tool_deadline: Deadline, deadline: Deadline
+) -> DeadlineExceeded:
+    if tool_deadline.expires_at < deadline.expires_at:
+        return ToolTimeoutExceeded(tool_name)
+    return DeadlineExceeded("agent timeout budget exceeded")
+
+
+def _timed_call(
+    spec: ToolSpec,
+    triage_input: TriageInput,
+    features: TriageFeatures,
+    context: ToolContext,
+    tool_deadline: Deadline,
+) -> ToolOutcome:
+    started_ns = perf_counter_ns()
+    result = invoke_tool(spec, triage_input, features, context, tool_deadline)
+    return result, started_ns, perf_counter_ns() - started_ns
+
+
+def run_tool_wave(
+    wave: list[str],
+    triage_input: TriageInput,
+    features: TriageFeatures,
+    context: ToolContext,
+    deadline: Deadline,
+    *,
+    executor: Executor | None = None,
+) -> list[ToolOutcome]:
+    """Run one wave of tools and return their outcomes in wave order.
+
+    Without an executor the tools run inline and the deadline is only checked
+    after each one returns, so a stalled tool holds the caller past it. The
+    deadline is a hard limit only with an executor (or via arun_tool_wave).
+    """
+    specs = [TOOL_SPECS[tool_name] for tool_name in wave]
+    tool_deadlines = [deadline.capped(spec.timeout_ms) for spec in specs]
+
+    if executor is None:
+        # Inline tools cannot be preempted, so the deadline is enforced as soon as
+        # each one returns.
+        outcomes = []
+        for spec, tool_deadline in zip(specs, tool_deadlines):
+            outcomes.append(_timed_call(spec, triage_input, features, context, tool_deadline))
+            if tool_deadline.expired():
+                raise _deadline_error(spec.name, tool_deadline, deadline)
+        return outcomes
+
+    futures = [
+        executor.submit(_timed_call, spec, triage_input, features, context, tool_deadline)
+        for spec, tool_deadline in zip(specs, tool_deadlines)
+    ]
+    for spec, tool_deadline, future in zip(specs, tool_deadlines, futures):
+        done, _ = wait([future], timeout=tool_deadline.remaining_s())
+        if not done:
+            for pending in futures:
+                pending.cancel()
+            raise _deadline_error(spec.name, tool_deadline, deadline)
+    return [future.result() for future in futures]
+
+
+async def _ainvoke_tool(
+    spec: ToolSpec,
+    triage_input: TriageInput,
+    features: TriageFeatures,
+    context: ToolContext,
+    deadline: Deadline,
+) -> ToolOutcome:
+    tool_deadline = deadline.capped(spec.timeout_ms)
+    started_ns = perf_counter_ns()
+    cache = get_tool_cache()
+    key = tool_cache_key(spec, triage_input, features, context)
+    if cache is not None and key is not None:
+        found, cached = cache.get(key)
+        if found:
+            return dict(cached), started_ns, perf_counter_ns() - started_ns
+
+    if inspect.iscoroutinefunction(spec.func):
+        call = spec.func(triage_input, features, context, tool_deadline)
+    else:
+        # Sync tools run on a worker thread so a slow one cannot stall the event
+        # loop, and the deadline stops the wait even if the tool keeps running.
+        call = asyncio.to_thread(spec.func, triage_input, features, context, tool_deadline)
+    try:
+        result = await asyncio.wait_for(call, timeout=tool_deadline.remaining_s())
+    except TimeoutError:
+        raise _deadline_error(spec.name, tool_deadline, deadline) from None
+    if cache is not None and key is not None:
+        cache.put(key, dict(result))
+    return result, started_ns, perf_counter_ns() - started_ns
+
+
+async def arun_tool_wave(
+    wave: list[str],
+    triage_input: TriageInput,
+    features: TriageFeatures,
+    context: ToolContext,
+    deadline: Deadline,
+) -> list[ToolOutcome]:
+    tasks = [
+        asyncio.ensure_future(
+            _ainvoke_tool(TOOL_SPECS[tool_name], triage_input, features, context, deadline)
+        )
+        for tool_name in wave
+    ]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except DeadlineExceeded:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Literal
 
-from customer_doc_triage.triage.engine import detect_doc_type
-from customer_doc_triage.triage.policies import find_required_missing_fields
+from customer_doc_triage.agent.deadline import Deadline
+from customer_doc_triage.telemetry.metrics import REGISTRY
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.keywords import RISK_TOKENS
 from customer_doc_triage.triage.schemas import DocType, TriageInput
 
 TOOL_ALLOWLIST = {
@@ -19,8 +29,11 @@ def available_tools() -> list[str]:
     return sorted(TOOL_ALLOWLIST)
 
 
-def detect_doc_type_tool(triage_input: TriageInput) -> dict[str, Any]:
-    metadata = triage_input.metadata
+def detect_doc_type_tool(
+    triage_input: TriageInput, features: TriageFeatures | None = None
+) -> dict[str, Any]:
+    features = features or TriageFeatures(triage_input)
+    metadata_keys = features.metadata_keys
 
     metadata_to_doc_type = [
         ("requested_role", "access_request"),
@@ -31,20 +44,24 @@ def detect_doc_type_tool(triage_input: TriageInput) -> dict[str, Any]:
     ]
 
     for key, doc_type in metadata_to_doc_type:
-        if key in metadata:
+        if key in metadata_keys:
             return {"doc_type": doc_type, "source": f"metadata:{key}"}
 
-    doc_type = detect_doc_type(triage_input.content, None)
-    return {"doc_type": doc_type, "source": "content"}
+    return {"doc_type": features.content_doc_type, "source": "content"}
 
 
-def extract_metadata_tool(triage_input: TriageInput) -> dict[str, Any]:
-    return {"metadata_keys": sorted(triage_input.metadata.keys())}
+def extract_metadata_tool(
+    triage_input: TriageInput, features: TriageFeatures | None = None
+) -> dict[str, Any]:
+    features = features or TriageFeatures(triage_input)
+    return {"metadata_keys": sorted(features.metadata_keys)}
 
 
-def check_completeness_tool(triage_input: TriageInput, doc_type: DocType) -> dict[str, Any]:
-    missing = find_required_missing_fields(doc_type=doc_type, metadata=triage_input.metadata)
-    return {"required_missing_fields": missing}
+def check_completeness_tool(
+    triage_input: TriageInput, doc_type: DocType, features: TriageFeatures | None = None
+) -> dict[str, Any]:
+    features = features or TriageFeatures(triage_input)
+    return {"required_missing_fields": features.missing_fields(doc_type)}
 
 
 def lookup_policy_context_tool(triage_input: TriageInput) -> dict[str, Any]:
@@ -55,11 +72,231 @@ def lookup_policy_context_tool(triage_input: TriageInput) -> dict[str, Any]:
     }
 
 
-def risk_scan_tool(triage_input: TriageInput) -> dict[str, Any]:
-    content_lower = triage_input.content.lower()
-    risk_tokens = [
-        token
-        for token in ("admin", "privileged", "contractor", "outage", "incident", "regulated")
-        if token in content_lower
-    ]
+def risk_scan_tool(
+    triage_input: TriageInput, features: TriageFeatures | None = None
+) -> dict[str, Any]:
+    keyword_hits = (features or TriageFeatures(triage_input)).keyword_hits
+    risk_tokens = [token for token in RISK_TOKENS if token in keyword_hits]
     return {"risk_tokens": risk_tokens, "risk_score": len(risk_tokens)}
+
+
+ToolContext = dict[str, Any]
+ToolFunc = Callable[[TriageInput, TriageFeatures, ToolContext, Deadline], Any]
+ToolCacheKey = Callable[[TriageInput, TriageFeatures, ToolContext], Hashable]
+ToolCostClass = Literal["cheap", "io", "expensive"]
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    name: str
+    func: ToolFunc
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    cost_class: ToolCostClass = "cheap"
+    # Per-tool budget, always capped by the run deadline; None means only the run
+    # deadline applies.
+    timeout_ms: int | None = None
+    # Tools that are pure functions of a small key declare it here so results can
+    # be shared across requests through the tool result cache.
+    cache_key: ToolCacheKey | None = None
+
+
+# Registry adapters: every tool is invoked with the shared features, the outputs
+# of upstream tools and the run deadline so slow tools can stop early.
+def _run_detect_doc_type(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext, deadline: Deadline
+) -> dict[str, Any]:
+    return detect_doc_type_tool(triage_input, features)
+
+
+def _run_extract_metadata(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext, deadline: Deadline
+) -> dict[str, Any]:
+    return extract_metadata_tool(triage_input, features)
+
+
+def _run_check_completeness(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext, deadline: Deadline
+) -> dict[str, Any]:
+    doc_type = context.get("doc_type") or features.hinted_doc_type
+    return check_completeness_tool(triage_input, doc_type, features)
+
+
+def _run_lookup_policy_context(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext, deadline: Deadline
+) -> dict[str, Any]:
+    return lookup_policy_context_tool(triage_input)
+
+
+def _run_risk_scan(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext, deadline: Deadline
+) -> dict[str, Any]:
+    return risk_scan_tool(triage_input, features)
+
+
+def _doc_type_cache_key(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext
+) -> Hashable:
+    # A digest keeps entries small and avoids holding every document body alive.
+    return features.metadata_keys, hashlib.sha256(triage_input.content.encode("utf-8")).digest()
+
+
+def _completeness_cache_key(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext
+) -> Hashable:
+    return context.get("doc_type") or features.hinted_doc_type, features.metadata_keys
+
+
+def _policy_context_cache_key(
+    triage_input: TriageInput, features: TriageFeatures, context: ToolContext
+) -> Hashable:
+    return triage_input.customer_tier, triage_input.region
+
+
+TOOL_SPECS: dict[str, ToolSpec] = {
+    "detect_doc_type": ToolSpec(
+        name="detect_doc_type",
+        func=_run_detect_doc_type,
+        outputs=("doc_type", "source"),
+        cache_key=_doc_type_cache_key,
+    ),
+    "extract_metadata": ToolSpec(
+        name="extract_metadata",
+        func=_run_extract_metadata,
+        outputs=("metadata_keys",),
+    ),
+    "check_completeness": ToolSpec(
+        name="check_completeness",
+        func=_run_check_completeness,
+        inputs=("doc_type",),
+        outputs=("required_missing_fields",),
+        cache_key=_completeness_cache_key,
+    ),
+    "lookup_policy_context": ToolSpec(
+        name="lookup_policy_context",
+        func=_run_lookup_policy_context,
+        outputs=("customer_tier", "region", "requires_heightened_review"),
+        cost_class="io",
+        timeout_ms=500,
+        cache_key=_policy_context_cache_key,
+    ),
+    "risk_scan": ToolSpec(
+        name="risk_scan",
+        func=_run_risk_scan,
+        outputs=("risk_tokens", "risk_score"),
+    ),
+}
+
+
+def register_tool(spec: ToolSpec) -> ToolSpec:
+    if spec.timeout_ms is not None and spec.timeout_ms <= 0:
+        raise ValueError(f"Tool '{spec.name}' timeout_ms must be positive")
+    TOOL_SPECS[spec.name] = spec
+    return spec
+
+
+class ToolResultCache:
+    def __init__(self, max_entries: int = 4_096, ttl_s: float | None = 300.0) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl_s is not None and ttl_s <= 0:
+            raise ValueError("ttl_s must be positive")
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_s is not None and monotonic() - entry[0] > self.ttl_s:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Off by default so eval and benchmark timings measure the tools themselves;
+# long-lived services opt in with set_tool_cache(ToolResultCache()).
+_tool_cache: ToolResultCache | None = None
+
+REGISTRY.gauge(
+    "triage_tool_cache_entries", "Entries held by the cross-request tool result cache."
+).set_function(lambda: len(_tool_cache or ()))
+
+
+def get_tool_cache() -> ToolResultCache | None:
+    return _tool_cache
+
+
+def set_tool_cache(cache: ToolResultCache | None) -> ToolResultCache | None:
+    global _tool_cache
+    previous, _tool_cache = _tool_cache, cache
+    return previous
+
+
+def tool_cache_key(
+    spec: ToolSpec, triage_input: TriageInput, features: TriageFeatures, context: ToolContext
+) -> Hashable | None:
+    if spec.cache_key is None or _tool_cache is None:
+        return None
+    # The implementation is part of the key, so swapping a tool's function never
+    # serves results computed by the previous one.
+    return spec.name, spec.func, spec.cache_key(triage_input, features, context)
+
+
+def invoke_tool(
+    spec: ToolSpec,
+    triage_input: TriageInput,
+    features: TriageFeatures,
+    context: ToolContext,
+    deadline: Deadline,
+) -> Any:
+    cache = _tool_cache
+    key = tool_cache_key(spec, triage_input, features, context)
+    if cache is not None and key is not None:
+        found, cached = cache.get(key)
+        if found:
+            return dict(cached)
+
+    if inspect.iscoroutinefunction(spec.func):
+        # Coroutine tools registered for the async runners still work from the
+        # sync runners and the batch path, which never run inside an event loop.
+        result = asyncio.run(spec.func(triage_input, features, context, deadline))
+    else:
+        result = spec.func(triage_input, features, context, deadline)
+    if cache is not None and key is not None:
+        cache.put(key, dict(result))
+    return result
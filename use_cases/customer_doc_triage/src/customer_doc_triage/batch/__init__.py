@@ -0,0 +1,3 @@
+from customer_doc_triage.batch.pipeline import atriage_batch, triage_batch
+
+__all__ = ["atriage_batch", "triage_batch"]
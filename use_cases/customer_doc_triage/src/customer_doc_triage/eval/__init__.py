@@ -1,4 +1,13 @@
-from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.eval.harness import DEFAULT_MODE_CONFIGS, ModeConfig, replay, run_eval
 from customer_doc_triage.eval.metrics import score
+from customer_doc_triage.eval.result_cache import ResultCache, engine_fingerprint
 
-__all__ = ["run_eval", "score"]
+__all__ = [
+    "DEFAULT_MODE_CONFIGS",
+    "ModeConfig",
+    "ResultCache",
+    "engine_fingerprint",
+    "replay",
+    "run_eval",
+    "score",
+]
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import tempfile
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any
+
+from customer_doc_triage.agent.pipeline import run_agentic
+from customer_doc_triage.agent.tools import get_tool_cache
+from customer_doc_triage.eval.metrics import score
+from customer_doc_triage.ingest.jsonl import iter_triage_inputs
+from customer_doc_triage.triage.engine import detect_doc_type
+from customer_doc_triage.triage.policies import find_required_missing_fields, infer_priority
+from customer_doc_triage.triage.schemas import TriageInput
+from customer_doc_triage.triage.validation import (
+    configure_validation_sampling,
+    validate_triage_decision,
+)
+from customer_doc_triage.workflow.pipeline import run_workflow
+
+BENCHMARK_NAMES = (
+    "detect_doc_type",
+    "infer_priority",
+    "find_required_missing_fields",
+    "validate_triage_decision",
+    "run_workflow",
+    "run_workflow_validated",
+    "run_agentic",
+    "run_agentic_validated",
+    "score",
+    "jsonl_ingest",
+)
+DEFAULT_REGRESSION_THRESHOLD = 0.25
+
+# Neutral filler: it lengthens documents without adding any doc-type keyword.
+_FILLER_SENTENCE = "The customer shared more context in a later message on the same thread. "
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    corpus_size: int
+    doc_length: int
+    repeats: int
+    best_ns: int
+    median_ns: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[n={self.corpus_size},len={self.doc_length}]"
+
+    @property
+    def docs_per_s(self) -> float:
+        return self.corpus_size * 1_000_000_000 / max(self.best_ns, 1)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "docs_per_s": round(self.docs_per_s, 1),
+            "us_per_doc": round(self.best_ns / max(self.corpus_size, 1) / 1_000, 3),
+        }
+
+
+def pad_content(samples: list[dict[str, Any]], doc_length: int) -> list[dict[str, Any]]:
+    if doc_length <= 0:
+        return samples
+    padded = []
+    for sample in samples:
+        content = sample["content"]
+        if len(content) < doc_length:
+            repeats = -(-(doc_length - len(content)) // len(_FILLER_SENTENCE))
+            content = (content + " " + _FILLER_SENTENCE * repeats)[:doc_length]
+        padded.append({**sample, "content": content})
+    return padded
+
+
+def time_repeats(
+    run: Callable[[], object], repeats: int, setup: Callable[[], object] | None = None
+) -> list[int]:
+    if repeats < 1:
+        raise ValueError("repeats must be at least 1")
+    durations: list[int] = []
+    # The first pass warms imports, caches of compiled patterns and the allocator.
+    for index in range(repeats + 1):
+        if setup is not None:
+            setup()
+        started = perf_counter_ns()
+        run()
+        elapsed = perf_counter_ns() - started
+        if index:
+            durations.append(elapsed)
+    return durations
+
+
+def _cold_tool_cache() -> None:
+    cache = get_tool_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def _force_validation(run: Callable[[], object]) -> Callable[[], object]:
+    # The *_validated cases price the sampled path the runners normally skip.
+    def forced() -> object:
+        previous = configure_validation_sampling()
+        configure_validation_sampling(force=True)
+        try:
+            return run()
+        finally:
+            configure_validation_sampling(force=previous.force)
+
+    return forced
+
+
+def run_benchmarks(
+    samples: list[dict[str, Any]],
+    gold_rows: list[dict[str, Any]],
+    *,
+    doc_length: int = 0,
+    repeats: int = 5,
+    names: Iterable[str] = BENCHMARK_NAMES,
+) -> list[BenchmarkResult]:
+    names = list(names)
+    unknown = sorted(set(names) - set(BENCHMARK_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {unknown}")
+
+    inputs = [TriageInput(**sample) for sample in samples]
+    gold = {row["doc_id"]: row for row in gold_rows}
+    labelled = [
+        (
+            gold[sample.doc_id]["true_doc_type"],
+            sample.customer_tier,
+            sample.metadata,
+            gold[sample.doc_id]["required_missing_fields"],
+        )
+        for sample in inputs
+    ]
+    decisions = (
+        [run_workflow(sample) for sample in inputs]
+        if {"validate_triage_decision", "score"} & set(names)
+        else []
+    )
+    predictions = [{**decision.model_dump(), "mode": "workflow"} for decision in decisions]
+
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        jsonl_path = Path(scratch_dir) / "samples.jsonl"
+        if "jsonl_ingest" in names:
+            with jsonl_path.open("w", encoding="utf-8") as handle:
+                for sample in samples:
+                    handle.write(json.dumps(sample, ensure_ascii=False) + "\n")
+
+        cases: dict[str, tuple[Callable[[], object], Callable[[], object] | None]] = {
+            "detect_doc_type": (
+                lambda: [detect_doc_type(item.content, item.doc_type_hint) for item in inputs],
+                None,
+            ),
+            "infer_priority": (
+                lambda: [
+                    infer_priority(doc_type, tier, missing)
+                    for doc_type, tier, _, missing in labelled
+                ],
+                None,
+            ),
+            "find_required_missing_fields": (
+                lambda: [
+                    find_required_missing_fields(doc_type, metadata)
+                    for doc_type, _, metadata, _ in labelled
+                ],
+                None,
+            ),
+            "validate_triage_decision": (
+                lambda: [
+                    validate_triage_decision(item, decision)
+                    for item, decision in zip(inputs, decisions)
+                ],
+                None,
+            ),
+            "run_workflow": (lambda: [run_workflow(sample) for sample in samples], None),
+            "run_workflow_validated": (
+                _force_validation(lambda: [run_workflow(sample) for sample in samples]),
+                None,
+            ),
+            "run_agentic": (
+                lambda: [run_agentic(sample) for sample in samples],
+                _cold_tool_cache,
+            ),
+            "run_agentic_validated": (
+                _force_validation(lambda: [run_agentic(sample) for sample in samples]),
+                _cold_tool_cache,
+            ),
+            "score": (lambda: score(predictions, gold), None),
+            "jsonl_ingest": (lambda: list(iter_triage_inputs(jsonl_path)), None),
+        }
+
+        results = []
+        for name in names:
+            run, setup = cases[name]
+            durations = time_repeats(run, repeats, setup)
+            results.append(
+                BenchmarkResult(
+                    name=name,
+                    corpus_size=len(samples),
+                    doc_length=doc_length,
+                    repeats=repeats,
+                    best_ns=min(durations),
+                    median_ns=int(statistics.median(durations)),
+                )
+            )
+    return results
+
+
+def benchmark_report(results: Iterable[BenchmarkResult]) -> dict[str, Any]:
+    return {
+        "environment": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "results": {result.key: result.to_dict() for result in results},
+    }
+
+
+def find_regressions(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> list[dict[str, Any]]:
+    if not 0 < threshold < 1:
+        raise ValueError("threshold must be between 0 and 1")
+    regressions = []
+    for key, current in report["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        change = current["docs_per_s"] / previous["docs_per_s"] - 1
+        if change < -threshold:
+            regressions.append(
+                {
+                    "benchmark": key,
+                    "baseline_docs_per_s": previous["docs_per_s"],
+                    "docs_per_s": current["docs_per_s"],
+                    "change": round(change, 3),
+                }
+            )
+    return regressions
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterable
+from itertools import islice
+from pathlib import Path
+from typing import Any, Self
+
+from customer_doc_triage.ingest.jsonl import Quarantine, iter_json_lines
+
+# Stays under SQLITE_MAX_VARIABLE_NUMBER on every supported sqlite build.
+_LOOKUP_BATCH = 500
+
+
+class GoldIndex:
+    def __init__(self, index_path: Path) -> None:
+        self._connection = sqlite3.connect(index_path)
+
+    @classmethod
+    def build(
+        cls,
+        gold_path: Path,
+        index_path: Path,
+        quarantine: Quarantine | None = None,
+        batch_size: int = 10_000,
+    ) -> GoldIndex:
+        index = cls(index_path)
+        connection = index._connection
+        connection.execute("DROP TABLE IF EXISTS gold")
+        connection.execute("CREATE TABLE gold (doc_id TEXT PRIMARY KEY, row TEXT NOT NULL)")
+
+        rows = (
+            (row["doc_id"], line.decode("utf-8"))
+            for line, row in iter_json_lines(gold_path, quarantine, "doc_id")
+        )
+        while batch := list(islice(rows, batch_size)):
+            # Later rows win, matching the dict built by the in-memory harness.
+            connection.executemany("INSERT OR REPLACE INTO gold VALUES (?, ?)", batch)
+
+        connection.commit()
+        return index
+
+    def get_many(self, doc_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        found: dict[str, dict[str, Any]] = {}
+        pending = iter(dict.fromkeys(doc_ids))
+        while batch := list(islice(pending, _LOOKUP_BATCH)):
+            placeholders = ",".join("?" * len(batch))
+            cursor = self._connection.execute(
+                f"SELECT doc_id, row FROM gold WHERE doc_id IN ({placeholders})", batch
+            )
+            found.update((doc_id, json.loads(row)) for doc_id, row in cursor)
+        return found
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
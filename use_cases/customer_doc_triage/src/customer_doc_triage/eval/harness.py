@@ -2,25 +2,53 @@ from __future__ import annotations
 
 import csv
 import json
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
-from customer_doc_triage.agent.pipeline import run_agentic
-from customer_doc_triage.eval.metrics import score
-from customer_doc_triage.workflow.pipeline import run_workflow
+from customer_doc_triage.batch.pipeline import triage_batch
+from customer_doc_triage.eval.gold_index import GoldIndex
+from customer_doc_triage.eval.metrics import MetricsAccumulator, score
+from customer_doc_triage.eval.result_cache import ResultCache, input_digest
+from customer_doc_triage.eval.vectorized import (
+    HAS_NUMPY,
+    encode_gold,
+    encode_predictions,
+    score_encoded,
+)
+from customer_doc_triage.ingest.compression import (
+    detect_compression,
+    open_compressed,
+    with_compression,
+)
+from customer_doc_triage.ingest.index import JsonlIndex
+from customer_doc_triage.ingest.jsonl import Quarantine, iter_json_objects, iter_triage_inputs
+from customer_doc_triage.ingest.snapshot import iter_corpus, load_corpus
+from customer_doc_triage.telemetry.exporters import SpanExporter
+from customer_doc_triage.telemetry.profiling import profile_iter, profile_stage
+from customer_doc_triage.telemetry.tracer import (
+    configure_tracing,
+    force_flush,
+    get_span_exporter,
+    span,
+)
+from customer_doc_triage.triage.schemas import TriageInput, TriageMode
+from customer_doc_triage.triage.validation import ValidationSampling, configure_validation_sampling
 
+# Several shards per worker keep the pool busy when documents vary in cost.
+_SHARDS_PER_WORKER = 4
+_STREAM_CHUNK_SIZE = 2_048
 
-def _read_jsonl(path: Path) -> list[dict[str, Any]]:
-    rows: list[dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as handle:
-        for line in handle:
-            stripped = line.strip()
-            if stripped:
-                rows.append(json.loads(stripped))
-    return rows
 
-
-def _gold_index(gold_rows: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+def _gold_index(gold_rows: Iterable[dict[str, Any]]) -> dict[str, dict[str, Any]]:
     return {row["doc_id"]: row for row in gold_rows}
 
 
@@ -30,60 +58,424 @@ def _decision_to_prediction(mode: str, decision: Any) -> dict[str, Any]:
     return payload
 
 
-def _run_mode(mode: str, samples: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    predictions: list[dict[str, Any]] = []
+@dataclass(frozen=True)
+class ModeConfig:
+    name: str
+    mode: TriageMode
+    max_retries: int = 1
+    max_tool_calls: int = 6
+    timeout_ms: int = 2_000
 
-    for sample in samples:
-        if mode == "workflow":
-            decision = run_workflow(sample, max_retries=1)
-        elif mode == "agent":
-            decision = run_agentic(sample, max_tool_calls=6, timeout_ms=2_000)
-        else:
-            raise ValueError(f"Unsupported mode: {mode}")
 
-        predictions.append(_decision_to_prediction(mode, decision))
+DEFAULT_MODE_CONFIGS = (ModeConfig("workflow", "workflow"), ModeConfig("agent", "agent"))
 
-    return predictions
+Predictions = list[dict[str, Any]]
+# Per config, the cached prediction for each document or None where it must run.
+CachedRows = tuple[list[dict[str, Any] | None], ...]
 
 
-def _write_predictions_csv(path: Path, predictions: list[dict[str, Any]]) -> None:
-    fieldnames = [
-        "mode",
-        "doc_id",
-        "doc_type",
-        "priority",
-        "recommended_queue",
-        "escalate",
-        "escalation_reason",
-        "confidence",
-        "required_missing_fields",
-        "tool_calls",
-        "elapsed_ms",
+def _run_mode(config: ModeConfig, samples: list[TriageInput]) -> Predictions:
+    decisions = triage_batch(
+        samples,
+        mode=config.mode,
+        max_retries=config.max_retries,
+        max_tool_calls=config.max_tool_calls,
+        timeout_ms=config.timeout_ms,
+    )
+    return [_decision_to_prediction(config.name, decision) for decision in decisions]
+
+
+def _run_shard(
+    samples: list[TriageInput], configs: Sequence[ModeConfig] = DEFAULT_MODE_CONFIGS
+) -> tuple[Predictions, ...]:
+    # Every configuration replays the same validated inputs; nothing is re-parsed.
+    predictions = []
+    for config in configs:
+        with profile_stage(config.name):
+            predictions.append(_run_mode(config, samples))
+    # Pool workers exit without running atexit hooks, so hand queued spans to
+    # the exporter before the shard result goes back.
+    force_flush()
+    return tuple(predictions)
+
+
+def _init_worker(sampling: ValidationSampling, exporter: SpanExporter | None) -> None:
+    configure_validation_sampling(sample_rate=sampling.sample_rate, force=sampling.force)
+    configure_tracing(exporter)
+
+
+def _run_modes(
+    samples: list[TriageInput],
+    workers: int,
+    configs: Sequence[ModeConfig] = DEFAULT_MODE_CONFIGS,
+) -> tuple[Predictions, ...]:
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    if workers == 1 or len(samples) < 2:
+        return _run_shard(samples, configs)
+
+    shard_size = max(1, -(-len(samples) // (workers * _SHARDS_PER_WORKER)))
+    shards = [samples[start : start + shard_size] for start in range(0, len(samples), shard_size)]
+
+    merged: tuple[Predictions, ...] = tuple([] for _ in configs)
+    # Shards are contiguous and map() yields in submission order, so the merged
+    # predictions keep corpus order exactly as the serial run does.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(configure_validation_sampling(), get_span_exporter()),
+    ) as pool:
+        for shard_predictions in pool.map(partial(_run_shard, configs=configs), shards):
+            for predictions, shard in zip(merged, shard_predictions):
+                predictions.extend(shard)
+
+    return merged
+
+
+def _cached_predictions(
+    cache: ResultCache, samples: Sequence[TriageInput], configs: Sequence[ModeConfig]
+) -> tuple[list[list[str]], CachedRows]:
+    digests = [input_digest(sample) for sample in samples]
+    keys = [[cache.key(digest, config) for digest in digests] for config in configs]
+    found = cache.get_many(key for config_keys in keys for key in config_keys)
+    # A document missing under any config re-runs under all of them, so every
+    # config replays the same executed subset.
+    complete = [
+        all(config_keys[row] in found for config_keys in keys) for row in range(len(samples))
     ]
+    cached = tuple(
+        [
+            {**found[key], "mode": config.name} if complete[row] else None
+            for row, key in enumerate(config_keys)
+        ]
+        for config, config_keys in zip(configs, keys)
+    )
+    return keys, cached
+
+
+def _fill_misses(
+    cached: CachedRows, fresh: tuple[Predictions, ...]
+) -> tuple[Predictions, ...]:
+    filled = []
+    for config_cached, config_fresh in zip(cached, fresh):
+        executed = iter(config_fresh)
+        filled.append([row if row is not None else next(executed) for row in config_cached])
+    return tuple(filled)
+
+
+def _store_fresh(
+    cache: ResultCache,
+    keys: list[list[str]],
+    cached: CachedRows,
+    fresh: tuple[Predictions, ...],
+) -> None:
+    cache.put_many(
+        (key, prediction)
+        for config_keys, config_cached, config_fresh in zip(keys, cached, fresh)
+        for key, prediction in zip(
+            (key for key, row in zip(config_keys, config_cached) if row is None), config_fresh
+        )
+    )
+
+
+def replay(
+    samples: Sequence[TriageInput],
+    configs: Sequence[ModeConfig] = DEFAULT_MODE_CONFIGS,
+    workers: int = 1,
+    cache: ResultCache | None = None,
+) -> dict[str, Predictions]:
+    return _replay(samples, configs, workers, cache)[0]
+
+
+def _replay(
+    samples: Sequence[TriageInput],
+    configs: Sequence[ModeConfig],
+    workers: int,
+    cache: ResultCache | None,
+) -> tuple[dict[str, Predictions], list[bool]]:
+    # Also returns which documents were served from the cache, the same under
+    # every config.
+    names = [config.name for config in configs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Mode config names must be unique: {names}")
+    samples = list(samples)
+    if cache is None or not configs:
+        return dict(zip(names, _run_modes(samples, workers, configs))), [False] * len(samples)
+
+    keys, cached = _cached_predictions(cache, samples, configs)
+    misses = [sample for sample, row in zip(samples, cached[0]) if row is None]
+    fresh = _run_modes(misses, workers, configs)
+    _store_fresh(cache, keys, cached, fresh)
+    return dict(zip(names, _fill_misses(cached, fresh))), [row is not None for row in cached[0]]
+
+
+def _score_modes(
+    predictions_by_mode: dict[str, list[dict[str, Any]]],
+    gold: dict[str, dict[str, Any]],
+    cached: list[bool],
+) -> dict[str, dict[str, Any]]:
+    if not HAS_NUMPY:
+        return {
+            mode: score(predictions, gold, cached, latency=True)
+            for mode, predictions in predictions_by_mode.items()
+        }
+
+    # The vectorized scorer returns the same summary; gold is encoded once for both modes.
+    encoded_gold = encode_gold(gold)
+    return {
+        mode: score_encoded(
+            encoded_gold, encode_predictions(predictions, encoded_gold, cached), latency=True
+        )
+        for mode, predictions in predictions_by_mode.items()
+    }
+
+
+def _iter_chunks(rows: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(rows)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+ScoredShard = dict[str, tuple[list[dict[str, Any]], MetricsAccumulator]]
+ShardJob = tuple[list[TriageInput], dict[str, dict[str, Any]], CachedRows | None]
+GoldLookup = JsonlIndex | GoldIndex
+
+
+def _score_shard(job: ShardJob) -> tuple[ScoredShard, tuple[Predictions, ...] | None]:
+    samples, gold_rows, cached = job
+    if cached is None:
+        fresh = None
+        predictions_by_mode = _run_shard(samples)
+        served = [False] * len(samples)
+    else:
+        fresh = _run_shard([sample for sample, row in zip(samples, cached[0]) if row is None])
+        predictions_by_mode = _fill_misses(cached, fresh)
+        served = [row is not None for row in cached[0]]
+    scored: ScoredShard = {}
+    for mode, predictions in zip(("workflow", "agent"), predictions_by_mode):
+        with profile_stage("score"):
+            accumulator = MetricsAccumulator(latency=True)
+            csv_rows = []
+            for prediction, was_cached in zip(predictions, served):
+                accumulator.add(prediction, gold_rows.get(prediction["doc_id"]), was_cached)
+                csv_rows.append(_prediction_csv_row(prediction))
+        scored[mode] = (csv_rows, accumulator)
+    # Only newly executed predictions travel back, for the parent to cache.
+    return scored, fresh
+
+
+def _shard_jobs(
+    shards: Iterator[list[TriageInput]], gold: GoldLookup, cache: ResultCache | None
+) -> Iterator[tuple[ShardJob, list[list[str]] | None]]:
+    for shard in shards:
+        gold_rows = gold.get_many(row.doc_id for row in shard)
+        if cache is None:
+            yield (shard, gold_rows, None), None
+        else:
+            keys, cached = _cached_predictions(cache, shard, DEFAULT_MODE_CONFIGS)
+            yield (shard, gold_rows, cached), keys
+
+
+def _iter_scored_shards(
+    shards: Iterator[list[TriageInput]],
+    gold: GoldLookup,
+    workers: int,
+    cache: ResultCache | None = None,
+) -> Iterator[ScoredShard]:
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    jobs = profile_iter("ingest", _shard_jobs(shards, gold, cache))
+
+    def finish(
+        job: ShardJob,
+        keys: list[list[str]] | None,
+        result: tuple[ScoredShard, tuple[Predictions, ...] | None],
+    ) -> ScoredShard:
+        scored, fresh = result
+        if cache is not None and keys is not None and job[2] is not None and fresh is not None:
+            _store_fresh(cache, keys, job[2], fresh)
+        return scored
+
+    if workers == 1:
+        for job, keys in jobs:
+            yield finish(job, keys, _score_shard(job))
+        return
+
+    # Workers return CSV rows and partial accumulators rather than full
+    # predictions; a bounded window keeps only a few shards in flight.
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(configure_validation_sampling(), get_span_exporter()),
+    ) as pool:
+        for window in _iter_chunks(jobs, workers * _SHARDS_PER_WORKER):
+            results = pool.map(_score_shard, [job for job, _ in window])
+            for (job, keys), result in zip(window, results):
+                yield finish(job, keys, result)
+
+
+def _open_offset_index(source: Path, quarantine: Quarantine, fallback_dir: Path) -> JsonlIndex:
+    # The sidecar next to the corpus is reused across runs; read-only corpora
+    # get a throwaway index under the run's own directory instead.
+    try:
+        return JsonlIndex.open(source, quarantine=quarantine)
+    except PermissionError:
+        return JsonlIndex.open(source, fallback_dir / f"{source.name}.idx", quarantine)
+
+
+def _open_gold_lookup(gold_path: Path, quarantine: Quarantine, scratch: Path) -> GoldLookup:
+    if detect_compression(gold_path) is not None:
+        # Offsets into a compressed file are useless, so stream it into SQLite once.
+        return GoldIndex.build(gold_path, scratch / "gold.sqlite", quarantine)
+    return _open_offset_index(gold_path, quarantine, scratch)
+
+
+def _load_selected_samples(
+    samples_path: Path, output_dir: Path, quarantine: Quarantine, doc_ids: Sequence[str]
+) -> list[TriageInput]:
+    if detect_compression(samples_path) is None:
+        with _open_offset_index(samples_path, quarantine, output_dir) as index:
+            missing = index.missing(doc_ids)
+            if missing:
+                raise ValueError(f"doc_ids not found in {samples_path}: {missing}")
+            return list(index.triage_inputs(index.rows_for(doc_ids), quarantine))
+
+    # Compressed corpora cannot be indexed; one streaming pass keeps the latest
+    # row per doc_id, in corpus order, as the index would.
+    wanted = set(doc_ids)
+    found: dict[str, tuple[int, TriageInput]] = {}
+    for position, sample in enumerate(iter_triage_inputs(samples_path, quarantine)):
+        if sample.doc_id in wanted:
+            found[sample.doc_id] = (position, sample)
+    missing = [doc_id for doc_id in dict.fromkeys(doc_ids) if doc_id not in found]
+    if missing:
+        raise ValueError(f"doc_ids not found in {samples_path}: {missing}")
+    return [sample for _, sample in sorted(found.values(), key=itemgetter(0))]
+
+
+def _load_selected_gold(
+    gold_path: Path, output_dir: Path, quarantine: Quarantine, doc_ids: Iterable[str]
+) -> dict[str, dict[str, Any]]:
+    if detect_compression(gold_path) is None:
+        with _open_offset_index(gold_path, quarantine, output_dir) as gold_index:
+            return gold_index.get_many(doc_ids)
+    wanted = set(doc_ids)
+    rows = iter_json_objects(gold_path, quarantine, "doc_id")
+    return _gold_index(row for row in rows if row["doc_id"] in wanted)
+
+
+def _run_eval_streaming(
+    samples: Iterator[TriageInput],
+    gold_path: Path,
+    output_dir: Path,
+    predictions_csv_path: Path,
+    workers: int,
+    chunk_size: int,
+    quarantine: Quarantine,
+    cache: ResultCache | None = None,
+) -> dict[str, Any]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    accumulators = {
+        "workflow": MetricsAccumulator(latency=True),
+        "agent": MetricsAccumulator(latency=True),
+    }
+
+    with tempfile.TemporaryDirectory(dir=output_dir) as scratch_dir:
+        scratch = Path(scratch_dir)
+        with profile_stage("ingest"):
+            gold_index = _open_gold_lookup(gold_path, quarantine, scratch)
+        with (
+            gold_index as gold,
+            open_compressed(predictions_csv_path, "w", encoding="utf-8", newline="") as handle,
+            (scratch / "agent_rows.csv").open("w+", encoding="utf-8", newline="") as spool,
+        ):
+            _stream_scored_rows(
+                samples, gold, workers, chunk_size, handle, spool, accumulators, cache
+            )
+
+    with profile_stage("score"):
+        return {
+            "corpus_size": accumulators["workflow"].total,
+            "modes": {mode: accumulator.finalize() for mode, accumulator in accumulators.items()},
+        }
+
+
+def _stream_scored_rows(
+    samples: Iterator[TriageInput],
+    gold: GoldLookup,
+    workers: int,
+    chunk_size: int,
+    handle: Any,
+    spool: Any,
+    accumulators: dict[str, MetricsAccumulator],
+    cache: ResultCache | None = None,
+) -> None:
+    writer = csv.DictWriter(handle, fieldnames=_PREDICTION_FIELDNAMES)
+    writer.writeheader()
+    # The CSV lists every workflow row before any agent row; agent rows are
+    # spooled to disk and appended at the end so memory stays flat.
+    spool_writer = csv.DictWriter(spool, fieldnames=_PREDICTION_FIELDNAMES)
+
+    shards = _iter_chunks(samples, chunk_size)
+    for scored in _iter_scored_shards(shards, gold, workers, cache):
+        for mode, mode_writer in (("workflow", writer), ("agent", spool_writer)):
+            csv_rows, shard_accumulator = scored[mode]
+            with profile_stage("write"):
+                mode_writer.writerows(csv_rows)
+            with profile_stage("score"):
+                accumulators[mode].merge(shard_accumulator)
+
+    with profile_stage("write"):
+        spool.seek(0)
+        shutil.copyfileobj(spool, handle)
+
+
+_PREDICTION_FIELDNAMES = [
+    "mode",
+    "doc_id",
+    "doc_type",
+    "priority",
+    "recommended_queue",
+    "escalate",
+    "escalation_reason",
+    "confidence",
+    "required_missing_fields",
+    "tool_calls",
+    "elapsed_ms",
+    "elapsed_ns",
+]
+
+
+def _prediction_csv_row(prediction: dict[str, Any]) -> dict[str, Any]:
+    trace = prediction.get("decision_trace", {})
+    return {
+        "mode": prediction.get("mode"),
+        "doc_id": prediction.get("doc_id"),
+        "doc_type": prediction.get("doc_type"),
+        "priority": prediction.get("priority"),
+        "recommended_queue": prediction.get("recommended_queue"),
+        "escalate": prediction.get("escalate"),
+        "escalation_reason": prediction.get("escalation_reason"),
+        "confidence": prediction.get("confidence"),
+        "required_missing_fields": ",".join(prediction.get("required_missing_fields", [])),
+        "tool_calls": trace.get("tool_calls", 0),
+        "elapsed_ms": trace.get("elapsed_ms", 0),
+        "elapsed_ns": trace.get("elapsed_ns", 0),
+    }
 
-    with path.open("w", encoding="utf-8", newline="") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
+
+def _write_predictions_csv(path: Path, predictions: list[dict[str, Any]]) -> None:
+    with open_compressed(path, "w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=_PREDICTION_FIELDNAMES)
         writer.writeheader()
 
         for prediction in predictions:
-            trace = prediction.get("decision_trace", {})
-            writer.writerow(
-                {
-                    "mode": prediction.get("mode"),
-                    "doc_id": prediction.get("doc_id"),
-                    "doc_type": prediction.get("doc_type"),
-                    "priority": prediction.get("priority"),
-                    "recommended_queue": prediction.get("recommended_queue"),
-                    "escalate": prediction.get("escalate"),
-                    "escalation_reason": prediction.get("escalation_reason"),
-                    "confidence": prediction.get("confidence"),
-                    "required_missing_fields": ",".join(
-                        prediction.get("required_missing_fields", [])
-                    ),
-                    "tool_calls": trace.get("tool_calls", 0),
-                    "elapsed_ms": trace.get("elapsed_ms", 0),
-                }
-            )
+            writer.writerow(_prediction_csv_row(prediction))
+
+
+def _latency_cells(latency: dict[str, Any]) -> str:
+    labels = ("p50_ms", "p90_ms", "p99_ms", "p99_9_ms", "max_ms")
+    return " | ".join(f"{latency.get(label, 0.0):.3f}" for label in labels)
 
 
 def _write_markdown_summary(path: Path, summary: dict[str, Any]) -> None:
@@ -108,6 +500,45 @@ def _write_markdown_summary(path: Path, summary: dict[str, Any]) -> None:
             f"{metrics['distinct_step_patterns']} |"
         )
 
+    lines.append("")
+    lines.append("## Latency")
+    lines.append("")
+    lines.append("Rows served from the result cache are excluded from every latency figure.")
+    lines.append("")
+    lines.append("| Mode | Count | Cached | p50 ms | p90 ms | p99 ms | p99.9 ms | Max ms |")
+    lines.append("|------|-------|--------|--------|--------|--------|----------|--------|")
+
+    for mode in ("workflow", "agent"):
+        metrics = summary["modes"][mode]
+        latency = metrics["latency"]
+        lines.append(
+            f"| {mode} | {latency['count']} | {metrics.get('cached_rows', 0)} | "
+            f"{_latency_cells(latency)} |"
+        )
+
+    lines.append("")
+    lines.append("## Stage Latency")
+    lines.append("")
+    lines.append("| Mode | Stage | Count | p50 ms | p90 ms | p99 ms | p99.9 ms | Max ms |")
+    lines.append("|------|-------|-------|--------|--------|--------|----------|--------|")
+
+    for mode in ("workflow", "agent"):
+        for stage, latency in summary["modes"][mode].get("stage_latency", {}).items():
+            lines.append(f"| {mode} | {stage} | {latency['count']} | {_latency_cells(latency)} |")
+
+    lines.append("")
+    lines.append("## Tool Usage")
+    lines.append("")
+    lines.append("| Mode | Tool | Calls | Avg ms | Total ms |")
+    lines.append("|------|------|-------|--------|----------|")
+
+    for mode in ("workflow", "agent"):
+        for tool_name, usage in summary["modes"][mode].get("tool_usage", {}).items():
+            lines.append(
+                f"| {mode} | {tool_name} | {usage['calls']} | "
+                f"{usage['avg_elapsed_ms']:.4f} | {usage['total_elapsed_ms']:.3f} |"
+            )
+
     lines.append("")
     lines.append("## Slices")
     lines.append("")
@@ -118,20 +549,44 @@ def _write_markdown_summary(path: Path, summary: dict[str, Any]) -> None:
         agent_slice = summary["modes"]["agent"]["slices"].get(label, {})
         lines.append(f"### {label}")
         lines.append("")
-        lines.append("| Mode | Count | DocType Acc | Queue Acc |")
-        lines.append("|------|-------|-------------|-----------|")
+        lines.append(
+            "| Mode | Count | DocType Acc | Queue Acc "
+            "| p50 ms | p90 ms | p99 ms | p99.9 ms | Max ms |"
+        )
+        lines.append(
+            "|------|-------|-------------|-----------"
+            "|--------|--------|--------|----------|--------|"
+        )
         lines.append(
             f"| workflow | {workflow_slice.get('count', 0)} | "
             f"{workflow_slice.get('doc_type_accuracy', 0.0):.3f} | "
-            f"{workflow_slice.get('queue_accuracy', 0.0):.3f} |"
+            f"{workflow_slice.get('queue_accuracy', 0.0):.3f} | "
+            f"{_latency_cells(workflow_slice.get('latency', {}))} |"
         )
         lines.append(
             f"| agent | {agent_slice.get('count', 0)} | "
             f"{agent_slice.get('doc_type_accuracy', 0.0):.3f} | "
-            f"{agent_slice.get('queue_accuracy', 0.0):.3f} |"
+            f"{agent_slice.get('queue_accuracy', 0.0):.3f} | "
+            f"{_latency_cells(agent_slice.get('latency', {}))} |"
         )
         lines.append("")
 
+    lines.append("## Confusion Matrices")
+    lines.append("")
+    lines.append("Rows are gold labels, columns are predicted labels.")
+    lines.append("")
+
+    for mode in ("workflow", "agent"):
+        for name, confusion in summary["modes"][mode].get("confusion_matrices", {}).items():
+            labels = [str(label) for label in confusion["labels"]]
+            lines.append(f"### {mode}: {name}")
+            lines.append("")
+            lines.append("| Gold \\ Predicted | " + " | ".join(labels) + " |")
+            lines.append("|" + "---|" * (len(labels) + 1))
+            for label, row in zip(labels, confusion["matrix"]):
+                lines.append(f"| {label} | " + " | ".join(str(count) for count in row) + " |")
+            lines.append("")
+
     path.write_text("\n".join(lines), encoding="utf-8")
 
 
@@ -139,34 +594,97 @@ def run_eval(
     samples_path: Path,
     gold_path: Path,
     output_dir: Path,
+    workers: int = 1,
+    streaming: bool = False,
+    chunk_size: int = _STREAM_CHUNK_SIZE,
+    snapshot_path: Path | None = None,
+    doc_ids: Sequence[str] | None = None,
+    compression: str | None = None,
+    cache_path: Path | None = None,
 ) -> dict[str, Any]:
-    samples = _read_jsonl(samples_path)
-    gold_rows = _read_jsonl(gold_path)
-    gold = _gold_index(gold_rows)
-
-    workflow_predictions = _run_mode("workflow", samples)
-    agent_predictions = _run_mode("agent", samples)
-
-    summary = {
-        "corpus_size": len(samples),
-        "modes": {
-            "workflow": score(workflow_predictions, gold),
-            "agent": score(agent_predictions, gold),
-        },
-    }
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-    summary_json_path = output_dir / "ab_eval_summary.json"
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    predictions_csv_path = with_compression(output_dir / "per_case_predictions.csv", compression)
+    summary_json_path = with_compression(output_dir / "ab_eval_summary.json", compression)
     summary_md_path = output_dir / "ab_eval_summary.md"
-    predictions_csv_path = output_dir / "per_case_predictions.csv"
+    quarantine_path = output_dir / "quarantine.jsonl"
+    # A quarantine file left by an earlier run would otherwise read as this run's.
+    quarantine_path.unlink(missing_ok=True)
+    with (
+        span("eval.run", workers=workers, streaming=streaming) as run_span,
+        Quarantine(quarantine_path) as quarantine,
+        ResultCache(cache_path) if cache_path is not None else nullcontext() as cache,
+    ):
+        if cache is not None:
+            # Results from older engine versions can never be hit again.
+            cache.prune()
+        if streaming:
+            with span("eval.stream"):
+                if doc_ids is not None:
+                    stream = iter(
+                        _load_selected_samples(samples_path, output_dir, quarantine, doc_ids)
+                    )
+                else:
+                    stream = iter_corpus(samples_path, quarantine, snapshot_path)
+                summary = _run_eval_streaming(
+                    stream,
+                    gold_path,
+                    output_dir,
+                    predictions_csv_path,
+                    workers,
+                    chunk_size,
+                    quarantine,
+                    cache,
+                )
+        else:
+            with span("eval.load"), profile_stage("ingest"):
+                if doc_ids is not None:
+                    # Re-running a handful of documents only touches their rows.
+                    samples = _load_selected_samples(
+                        samples_path, output_dir, quarantine, doc_ids
+                    )
+                    gold = _load_selected_gold(
+                        gold_path, output_dir, quarantine, (sample.doc_id for sample in samples)
+                    )
+                else:
+                    samples = load_corpus(samples_path, quarantine, snapshot_path)
+                    gold = _gold_index(iter_json_objects(gold_path, quarantine, "doc_id"))
+
+            with span("eval.run_modes"):
+                predictions_by_mode, cached = _replay(
+                    samples, DEFAULT_MODE_CONFIGS, workers, cache
+                )
+
+            with span("eval.score"), profile_stage("score"):
+                summary = {
+                    "corpus_size": len(samples),
+                    "modes": _score_modes(predictions_by_mode, gold, cached),
+                }
+
+            with span("eval.write_predictions"), profile_stage("write"):
+                output_dir.mkdir(parents=True, exist_ok=True)
+                _write_predictions_csv(
+                    predictions_csv_path,
+                    [row for predictions in predictions_by_mode.values() for row in predictions],
+                )
 
-    summary_json_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
-    _write_markdown_summary(summary_md_path, summary)
-    _write_predictions_csv(predictions_csv_path, workflow_predictions + agent_predictions)
+        with span("eval.write_summary"), profile_stage("write"):
+            with open_compressed(summary_json_path, "w", encoding="utf-8") as handle:
+                handle.write(json.dumps(summary, indent=2))
+            _write_markdown_summary(summary_md_path, summary)
+        if run_span is not None:
+            run_span.attributes["eval.corpus_size"] = summary["corpus_size"]
+            run_span.attributes["eval.quarantined_rows"] = quarantine.count
+            if cache is not None:
+                run_span.attributes["eval.cache_hits"] = cache.hits
 
     return {
         "summary": summary,
         "summary_json": str(summary_json_path),
         "summary_md": str(summary_md_path),
         "predictions_csv": str(predictions_csv_path),
+        "quarantined_rows": quarantine.count,
+        "quarantine": str(quarantine_path) if quarantine.count else None,
+        "snapshot": str(snapshot_path) if snapshot_path is not None else None,
+        "cache": cache.stats() if cache is not None else None,
     }
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from math import ceil
+from typing import Any
+
+# Log-linear buckets in the style of HdrHistogram: values below 256 ns are exact,
+# larger values keep 8 significant bits (under 0.8% relative error).
+_MANTISSA_BITS = 8
+_MANTISSA_LIMIT = 1 << _MANTISSA_BITS
+
+LATENCY_PERCENTILES: tuple[tuple[str, float], ...] = (
+    ("p50_ms", 50.0),
+    ("p90_ms", 90.0),
+    ("p99_ms", 99.0),
+    ("p99_9_ms", 99.9),
+)
+
+
+def bucket_key(value_ns: int) -> int:
+    shift = max(0, value_ns.bit_length() - _MANTISSA_BITS)
+    return (shift << _MANTISSA_BITS) | (value_ns >> shift)
+
+
+def bucket_upper_ns(key: int) -> int:
+    shift, mantissa = key >> _MANTISSA_BITS, key & (_MANTISSA_LIMIT - 1)
+    return ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns: int | None = None
+        self.max_ns = 0
+
+    def record(self, value_ns: int) -> None:
+        value_ns = max(0, int(value_ns))
+        key = bucket_key(value_ns)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.min_ns = value_ns if self.min_ns is None else min(self.min_ns, value_ns)
+        self.max_ns = max(self.max_ns, value_ns)
+
+    def record_buckets(
+        self, buckets: Iterable[tuple[int, int]], *, total_ns: int, min_ns: int, max_ns: int
+    ) -> None:
+        for key, count in buckets:
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.count += count
+        self.total_ns += total_ns
+        self.min_ns = min_ns if self.min_ns is None else min(self.min_ns, min_ns)
+        self.max_ns = max(self.max_ns, max_ns)
+
+    def merge(self, other: LatencyHistogram) -> LatencyHistogram:
+        if other.count:
+            self.record_buckets(
+                other.counts.items(),
+                total_ns=other.total_ns,
+                min_ns=other.min_ns or 0,
+                max_ns=other.max_ns,
+            )
+        return self
+
+    def percentile_ns(self, percentile: float) -> int:
+        if not self.count:
+            return 0
+        rank = max(1, ceil(percentile / 100 * self.count))
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                # Report the bucket's highest equivalent value, never above the
+                # largest value actually observed.
+                return min(bucket_upper_ns(key), self.max_ns)
+        return self.max_ns
+
+    def summary(self) -> dict[str, Any]:
+        summary: dict[str, Any] = {"count": self.count}
+        for label, percentile in LATENCY_PERCENTILES:
+            summary[label] = self.percentile_ns(percentile) / 1_000_000
+        summary["max_ms"] = self.max_ns / 1_000_000
+        return summary
+
+
+def trace_elapsed_ns(trace: dict[str, Any]) -> int:
+    # Traces written before elapsed_ns existed only carry millisecond timings.
+    elapsed_ns = trace.get("elapsed_ns")
+    if elapsed_ns:
+        return int(elapsed_ns)
+    return int(float(trace.get("elapsed_ms", 0)) * 1_000_000)
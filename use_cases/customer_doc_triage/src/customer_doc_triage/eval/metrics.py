@@ -1,89 +1,19 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from statistics import mean
+from collections.abc import Sequence
+from fractions import Fraction
 from typing import Any
 
+from customer_doc_triage.eval.latency import LatencyHistogram, trace_elapsed_ns
 
-def accuracy(
-    predictions: list[dict[str, Any]],
-    gold: dict[str, dict[str, Any]],
-    prediction_field: str,
-    gold_field: str | None = None,
-) -> float:
-    total = len(predictions)
-    if total == 0:
-        return 0.0
-
-    target_gold_field = gold_field or prediction_field
-
-    correct = 0
-    for prediction in predictions:
-        doc_id = prediction["doc_id"]
-        if doc_id in gold and prediction.get(prediction_field) == gold[doc_id].get(target_gold_field):
-            correct += 1
-
-    return correct / total
-
-
-def escalation_precision_recall(
-    predictions: list[dict[str, Any]], gold: dict[str, dict[str, Any]]
-) -> tuple[float, float]:
-    true_positive = 0
-    false_positive = 0
-    false_negative = 0
-
-    for prediction in predictions:
-        doc_id = prediction["doc_id"]
-        if doc_id not in gold:
-            continue
-
-        pred_escalate = bool(prediction.get("escalate", False))
-        gold_escalate = bool(gold[doc_id].get("escalate", False))
-
-        if pred_escalate and gold_escalate:
-            true_positive += 1
-        elif pred_escalate and not gold_escalate:
-            false_positive += 1
-        elif not pred_escalate and gold_escalate:
-            false_negative += 1
-
-    precision = true_positive / (true_positive + false_positive) if (true_positive + false_positive) else 0.0
-    recall = true_positive / (true_positive + false_negative) if (true_positive + false_negative) else 0.0
-    return precision, recall
-
-
-def missing_field_recall(predictions: list[dict[str, Any]], gold: dict[str, dict[str, Any]]) -> float:
-    recalls: list[float] = []
-
-    for prediction in predictions:
-        doc_id = prediction["doc_id"]
-        if doc_id not in gold:
-            continue
-
-        pred_missing = set(prediction.get("required_missing_fields", []))
-        gold_missing = set(gold[doc_id].get("required_missing_fields", []))
+CONFUSION_FIELDS = ("doc_type", "recommended_queue", "priority", "escalate")
 
-        if not gold_missing:
-            recalls.append(1.0)
-            continue
 
-        recalls.append(len(pred_missing & gold_missing) / len(gold_missing))
-
-    return mean(recalls) if recalls else 0.0
-
-
-def latency_and_cost_proxies(predictions: list[dict[str, Any]]) -> dict[str, float]:
-    if not predictions:
-        return {"avg_elapsed_ms": 0.0, "avg_tool_calls": 0.0}
-
-    elapsed = [float(pred.get("decision_trace", {}).get("elapsed_ms", 0)) for pred in predictions]
-    tool_calls = [float(pred.get("decision_trace", {}).get("tool_calls", 0)) for pred in predictions]
-
-    return {
-        "avg_elapsed_ms": mean(elapsed),
-        "avg_tool_calls": mean(tool_calls),
-    }
+def tool_elapsed_ns(stats: dict[str, Any]) -> int:
+    # Whole nanoseconds sum exactly in any order; tool timings are measured at
+    # that resolution anyway.
+    return round(float(stats.get("elapsed_ms", 0.0)) * 1_000_000)
 
 
 def distinct_step_patterns(predictions: list[dict[str, Any]]) -> int:
@@ -98,67 +28,241 @@ def edge_case_flag(gold_row: dict[str, Any]) -> bool:
     return bool(gold_row.get("escalate", False) or gold_row.get("required_missing_fields"))
 
 
-def slice_summary(
-    predictions: list[dict[str, Any]], gold: dict[str, dict[str, Any]]
-) -> dict[str, dict[str, float | int]]:
-    by_doc_type: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    by_edge_case: dict[str, list[dict[str, Any]]] = defaultdict(list)
-
-    for prediction in predictions:
-        doc_id = prediction["doc_id"]
-        if doc_id not in gold:
-            continue
+def confusion_matrix(counts: dict[tuple[Any, Any], int]) -> dict[str, Any]:
+    # Labels seen on either side, ordered by their text so every scorer and
+    # shard order agrees; rows are gold labels, columns are predicted labels.
+    labels = sorted({label for pair in counts for label in pair}, key=str)
+    position = {label: index for index, label in enumerate(labels)}
+    matrix = [[0] * len(labels) for _ in labels]
+    for (expected, predicted), count in counts.items():
+        matrix[position[expected]][position[predicted]] += count
+    return {"labels": labels, "matrix": matrix}
 
-        gold_row = gold[doc_id]
-        by_doc_type[str(gold_row.get("true_doc_type", "unknown"))].append(prediction)
-        by_edge_case["edge_case" if edge_case_flag(gold_row) else "non_edge_case"].append(prediction)
 
-    summary: dict[str, dict[str, float | int]] = {}
-
-    for label, rows in by_doc_type.items():
-        summary[f"doc_type:{label}"] = {
-            "count": len(rows),
-            "doc_type_accuracy": accuracy(
-                rows,
-                gold,
-                prediction_field="doc_type",
-                gold_field="true_doc_type",
-            ),
-            "queue_accuracy": accuracy(rows, gold, prediction_field="recommended_queue"),
+def score(
+    predictions: list[dict[str, Any]],
+    gold: dict[str, dict[str, Any]],
+    cached: Sequence[bool] | None = None,
+    latency: bool = False,
+) -> dict[str, Any]:
+    accumulator = MetricsAccumulator(latency=latency)
+    flags = cached if cached is not None else [False] * len(predictions)
+    for prediction, was_cached in zip(predictions, flags):
+        accumulator.add(prediction, gold.get(prediction["doc_id"]), cached=was_cached)
+    return accumulator.finalize()
+
+
+class MetricsAccumulator:
+    def __init__(self, latency: bool = False) -> None:
+        # Histograms cost more per row than every other metric together, so
+        # they are only recorded when the latency report is asked for.
+        self.record_latency = latency
+        self.total = 0
+        self.cached = 0
+        self.doc_type_correct = 0
+        self.queue_correct = 0
+        self.true_positive = 0
+        self.false_positive = 0
+        self.false_negative = 0
+        # Recalls take few distinct values, so counting them keeps the mean exact
+        # (as statistics.mean) and independent of row and shard order.
+        self.missing_recalls: dict[float, int] = defaultdict(int)
+        self.missing_recall_count = 0
+        self.elapsed_ms_sum = 0
+        self.tool_calls_sum = 0
+        self.latency = LatencyHistogram()
+        self.slice_latency: dict[str, LatencyHistogram] = {}
+        self.stage_latency: dict[str, LatencyHistogram] = {}
+        self.step_patterns: set[tuple[str, ...]] = set()
+        self.tool_calls_by_tool: dict[str, int] = defaultdict(int)
+        self.tool_elapsed_ns_by_tool: dict[str, int] = defaultdict(int)
+        # label -> [count, doc_type_correct, queue_correct], in first-seen order.
+        self.doc_type_slices: dict[str, list[int]] = {}
+        self.edge_case_slices: dict[str, list[int]] = {}
+        # field -> (gold label, predicted label) -> count.
+        self.confusion: dict[str, dict[tuple[Any, Any], int]] = {
+            name: defaultdict(int) for name in CONFUSION_FIELDS
         }
 
-    for label, rows in by_edge_case.items():
-        summary[f"slice:{label}"] = {
-            "count": len(rows),
-            "doc_type_accuracy": accuracy(
-                rows,
-                gold,
-                prediction_field="doc_type",
-                gold_field="true_doc_type",
+    def add(
+        self, prediction: dict[str, Any], gold_row: dict[str, Any] | None, cached: bool = False
+    ) -> None:
+        trace = prediction.get("decision_trace", {})
+        self.total += 1
+        self.tool_calls_sum += int(trace.get("tool_calls", 0))
+        self.step_patterns.add(tuple(trace.get("steps", [])))
+        # A cached prediction carries timings from the run that produced it, so
+        # it stays out of every latency and tool timing figure.
+        elapsed_ns = None
+        if cached:
+            self.cached += 1
+        else:
+            self.elapsed_ms_sum += int(trace.get("elapsed_ms", 0))
+            if self.record_latency:
+                elapsed_ns = trace_elapsed_ns(trace)
+                self.latency.record(elapsed_ns)
+                for span in trace.get("spans", []):
+                    if span["name"] not in self.stage_latency:
+                        self.stage_latency[span["name"]] = LatencyHistogram()
+                    self.stage_latency[span["name"]].record(int(span.get("duration_ns", 0)))
+            for tool_name, stats in trace.get("tool_stats", {}).items():
+                self.tool_calls_by_tool[tool_name] += int(stats.get("calls", 0))
+                self.tool_elapsed_ns_by_tool[tool_name] += tool_elapsed_ns(stats)
+
+        if gold_row is None:
+            return
+
+        doc_type_hit = prediction.get("doc_type") == gold_row.get("true_doc_type")
+        queue_hit = prediction.get("recommended_queue") == gold_row.get("recommended_queue")
+        self.doc_type_correct += doc_type_hit
+        self.queue_correct += queue_hit
+
+        pred_escalate = bool(prediction.get("escalate", False))
+        gold_escalate = bool(gold_row.get("escalate", False))
+        if pred_escalate and gold_escalate:
+            self.true_positive += 1
+        elif pred_escalate and not gold_escalate:
+            self.false_positive += 1
+        elif not pred_escalate and gold_escalate:
+            self.false_negative += 1
+
+        confusion = self.confusion
+        confusion["doc_type"][gold_row.get("true_doc_type"), prediction.get("doc_type")] += 1
+        confusion["recommended_queue"][
+            gold_row.get("recommended_queue"), prediction.get("recommended_queue")
+        ] += 1
+        confusion["priority"][gold_row.get("priority"), prediction.get("priority")] += 1
+        confusion["escalate"][gold_escalate, pred_escalate] += 1
+
+        gold_missing = set(gold_row.get("required_missing_fields", []))
+        if gold_missing:
+            pred_missing = set(prediction.get("required_missing_fields", []))
+            recall = len(pred_missing & gold_missing) / len(gold_missing)
+        else:
+            recall = 1.0
+        self.missing_recalls[recall] += 1
+        self.missing_recall_count += 1
+
+        doc_type_label = str(gold_row.get("true_doc_type", "unknown"))
+        edge_case_label = "edge_case" if edge_case_flag(gold_row) else "non_edge_case"
+        for slices, prefix, label in (
+            (self.doc_type_slices, "doc_type", doc_type_label),
+            (self.edge_case_slices, "slice", edge_case_label),
+        ):
+            counts = slices.setdefault(label, [0, 0, 0])
+            counts[0] += 1
+            counts[1] += doc_type_hit
+            counts[2] += queue_hit
+            if not self.record_latency:
+                continue
+            slice_key = f"{prefix}:{label}"
+            if slice_key not in self.slice_latency:
+                self.slice_latency[slice_key] = LatencyHistogram()
+            if elapsed_ns is not None:
+                self.slice_latency[slice_key].record(elapsed_ns)
+
+    def merge(self, other: MetricsAccumulator) -> MetricsAccumulator:
+        # Merging shards in corpus order reproduces the serial accumulator,
+        # including the first-seen order of slice labels.
+        self.total += other.total
+        self.cached += other.cached
+        self.doc_type_correct += other.doc_type_correct
+        self.queue_correct += other.queue_correct
+        self.true_positive += other.true_positive
+        self.false_positive += other.false_positive
+        self.false_negative += other.false_negative
+        for recall, count in other.missing_recalls.items():
+            self.missing_recalls[recall] += count
+        self.missing_recall_count += other.missing_recall_count
+        self.elapsed_ms_sum += other.elapsed_ms_sum
+        self.tool_calls_sum += other.tool_calls_sum
+        self.latency.merge(other.latency)
+        for slice_key, histogram in other.slice_latency.items():
+            self.slice_latency.setdefault(slice_key, LatencyHistogram()).merge(histogram)
+        for stage, histogram in other.stage_latency.items():
+            self.stage_latency.setdefault(stage, LatencyHistogram()).merge(histogram)
+        self.step_patterns |= other.step_patterns
+        for tool_name, calls in other.tool_calls_by_tool.items():
+            self.tool_calls_by_tool[tool_name] += calls
+            self.tool_elapsed_ns_by_tool[tool_name] += other.tool_elapsed_ns_by_tool[tool_name]
+        for slices, other_slices in (
+            (self.doc_type_slices, other.doc_type_slices),
+            (self.edge_case_slices, other.edge_case_slices),
+        ):
+            for label, other_counts in other_slices.items():
+                counts = slices.setdefault(label, [0, 0, 0])
+                for index, value in enumerate(other_counts):
+                    counts[index] += value
+        for name, other_counts in other.confusion.items():
+            for pair, count in other_counts.items():
+                self.confusion[name][pair] += count
+        return self
+
+    def finalize(self) -> dict[str, Any]:
+        total = self.total
+        executed = total - self.cached
+        flagged = self.true_positive + self.false_positive
+        actual = self.true_positive + self.false_negative
+
+        slices: dict[str, dict[str, float | int]] = {}
+        for prefix, by_label in (
+            ("doc_type", self.doc_type_slices),
+            ("slice", self.edge_case_slices),
+        ):
+            for label, (count, doc_type_correct, queue_correct) in by_label.items():
+                slices[f"{prefix}:{label}"] = {
+                    "count": count,
+                    "doc_type_accuracy": doc_type_correct / count,
+                    "queue_accuracy": queue_correct / count,
+                }
+                if self.record_latency:
+                    slices[f"{prefix}:{label}"]["latency"] = self.slice_latency[
+                        f"{prefix}:{label}"
+                    ].summary()
+
+        summary = {
+            "doc_type_accuracy": self.doc_type_correct / total if total else 0.0,
+            "queue_accuracy": self.queue_correct / total if total else 0.0,
+            "escalation_precision": self.true_positive / flagged if flagged else 0.0,
+            "escalation_recall": self.true_positive / actual if actual else 0.0,
+            "missing_field_recall": (
+                float(
+                    sum(
+                        (Fraction(recall) * count for recall, count in self.missing_recalls.items()),
+                        Fraction(0),
+                    )
+                    / self.missing_recall_count
+                )
+                if self.missing_recall_count
+                else 0.0
             ),
-            "queue_accuracy": accuracy(rows, gold, prediction_field="recommended_queue"),
+            "avg_elapsed_ms": self.elapsed_ms_sum / executed if executed else 0.0,
+            "avg_tool_calls": self.tool_calls_sum / total if total else 0.0,
+            "cached_rows": self.cached,
+            "latency": self.latency.summary(),
+            "stage_latency": {
+                stage: self.stage_latency[stage].summary() for stage in sorted(self.stage_latency)
+            },
+            "distinct_step_patterns": len(self.step_patterns),
+            "tool_usage": {
+                tool_name: {
+                    "calls": self.tool_calls_by_tool[tool_name],
+                    "total_elapsed_ms": self.tool_elapsed_ns_by_tool[tool_name] / 1_000_000,
+                    "avg_elapsed_ms": (
+                        self.tool_elapsed_ns_by_tool[tool_name]
+                        / 1_000_000
+                        / self.tool_calls_by_tool[tool_name]
+                        if self.tool_calls_by_tool[tool_name]
+                        else 0.0
+                    ),
+                }
+                for tool_name in sorted(self.tool_calls_by_tool)
+            },
+            "slices": slices,
+            "confusion_matrices": {
+                name: confusion_matrix(counts) for name, counts in self.confusion.items()
+            },
         }
-
-    return summary
-
-
-def score(predictions: list[dict[str, Any]], gold: dict[str, dict[str, Any]]) -> dict[str, Any]:
-    escalation_precision, escalation_recall = escalation_precision_recall(predictions, gold)
-    proxies = latency_and_cost_proxies(predictions)
-
-    return {
-        "doc_type_accuracy": accuracy(
-            predictions,
-            gold,
-            prediction_field="doc_type",
-            gold_field="true_doc_type",
-        ),
-        "queue_accuracy": accuracy(predictions, gold, prediction_field="recommended_queue"),
-        "escalation_precision": escalation_precision,
-        "escalation_recall": escalation_recall,
-        "missing_field_recall": missing_field_recall(predictions, gold),
-        "avg_elapsed_ms": proxies["avg_elapsed_ms"],
-        "avg_tool_calls": proxies["avg_tool_calls"],
-        "distinct_step_patterns": distinct_step_patterns(predictions),
-        "slices": slice_summary(predictions, gold),
-    }
+        if not self.record_latency:
+            del summary["latency"], summary["stage_latency"]
+        return summary
@@ -1,28 +1,107 @@
 from __future__ import annotations
 
 import argparse
+from contextlib import nullcontext
 from pathlib import Path
 
 from customer_doc_triage.eval.harness import run_eval
+from customer_doc_triage.ingest import COMPRESSIONS
+from customer_doc_triage.telemetry import (
+    PROFILE_KINDS,
+    OtlpJsonFileExporter,
+    configure_tracing,
+    print_profile,
+    profiling,
+    shutdown_tracing,
+)
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Run A/B replay evaluation for customer_doc_triage.")
+    parser = argparse.ArgumentParser(
+        description="Run A/B replay evaluation for customer_doc_triage.", fromfile_prefix_chars="@"
+    )
     default_data_dir = Path(__file__).resolve().parents[3] / "experiments" / "agents_vs_workflows" / "data"
     default_output_dir = Path(__file__).resolve().parents[3] / "experiments" / "agents_vs_workflows" / "eval_outputs"
 
     parser.add_argument("--samples", type=Path, default=default_data_dir / "samples.jsonl")
     parser.add_argument("--gold", type=Path, default=default_data_dir / "gold.jsonl")
     parser.add_argument("--out", type=Path, default=default_output_dir)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Processes to shard the corpus across."
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Stream samples and score incrementally with flat memory use.",
+    )
+    parser.add_argument(
+        "--trace-out",
+        type=Path,
+        default=None,
+        help="Append OTLP/JSON spans for the eval and every decision to this file.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        type=Path,
+        default=None,
+        help="Binary snapshot of the parsed samples; reused while samples are unchanged.",
+    )
+    parser.add_argument(
+        "--doc-ids",
+        nargs="+",
+        default=None,
+        help="Only evaluate these doc_ids, read through the samples offset index (@file works).",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default=None,
+        help="Write the predictions CSV and summary JSON compressed.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=None,
+        help="SQLite result cache; only new or changed documents are triaged again.",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_KINDS,
+        default=None,
+        help="Profile ingest, each mode, scoring and writing with cProfile or tracemalloc.",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=15, help="Hotspot rows to print with --profile."
+    )
     args = parser.parse_args()
 
-    result = run_eval(samples_path=args.samples, gold_path=args.gold, output_dir=args.out)
+    if args.trace_out is not None:
+        configure_tracing(OtlpJsonFileExporter(args.trace_out))
+    try:
+        with profiling(args.profile) if args.profile else nullcontext() as profiler:
+            result = run_eval(
+                samples_path=args.samples,
+                gold_path=args.gold,
+                output_dir=args.out,
+                workers=args.workers,
+                streaming=args.streaming,
+                snapshot_path=args.snapshot,
+                doc_ids=args.doc_ids,
+                compression=args.compress,
+                cache_path=args.cache,
+            )
+    finally:
+        shutdown_tracing()
+    if profiler is not None:
+        print_profile(profiler, args.out / "profile", args.profile_top, args.workers)
     print(
         {
             "corpus_size": result["summary"]["corpus_size"],
             "summary_json": result["summary_json"],
             "summary_md": result["summary_md"],
             "predictions_csv": result["predictions_csv"],
+            "quarantined_rows": result["quarantined_rows"],
+            "cache": result["cache"],
         }
     )
 
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+from collections.abc import Iterable
+from functools import cache
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+import pydantic
+
+from customer_doc_triage.triage.schemas import TriageInput
+
+if TYPE_CHECKING:
+    from customer_doc_triage.eval.harness import ModeConfig
+
+# Bump when the stored prediction payload changes shape.
+CACHE_FORMAT = 1
+# Every package that can change a decision; editing any of them (policy
+# tables, keywords, engine, agent tools) invalidates earlier results.
+_ENGINE_PACKAGES = ("agent", "batch", "triage", "workflow")
+# Stays under SQLITE_MAX_VARIABLE_NUMBER on every supported sqlite build.
+_LOOKUP_BATCH = 500
+# Outcomes that depend on wall-clock budgets rather than on the input.
+_TIMING_DEPENDENT_STEPS = ("guardrail_timeout", "guardrail_tool_timeout")
+
+
+@cache
+def engine_fingerprint() -> str:
+    digest = hashlib.sha256(f"{CACHE_FORMAT}:{pydantic.VERSION}".encode())
+    package_root = Path(__file__).resolve().parents[1]
+    for package in _ENGINE_PACKAGES:
+        for path in sorted((package_root / package).rglob("*.py")):
+            digest.update(path.relative_to(package_root).as_posix().encode())
+            digest.update(b"\0")
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def input_digest(item: TriageInput) -> str:
+    # Sorted keys so metadata that only differs in key order hashes the same.
+    normalized = json.dumps(
+        item.model_dump(mode="json"), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(prediction: dict[str, Any]) -> bool:
+    steps = prediction.get("decision_trace", {}).get("steps", [])
+    return not any(step.startswith(_TIMING_DEPENDENT_STEPS) for step in steps)
+
+
+class ResultCache:
+    def __init__(self, path: Path, fingerprint: str | None = None) -> None:
+        self.path = path
+        self.fingerprint = fingerprint or engine_fingerprint()
+        self.hits = 0
+        self.misses = 0
+        self.pruned = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, prediction TEXT NOT NULL)"
+        )
+
+    def key(self, digest: str, config: ModeConfig) -> str:
+        # The config name is only a label, so renamed configs share results.
+        parts = (
+            self.fingerprint,
+            digest,
+            config.mode,
+            str(config.max_retries),
+            str(config.max_tool_calls),
+            str(config.timeout_ms),
+        )
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, dict[str, Any]]:
+        found: dict[str, dict[str, Any]] = {}
+        pending = iter(dict.fromkeys(keys))
+        requested = 0
+        while batch := list(islice(pending, _LOOKUP_BATCH)):
+            requested += len(batch)
+            placeholders = ",".join("?" * len(batch))
+            cursor = self._connection.execute(
+                f"SELECT key, prediction FROM results WHERE key IN ({placeholders})", batch
+            )
+            found.update((key, json.loads(prediction)) for key, prediction in cursor)
+        self.hits += len(found)
+        self.misses += requested - len(found)
+        return found
+
+    def put_many(self, items: Iterable[tuple[str, dict[str, Any]]]) -> int:
+        rows = [
+            (key, self.fingerprint, json.dumps(prediction))
+            for key, prediction in items
+            if is_cacheable(prediction)
+        ]
+        self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?)", rows)
+        self._connection.commit()
+        return len(rows)
+
+    def prune(self) -> int:
+        # Drops results recorded under any other engine fingerprint.
+        cursor = self._connection.execute(
+            "DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,)
+        )
+        self._connection.commit()
+        self.pruned += cursor.rowcount
+        return cursor.rowcount
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "hits": self.hits,
+            "misses": self.misses,
+            "pruned": self.pruned,
+        }
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Hashable, Iterable, Sequence
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Any
+
+from customer_doc_triage.eval.latency import LatencyHistogram, trace_elapsed_ns
+from customer_doc_triage.eval.metrics import CONFUSION_FIELDS, edge_case_flag, tool_elapsed_ns
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without the optional extra
+    np = None  # type: ignore[assignment]
+
+HAS_NUMPY = np is not None
+
+_GOLD_FIELD = {"doc_type": "true_doc_type"}
+_MAX_MISSING_FIELDS = 63
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "Vectorized scoring needs numpy; install customer-doc-triage[fast] or use score()."
+        )
+
+
+class _Vocabulary:
+    def __init__(self) -> None:
+        self.codes: dict[Hashable, int] = {}
+
+    def encode(self, values: Iterable[Hashable]) -> Any:
+        codes = self.codes
+        return np.fromiter(
+            (codes.setdefault(value, len(codes)) for value in values), dtype=np.int64
+        )
+
+    @property
+    def labels(self) -> list[Hashable]:
+        return list(self.codes)
+
+
+@dataclass
+class EncodedGold:
+    doc_index: dict[str, int]
+    labels: dict[str, Any]
+    missing_mask: Any
+    doc_type_slice: Any
+    edge_case: Any
+    vocabularies: dict[str, _Vocabulary] = field(default_factory=dict)
+    field_bits: dict[str, int] = field(default_factory=dict)
+    slice_vocabulary: _Vocabulary = field(default_factory=_Vocabulary)
+
+
+@dataclass
+class EncodedPredictions:
+    gold_row: Any
+    labels: dict[str, Any]
+    missing_mask: Any
+    # Rows executed in this run; cached rows are left out of every timing figure.
+    fresh: Any
+    elapsed_ms: Any
+    elapsed_ns: Any
+    stage_durations_ns: dict[str, Any]
+    tool_calls: Any
+    distinct_step_patterns: int
+    tool_calls_by_tool: dict[str, int]
+    tool_elapsed_ns_by_tool: dict[str, int]
+
+
+def _missing_mask(field_bits: dict[str, int], fields: Iterable[str]) -> int:
+    mask = 0
+    for name in fields:
+        bit = field_bits.setdefault(name, len(field_bits))
+        if bit >= _MAX_MISSING_FIELDS:
+            raise ValueError("Too many distinct required_missing_fields to encode as a bitmask")
+        mask |= 1 << bit
+    return mask
+
+
+def encode_gold(gold: dict[str, dict[str, Any]]) -> EncodedGold:
+    _require_numpy()
+    rows = list(gold.values())
+    vocabularies = {name: _Vocabulary() for name in CONFUSION_FIELDS}
+    field_bits: dict[str, int] = {}
+    slice_vocabulary = _Vocabulary()
+
+    labels = {
+        name: vocabularies[name].encode(
+            bool(row.get("escalate", False))
+            if name == "escalate"
+            else row.get(_GOLD_FIELD.get(name, name))
+            for row in rows
+        )
+        for name in CONFUSION_FIELDS
+    }
+    return EncodedGold(
+        doc_index={doc_id: index for index, doc_id in enumerate(gold)},
+        labels=labels,
+        missing_mask=np.fromiter(
+            (_missing_mask(field_bits, row.get("required_missing_fields", [])) for row in rows),
+            dtype=np.int64,
+            count=len(rows),
+        ),
+        doc_type_slice=slice_vocabulary.encode(
+            str(row.get("true_doc_type", "unknown")) for row in rows
+        ),
+        edge_case=np.fromiter((edge_case_flag(row) for row in rows), dtype=bool, count=len(rows)),
+        vocabularies=vocabularies,
+        field_bits=field_bits,
+        slice_vocabulary=slice_vocabulary,
+    )
+
+
+def encode_predictions(
+    predictions: list[dict[str, Any]],
+    encoded_gold: EncodedGold,
+    cached: Sequence[bool] | None = None,
+) -> EncodedPredictions:
+    _require_numpy()
+    count = len(predictions)
+    traces = [prediction.get("decision_trace", {}) for prediction in predictions]
+    fresh = np.ones(count, dtype=bool) if cached is None else ~np.asarray(cached, dtype=bool)
+
+    step_patterns = {tuple(trace.get("steps", [])) for trace in traces}
+    tool_calls_by_tool: dict[str, int] = defaultdict(int)
+    tool_elapsed_ns_by_tool: dict[str, int] = defaultdict(int)
+    stage_durations: dict[str, list[int]] = defaultdict(list)
+    for trace, is_fresh in zip(traces, fresh.tolist()):
+        if not is_fresh:
+            continue
+        for span in trace.get("spans", []):
+            stage_durations[span["name"]].append(max(0, int(span.get("duration_ns", 0))))
+        for tool_name, stats in trace.get("tool_stats", {}).items():
+            tool_calls_by_tool[tool_name] += int(stats.get("calls", 0))
+            tool_elapsed_ns_by_tool[tool_name] += tool_elapsed_ns(stats)
+
+    labels = {
+        name: encoded_gold.vocabularies[name].encode(
+            bool(prediction.get("escalate", False))
+            if name == "escalate"
+            else prediction.get(name)
+            for prediction in predictions
+        )
+        for name in CONFUSION_FIELDS
+    }
+    doc_index = encoded_gold.doc_index
+    field_bits = encoded_gold.field_bits
+    return EncodedPredictions(
+        gold_row=np.fromiter(
+            (doc_index.get(prediction["doc_id"], -1) for prediction in predictions),
+            dtype=np.int64,
+            count=count,
+        ),
+        labels=labels,
+        missing_mask=np.fromiter(
+            (
+                _missing_mask(field_bits, prediction.get("required_missing_fields", []))
+                for prediction in predictions
+            ),
+            dtype=np.int64,
+            count=count,
+        ),
+        fresh=fresh,
+        elapsed_ms=np.fromiter(
+            (int(trace.get("elapsed_ms", 0)) for trace in traces), dtype=np.int64, count=count
+        ),
+        elapsed_ns=np.fromiter(
+            (max(0, trace_elapsed_ns(trace)) for trace in traces), dtype=np.int64, count=count
+        ),
+        stage_durations_ns={
+            stage: np.array(durations, dtype=np.int64)
+            for stage, durations in stage_durations.items()
+        },
+        tool_calls=np.fromiter(
+            (int(trace.get("tool_calls", 0)) for trace in traces), dtype=np.int64, count=count
+        ),
+        distinct_step_patterns=len(step_patterns),
+        tool_calls_by_tool=dict(tool_calls_by_tool),
+        tool_elapsed_ns_by_tool=dict(tool_elapsed_ns_by_tool),
+    )
+
+
+def _popcount(values: Any) -> Any:
+    bits = np.unpackbits(values.astype("<i8").view(np.uint8).reshape(-1, 8), axis=1)
+    return bits.sum(axis=1, dtype=np.int64)
+
+
+def _bucket_keys(values_ns: Any) -> Any:
+    # Vectorized eval.latency.bucket_key; frexp can round up just below a power
+    # of two for values past 2**53, so correct the bit length where it did.
+    bit_length = np.frexp(values_ns.astype(np.float64))[1].astype(np.int64)
+    bit_length -= (values_ns >> np.maximum(bit_length - 1, 0)) == 0
+    shift = np.maximum(bit_length - 8, 0)
+    return (shift << 8) | (values_ns >> shift)
+
+
+def _histogram(values_ns: Any) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    if values_ns.size:
+        keys, counts = np.unique(_bucket_keys(values_ns), return_counts=True)
+        histogram.record_buckets(
+            zip(keys.tolist(), counts.tolist()),
+            total_ns=int(values_ns.sum()),
+            min_ns=int(values_ns.min()),
+            max_ns=int(values_ns.max()),
+        )
+    return histogram
+
+
+def _exact_sum(values: Any) -> Fraction:
+    # Sum each distinct value exactly so means match statistics.mean and
+    # MetricsAccumulator bit for bit.
+    distinct, counts = np.unique(values, return_counts=True)
+    return sum(
+        (Fraction(float(value)) * int(count) for value, count in zip(distinct, counts)),
+        Fraction(0),
+    )
+
+
+def _exact_mean(values: Any) -> float:
+    return float(_exact_sum(values) / values.size) if values.size else 0.0
+
+
+def _ratio(numerator: Any, denominator: Any) -> float:
+    return int(numerator) / int(denominator) if int(denominator) else 0.0
+
+
+def _first_seen_order(codes: Any) -> list[int]:
+    distinct, first_index = np.unique(codes, return_index=True)
+    return [int(distinct[position]) for position in np.argsort(first_index, kind="stable")]
+
+
+def _scored_rows(
+    encoded_gold: EncodedGold, encoded: EncodedPredictions
+) -> tuple[Any, Any, dict[str, Any], dict[str, Any]]:
+    has_gold = encoded.gold_row >= 0
+    gold_rows = encoded.gold_row[has_gold]
+    predicted = {name: codes[has_gold] for name, codes in encoded.labels.items()}
+    expected = {name: codes[gold_rows] for name, codes in encoded_gold.labels.items()}
+    return has_gold, gold_rows, predicted, expected
+
+
+def _confusion_matrices(
+    encoded_gold: EncodedGold, predicted: dict[str, Any], expected: dict[str, Any]
+) -> dict[str, dict[str, Any]]:
+    matrices: dict[str, dict[str, Any]] = {}
+    for name in CONFUSION_FIELDS:
+        labels = encoded_gold.vocabularies[name].labels
+        size = len(labels)
+        cells = np.bincount(
+            expected[name] * size + predicted[name], minlength=size * size
+        ).reshape(size, size)
+        # Keep labels seen in this mode, ordered by text as confusion_matrix() does.
+        seen = np.flatnonzero(cells.sum(axis=0) + cells.sum(axis=1)).tolist()
+        order = sorted(seen, key=lambda code: str(labels[code]))
+        matrices[name] = {
+            "labels": [labels[code] for code in order],
+            "matrix": cells[np.ix_(order, order)].tolist(),
+        }
+    return matrices
+
+
+def score_encoded(
+    encoded_gold: EncodedGold, encoded: EncodedPredictions, latency: bool = False
+) -> dict[str, Any]:
+    _require_numpy()
+    total = encoded.gold_row.size
+    _, gold_rows, predicted, expected = _scored_rows(encoded_gold, encoded)
+
+    doc_type_hit = predicted["doc_type"] == expected["doc_type"]
+    queue_hit = predicted["recommended_queue"] == expected["recommended_queue"]
+
+    escalate_true = encoded_gold.vocabularies["escalate"].codes.get(True, -1)
+    pred_escalate = predicted["escalate"] == escalate_true
+    gold_escalate = expected["escalate"] == escalate_true
+    true_positive = np.count_nonzero(pred_escalate & gold_escalate)
+    false_positive = np.count_nonzero(pred_escalate & ~gold_escalate)
+    false_negative = np.count_nonzero(~pred_escalate & gold_escalate)
+
+    gold_missing = encoded_gold.missing_mask[gold_rows]
+    pred_missing = encoded.missing_mask[encoded.gold_row >= 0]
+    gold_missing_count = _popcount(gold_missing)
+    overlap_count = _popcount(gold_missing & pred_missing)
+    recalls = np.divide(
+        overlap_count,
+        gold_missing_count,
+        out=np.ones(gold_missing_count.size, dtype=np.float64),
+        where=gold_missing_count > 0,
+    )
+
+    slices: dict[str, dict[str, float | int]] = {}
+    slice_labels = encoded_gold.slice_vocabulary.labels
+    edge_labels = np.where(encoded_gold.edge_case[gold_rows], 0, 1)
+    scored_elapsed_ns = encoded.elapsed_ns[encoded.gold_row >= 0]
+    scored_fresh = encoded.fresh[encoded.gold_row >= 0]
+    for prefix, codes, names in (
+        ("doc_type", encoded_gold.doc_type_slice[gold_rows], slice_labels),
+        ("slice", edge_labels, ["edge_case", "non_edge_case"]),
+    ):
+        counts = np.bincount(codes, minlength=len(names))
+        doc_type_correct = np.bincount(codes, weights=doc_type_hit, minlength=len(names))
+        queue_correct = np.bincount(codes, weights=queue_hit, minlength=len(names))
+        for code in _first_seen_order(codes):
+            slices[f"{prefix}:{names[code]}"] = {
+                "count": int(counts[code]),
+                "doc_type_accuracy": _ratio(doc_type_correct[code], counts[code]),
+                "queue_accuracy": _ratio(queue_correct[code], counts[code]),
+            }
+            if latency:
+                slices[f"{prefix}:{names[code]}"]["latency"] = _histogram(
+                    scored_elapsed_ns[(codes == code) & scored_fresh]
+                ).summary()
+
+    summary = {
+        "doc_type_accuracy": _ratio(np.count_nonzero(doc_type_hit), total),
+        "queue_accuracy": _ratio(np.count_nonzero(queue_hit), total),
+        "escalation_precision": _ratio(true_positive, true_positive + false_positive),
+        "escalation_recall": _ratio(true_positive, true_positive + false_negative),
+        "missing_field_recall": _exact_mean(recalls),
+        "avg_elapsed_ms": _ratio(
+            encoded.elapsed_ms[encoded.fresh].sum(), np.count_nonzero(encoded.fresh)
+        ),
+        "avg_tool_calls": _ratio(encoded.tool_calls.sum(), encoded.tool_calls.size),
+        "cached_rows": int(total - np.count_nonzero(encoded.fresh)),
+        "latency": _histogram(encoded.elapsed_ns[encoded.fresh]).summary(),
+        "stage_latency": {
+            stage: _histogram(encoded.stage_durations_ns[stage]).summary()
+            for stage in sorted(encoded.stage_durations_ns)
+        },
+        "distinct_step_patterns": encoded.distinct_step_patterns,
+        "tool_usage": {
+            tool_name: {
+                "calls": calls,
+                "total_elapsed_ms": encoded.tool_elapsed_ns_by_tool[tool_name] / 1_000_000,
+                "avg_elapsed_ms": (
+                    encoded.tool_elapsed_ns_by_tool[tool_name] / 1_000_000 / calls
+                    if calls
+                    else 0.0
+                ),
+            }
+            for tool_name, calls in sorted(encoded.tool_calls_by_tool.items())
+        },
+        "slices": slices,
+        "confusion_matrices": _confusion_matrices(encoded_gold, predicted, expected),
+    }
+    if not latency:
+        del summary["latency"], summary["stage_latency"]
+    return summary
+
+
+def score_vectorized(
+    predictions: list[dict[str, Any]],
+    gold: dict[str, dict[str, Any]],
+    cached: Sequence[bool] | None = None,
+    latency: bool = False,
+) -> dict[str, Any]:
+    encoded_gold = encode_gold(gold)
+    return score_encoded(
+        encoded_gold, encode_predictions(predictions, encoded_gold, cached), latency
+    )
@@ -0,0 +1,55 @@
+from customer_doc_triage.ingest.compression import (
+    COMPRESSION_SUFFIXES,
+    COMPRESSIONS,
+    detect_compression,
+    open_compressed,
+    with_compression,
+)
+from customer_doc_triage.ingest.index import (
+    JsonlIndex,
+    build_offset_index,
+    default_index_path,
+)
+from customer_doc_triage.ingest.jsonl import (
+    TRIAGE_INPUT_ADAPTER,
+    IngestError,
+    Quarantine,
+    iter_json_lines,
+    iter_json_objects,
+    iter_lines,
+    iter_triage_inputs,
+    source_stamp,
+)
+from customer_doc_triage.ingest.snapshot import (
+    CorpusSnapshot,
+    SnapshotWriter,
+    iter_corpus,
+    load_corpus,
+    open_current_snapshot,
+    write_snapshot,
+)
+
+__all__ = [
+    "COMPRESSIONS",
+    "COMPRESSION_SUFFIXES",
+    "TRIAGE_INPUT_ADAPTER",
+    "CorpusSnapshot",
+    "IngestError",
+    "JsonlIndex",
+    "Quarantine",
+    "SnapshotWriter",
+    "build_offset_index",
+    "default_index_path",
+    "detect_compression",
+    "iter_corpus",
+    "iter_json_lines",
+    "iter_json_objects",
+    "iter_lines",
+    "iter_triage_inputs",
+    "load_corpus",
+    "open_compressed",
+    "open_current_snapshot",
+    "source_stamp",
+    "with_compression",
+    "write_snapshot",
+]
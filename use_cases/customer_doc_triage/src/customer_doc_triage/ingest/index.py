@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Self
+
+from pydantic import ValidationError
+
+from customer_doc_triage.ingest.compression import detect_compression
+from customer_doc_triage.ingest.jsonl import (
+    TRIAGE_INPUT_ADAPTER,
+    Quarantine,
+    _describe,
+    _parse_object,
+    _reject,
+    source_stamp,
+)
+from customer_doc_triage.triage.schemas import TriageInput
+
+# Sidecar layout: magic, then 8-byte aligned little-endian sections:
+#   row_offsets  u64 x rows   byte offset of each row, in file order
+#   row_lengths  u32 x rows   stripped length of each row
+#   row_lines    u32 x rows   1-based line number, for error reports
+#   key_offsets  u64 x keys+1 offsets into key_blob, keys sorted by UTF-8 bytes
+#   key_rows     u32 x keys   row holding the latest line for each doc_id
+#   key_blob     concatenated UTF-8 doc_ids
+# followed by a JSON header (section positions, source stamp) and a trailer.
+INDEX_MAGIC = b"CDTIDX01"
+INDEX_VERSION = 1
+_TRAILER = struct.Struct("<QQ8s")
+_SECTIONS = (
+    ("row_offsets", "Q"),
+    ("row_lengths", "I"),
+    ("row_lines", "I"),
+    ("key_offsets", "Q"),
+    ("key_rows", "I"),
+)
+
+
+def default_index_path(source: Path) -> Path:
+    return source.with_name(source.name + ".idx")
+
+
+def _scan_rows(
+    source: Path, quarantine: Quarantine | None, key: str
+) -> tuple[array, array, array, dict[bytes, int]]:
+    offsets, lengths, lines = array("Q"), array("I"), array("I")
+    latest_row: dict[bytes, int] = {}
+    if source.stat().st_size == 0:
+        return offsets, lengths, lines, latest_row
+
+    with (
+        source.open("rb") as handle,
+        mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        size = len(data)
+        position = 0
+        line_number = 0
+        while position < size:
+            end = data.find(b"\n", position)
+            if end < 0:
+                end = size
+            line_number += 1
+            raw = data[position:end]
+            stripped = raw.strip()
+            if stripped:
+                row = _parse_object(quarantine, source, line_number, stripped, key)
+                if row is not None:
+                    # Later rows win, matching a dict built front to back.
+                    latest_row[row[key].encode("utf-8")] = len(offsets)
+                    offsets.append(position + len(raw) - len(raw.lstrip()))
+                    lengths.append(len(stripped))
+                    lines.append(line_number)
+            position = end + 1
+    return offsets, lengths, lines, latest_row
+
+
+def build_offset_index(
+    source: Path,
+    index_path: Path | None = None,
+    quarantine: Quarantine | None = None,
+    key: str = "doc_id",
+) -> Path:
+    if detect_compression(source) is not None:
+        raise ValueError(f"{source} is compressed; offset indexes need a plain JSONL file")
+    index_path = index_path or default_index_path(source)
+    partial_path = index_path.with_name(index_path.name + ".partial")
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    # Opened before scanning so an unwritable location fails before any row
+    # has been quarantined.
+    handle = partial_path.open("wb")
+    try:
+        stamp = source_stamp(source)
+        offsets, lengths, lines, latest_row = _scan_rows(source, quarantine, key)
+        _write_index(handle, key, stamp, offsets, lengths, lines, latest_row)
+    except BaseException:
+        handle.close()
+        partial_path.unlink(missing_ok=True)
+        raise
+    handle.close()
+    os.replace(partial_path, index_path)
+    return index_path
+
+
+def _write_index(
+    handle: BinaryIO,
+    key: str,
+    stamp: dict[str, Any],
+    offsets: array,
+    lengths: array,
+    lines: array,
+    latest_row: dict[bytes, int],
+) -> None:
+    keys = sorted(latest_row)
+    key_offsets = array("Q", [0])
+    for doc_id in keys:
+        key_offsets.append(key_offsets[-1] + len(doc_id))
+    sections = {
+        "row_offsets": offsets,
+        "row_lengths": lengths,
+        "row_lines": lines,
+        "key_offsets": key_offsets,
+        "key_rows": array("I", (latest_row[doc_id] for doc_id in keys)),
+    }
+
+    header: dict[str, Any] = {
+        "version": INDEX_VERSION,
+        "key": key,
+        "rows": len(offsets),
+        "keys": len(keys),
+        "source": stamp,
+        "sections": {},
+    }
+    handle.write(INDEX_MAGIC)
+    for name, _ in _SECTIONS:
+        values = sections[name]
+        if sys.byteorder != "little":
+            values = array(values.typecode, values)
+            values.byteswap()
+        header["sections"][name] = [handle.tell(), len(values)]
+        handle.write(values.tobytes())
+        handle.write(b"\0" * (-handle.tell() % 8))
+    header["sections"]["key_blob"] = [handle.tell(), key_offsets[-1]]
+    handle.write(b"".join(keys))
+    header_at = handle.tell()
+    header_bytes = json.dumps(header).encode("utf-8")
+    handle.write(header_bytes)
+    handle.write(_TRAILER.pack(header_at, len(header_bytes), INDEX_MAGIC))
+
+
+class JsonlIndex:
+    def __init__(self, source: Path, index_path: Path | None = None) -> None:
+        self.source = source
+        self.index_path = index_path or default_index_path(source)
+        self._maps: list[mmap.mmap] = []
+        try:
+            index_map = self._map(self.index_path)
+            if len(index_map) < len(INDEX_MAGIC) + _TRAILER.size:
+                raise ValueError(f"{self.index_path} is too short to be an offset index")
+            header_at, header_size, magic = _TRAILER.unpack_from(
+                index_map, len(index_map) - _TRAILER.size
+            )
+            if index_map[: len(INDEX_MAGIC)] != INDEX_MAGIC or magic != INDEX_MAGIC:
+                raise ValueError(f"{self.index_path} is not an offset index")
+            self.header: dict[str, Any] = json.loads(index_map[header_at : header_at + header_size])
+            if self.header["version"] != INDEX_VERSION:
+                raise ValueError(f"{self.index_path} has an unsupported index version")
+            if self.header["source"] != source_stamp(source):
+                raise ValueError(f"{self.index_path} is stale for {source}")
+
+            view = self._view = memoryview(index_map)
+            for name, typecode in _SECTIONS:
+                start, count = self.header["sections"][name]
+                itemsize = array(typecode).itemsize
+                section = view[start : start + count * itemsize]
+                if sys.byteorder == "little":
+                    setattr(self, f"_{name}", section.cast(typecode))
+                else:
+                    values = array(typecode, section.tobytes())
+                    values.byteswap()
+                    setattr(self, f"_{name}", values)
+            self._index_map = index_map
+            self._key_blob_at = self.header["sections"]["key_blob"][0]
+            self._data = self._map(source) if self.header["rows"] else b""
+        except BaseException:
+            self.close()
+            raise
+
+    def _map(self, path: Path) -> mmap.mmap:
+        with path.open("rb") as handle:
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    @classmethod
+    def open(
+        cls,
+        source: Path,
+        index_path: Path | None = None,
+        quarantine: Quarantine | None = None,
+        key: str = "doc_id",
+    ) -> JsonlIndex:
+        # Reuses the sidecar while it matches the source, otherwise rebuilds it.
+        try:
+            index = cls(source, index_path)
+        except (OSError, ValueError, KeyError, struct.error):
+            pass
+        else:
+            if index.header["key"] == key:
+                return index
+            index.close()
+        return cls(source, build_offset_index(source, index_path, quarantine, key))
+
+    def __len__(self) -> int:
+        return self.header["rows"]
+
+    def line(self, row: int) -> bytes:
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        start = self._row_offsets[row]
+        return self._data[start : start + self._row_lengths[row]]
+
+    def line_number(self, row: int) -> int:
+        return self._row_lines[row]
+
+    def row_of(self, doc_id: str) -> int | None:
+        target = doc_id.encode("utf-8")
+        keys, blob, base = self._key_offsets, self._index_map, self._key_blob_at
+
+        def key_at(position: int) -> bytes:
+            return blob[base + keys[position] : base + keys[position + 1]]
+
+        position = bisect_left(range(self.header["keys"]), target, key=key_at)
+        if position < self.header["keys"] and key_at(position) == target:
+            return self._key_rows[position]
+        return None
+
+    def get(self, doc_id: str) -> dict[str, Any] | None:
+        row = self.row_of(doc_id)
+        return None if row is None else json.loads(self.line(row))
+
+    def get_many(self, doc_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        found: dict[str, dict[str, Any]] = {}
+        for doc_id in dict.fromkeys(doc_ids):
+            row = self.get(doc_id)
+            if row is not None:
+                found[doc_id] = row
+        return found
+
+    def missing(self, doc_ids: Iterable[str]) -> list[str]:
+        return [doc_id for doc_id in dict.fromkeys(doc_ids) if self.row_of(doc_id) is None]
+
+    def rows(self, start: int = 0, stop: int | None = None) -> Iterator[dict[str, Any]]:
+        for row in range(*slice(start, stop).indices(len(self))):
+            yield json.loads(self.line(row))
+
+    def triage_inputs(
+        self, rows: Iterable[int], quarantine: Quarantine | None = None
+    ) -> Iterator[TriageInput]:
+        validate_json = TRIAGE_INPUT_ADAPTER.validate_json
+        for row in rows:
+            line = self.line(row)
+            try:
+                yield validate_json(line)
+            except ValidationError as exc:
+                _reject(quarantine, self.source, self.line_number(row), line, _describe(exc))
+
+    def rows_for(self, doc_ids: Iterable[str]) -> list[int]:
+        # Corpus order, so a re-run of selected documents replays like the full run.
+        rows = (self.row_of(doc_id) for doc_id in dict.fromkeys(doc_ids))
+        return sorted(row for row in rows if row is not None)
+
+    def shard_ranges(self, count: int) -> list[tuple[int, int]]:
+        # Contiguous row ranges holding roughly equal bytes, for workers that
+        # read their own shard straight from the file.
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        total = len(self)
+        if total == 0:
+            return []
+        end_offsets = [self._row_offsets[row] + self._row_lengths[row] for row in range(total)]
+        first, last = self._row_offsets[0], end_offsets[-1]
+        ranges: list[tuple[int, int]] = []
+        start = 0
+        for shard in range(1, count + 1):
+            boundary = first + (last - first) * shard // count
+            stop = total if shard == count else max(start, bisect_left(end_offsets, boundary) + 1)
+            stop = min(stop, total)
+            if stop > start:
+                ranges.append((start, stop))
+                start = stop
+        return ranges
+
+    def close(self) -> None:
+        for name, _ in _SECTIONS:
+            section = self.__dict__.pop(f"_{name}", None)
+            if isinstance(section, memoryview):
+                section.release()
+        view = self.__dict__.pop("_view", None)
+        if view is not None:
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Self
+
+from pydantic import TypeAdapter, ValidationError
+
+from customer_doc_triage.ingest.compression import open_compressed
+from customer_doc_triage.triage.schemas import TriageInput
+
+BLOCK_SIZE = 1 << 20
+
+# Built once: validate_json parses bytes straight into the model in pydantic-core,
+# skipping the json.loads dict that TriageInput(**row) would validate again.
+TRIAGE_INPUT_ADAPTER: TypeAdapter[TriageInput] = TypeAdapter(TriageInput)
+
+
+class IngestError(ValueError):
+    def __init__(self, source: Path, line_number: int, error: str) -> None:
+        super().__init__(f"{source}:{line_number}: {error}")
+        self.source = source
+        self.line_number = line_number
+        self.error = error
+
+
+class Quarantine:
+    # Malformed rows are appended as JSON lines next to the run's artifacts; the
+    # file is only created once the first bad row turns up.
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+        self._handle: BinaryIO | None = None
+        self._recorders: list[list[dict[str, Any]]] = []
+
+    def add(self, source: Path, line_number: int, line: bytes, error: str) -> None:
+        record = {
+            "source": str(source),
+            "line": line_number,
+            "error": error,
+            "raw": line.decode("utf-8", errors="replace"),
+        }
+        self._write(record)
+        for records in self._recorders:
+            records.append(record)
+
+    def replay(self, records: Iterable[dict[str, Any]]) -> None:
+        for record in records:
+            self._write(record)
+
+    @contextmanager
+    def recording(self) -> Iterator[list[dict[str, Any]]]:
+        # Collects the rows rejected while active, so derived files (snapshots)
+        # can replay them on later runs that skip parsing.
+        records: list[dict[str, Any]] = []
+        self._recorders.append(records)
+        try:
+            yield records
+        finally:
+            self._recorders.remove(records)
+
+    def _write(self, record: dict[str, Any]) -> None:
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = self.path.open("wb")
+        self._handle.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.count += 1
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def source_stamp(source: Path) -> dict[str, Any]:
+    # Derived files (snapshots, offset indexes) are only trusted while their
+    # source keeps the same path, size and modification time.
+    stat = source.stat()
+    return {"path": str(source.resolve()), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _reject(
+    quarantine: Quarantine | None, source: Path, line_number: int, line: bytes, error: str
+) -> None:
+    if quarantine is None:
+        raise IngestError(source, line_number, error)
+    quarantine.add(source, line_number, line, error)
+
+
+def _parse_object(
+    quarantine: Quarantine | None,
+    source: Path,
+    line_number: int,
+    line: bytes,
+    required_key: str | None,
+) -> dict[str, Any] | None:
+    try:
+        row = json.loads(line)
+    except ValueError as exc:
+        _reject(quarantine, source, line_number, line, f"invalid JSON: {exc}")
+        return None
+    if not isinstance(row, dict):
+        _reject(quarantine, source, line_number, line, "row is not a JSON object")
+    elif required_key is not None and not isinstance(row.get(required_key), str):
+        _reject(quarantine, source, line_number, line, f"missing string field '{required_key}'")
+    else:
+        return row
+    return None
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or '<row>'}: {error['msg']}"
+        for error in exc.errors(include_url=False)
+    )
+
+
+def iter_lines(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[tuple[int, bytes]]:
+    # Reads large raw blocks (decompressed on the fly for gzip/xz/bz2) and splits
+    # them on newlines, yielding stripped, non-blank lines with 1-based numbers.
+    line_number = 0
+    with open_compressed(path, "rb", buffering=0) as handle:
+        remainder = b""
+        while block := handle.read(block_size):
+            lines = (remainder + block if remainder else block).split(b"\n")
+            remainder = lines.pop()
+            for line in lines:
+                line_number += 1
+                stripped = line.strip()
+                if stripped:
+                    yield line_number, stripped
+        stripped = remainder.strip()
+        if stripped:
+            yield line_number + 1, stripped
+
+
+def iter_triage_inputs(
+    path: Path, quarantine: Quarantine | None = None, block_size: int = BLOCK_SIZE
+) -> Iterator[TriageInput]:
+    validate_json = TRIAGE_INPUT_ADAPTER.validate_json
+    for line_number, line in iter_lines(path, block_size):
+        try:
+            yield validate_json(line)
+        except ValidationError as exc:
+            _reject(quarantine, path, line_number, line, _describe(exc))
+
+
+def iter_json_lines(
+    path: Path,
+    quarantine: Quarantine | None = None,
+    required_key: str | None = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[tuple[bytes, dict[str, Any]]]:
+    for line_number, line in iter_lines(path, block_size):
+        row = _parse_object(quarantine, path, line_number, line, required_key)
+        if row is not None:
+            yield line, row
+
+
+def iter_json_objects(
+    path: Path,
+    quarantine: Quarantine | None = None,
+    required_key: str | None = None,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[dict[str, Any]]:
+    for _, row in iter_json_lines(path, quarantine, required_key, block_size):
+        yield row
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Self
+
+from customer_doc_triage.ingest.jsonl import Quarantine, iter_triage_inputs, source_stamp
+from customer_doc_triage.triage.schemas import TriageInput
+
+# Layout: magic, marshalled records back to back, the record offset table
+# (count + 1 little-endian u64s), a JSON header, then a fixed trailer holding
+# the offset table and header positions. Writing the tables last lets the
+# writer stream records without knowing the corpus size up front.
+SNAPSHOT_MAGIC = b"CDTSNAP1"
+SNAPSHOT_VERSION = 2
+_TRAILER = struct.Struct("<QQQ8s")
+_MARSHAL_VERSION = 4
+
+_FIELDS = tuple(TriageInput.model_fields)
+_SUBMITTED_AT = _FIELDS.index("submitted_at")
+
+
+def _encode(item: TriageInput) -> bytes:
+    values = [getattr(item, field) for field in _FIELDS]
+    values[_SUBMITTED_AT] = values[_SUBMITTED_AT].isoformat()
+    return marshal.dumps(tuple(values), _MARSHAL_VERSION)
+
+
+def _decode(payload: memoryview) -> TriageInput:
+    values = list(marshal.loads(payload))
+    values[_SUBMITTED_AT] = datetime.fromisoformat(values[_SUBMITTED_AT])
+    # Rows were validated before they were written, so restore them the way
+    # unpickling does instead of validating again (about twice as fast as
+    # model_construct, which still walks field defaults).
+    item = TriageInput.__new__(TriageInput)
+    item.__setstate__(
+        {
+            "__dict__": dict(zip(_FIELDS, values)),
+            "__pydantic_fields_set__": set(_FIELDS),
+            "__pydantic_extra__": None,
+            "__pydantic_private__": None,
+        }
+    )
+    return item
+
+
+class SnapshotWriter:
+    def __init__(self, path: Path, source: Path | None = None) -> None:
+        self.path = path
+        self.source = source
+        self.count = 0
+        self._offsets = array("Q", [len(SNAPSHOT_MAGIC)])
+        self._partial_path = path.with_name(path.name + ".partial")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self._partial_path.open("wb")
+        self._handle.write(SNAPSHOT_MAGIC)
+
+    def add(self, item: TriageInput) -> None:
+        payload = _encode(item)
+        self._handle.write(payload)
+        self._offsets.append(self._offsets[-1] + len(payload))
+        self.count += 1
+
+    def commit(self, quarantined: Sequence[dict[str, Any]] = ()) -> None:
+        if self._offsets.itemsize != 8:
+            raise RuntimeError("Snapshot offsets need 64-bit array items")
+        header = {
+            "version": SNAPSHOT_VERSION,
+            "fields": list(_FIELDS),
+            "count": self.count,
+            # Rows rejected while parsing the source, replayed into the
+            # quarantine of runs that load the snapshot instead.
+            "quarantined": list(quarantined),
+            "source": source_stamp(self.source) if self.source is not None else None,
+        }
+        offsets_at = self._offsets[-1]
+        offsets = self._offsets
+        if sys.byteorder != "little":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        self._handle.write(offsets.tobytes())
+        header_at = self._handle.tell()
+        header_bytes = json.dumps(header).encode("utf-8")
+        self._handle.write(header_bytes)
+        self._handle.write(_TRAILER.pack(offsets_at, header_at, len(header_bytes), SNAPSHOT_MAGIC))
+        self._handle.close()
+        # Readers only ever see complete snapshots.
+        os.replace(self._partial_path, self.path)
+
+    def abort(self) -> None:
+        self._handle.close()
+        self._partial_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type: object, *exc_info: object) -> None:
+        if self._handle.closed:
+            return
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+
+class CorpusSnapshot:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self._map) < len(SNAPSHOT_MAGIC) + _TRAILER.size:
+                raise ValueError(f"{path} is too short to be a corpus snapshot")
+            offsets_at, header_at, header_size, magic = _TRAILER.unpack_from(
+                self._map, len(self._map) - _TRAILER.size
+            )
+            if self._map[: len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC or magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a corpus snapshot")
+            self.header: dict[str, Any] = json.loads(self._map[header_at : header_at + header_size])
+            if self.header["version"] != SNAPSHOT_VERSION or self.header["fields"] != list(_FIELDS):
+                raise ValueError(f"{path} was written for a different TriageInput layout")
+            offsets = array("Q")
+            offsets.frombytes(self._map[offsets_at:header_at])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            self._offsets = offsets
+        except BaseException:
+            self._map.close()
+            raise
+        self._view = memoryview(self._map)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> TriageInput:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return _decode(self._view[self._offsets[index] : self._offsets[index + 1]])
+
+    def __iter__(self) -> Iterator[TriageInput]:
+        view, offsets = self._view, self._offsets
+        for index in range(len(offsets) - 1):
+            yield _decode(view[offsets[index] : offsets[index + 1]])
+
+    def matches(self, source: Path) -> bool:
+        try:
+            return self.header["source"] == source_stamp(source)
+        except OSError:
+            return False
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def write_snapshot(path: Path, items: Iterable[TriageInput], source: Path | None = None) -> int:
+    with SnapshotWriter(path, source) as writer:
+        for item in items:
+            writer.add(item)
+    return writer.count
+
+
+def open_current_snapshot(snapshot_path: Path, source: Path) -> CorpusSnapshot | None:
+    if not snapshot_path.exists():
+        return None
+    try:
+        snapshot = CorpusSnapshot(snapshot_path)
+    except (ValueError, KeyError, struct.error):
+        return None
+    if snapshot.matches(source):
+        return snapshot
+    snapshot.close()
+    return None
+
+
+def iter_corpus(
+    samples_path: Path,
+    quarantine: Quarantine | None = None,
+    snapshot_path: Path | None = None,
+) -> Iterator[TriageInput]:
+    if snapshot_path is None:
+        yield from iter_triage_inputs(samples_path, quarantine)
+        return
+
+    snapshot = open_current_snapshot(snapshot_path, samples_path)
+    if snapshot is not None:
+        with snapshot:
+            if quarantine is not None:
+                quarantine.replay(snapshot.header["quarantined"])
+            yield from snapshot
+        return
+
+    # Parse the JSONL once and record the validated rows as they stream past.
+    writer = SnapshotWriter(snapshot_path, samples_path)
+    with quarantine.recording() if quarantine is not None else nullcontext([]) as rejected:
+        try:
+            for item in iter_triage_inputs(samples_path, quarantine):
+                writer.add(item)
+                yield item
+        except BaseException:
+            writer.abort()
+            raise
+    writer.commit(rejected)
+
+
+def load_corpus(
+    samples_path: Path,
+    quarantine: Quarantine | None = None,
+    snapshot_path: Path | None = None,
+) -> list[TriageInput]:
+    return list(iter_corpus(samples_path, quarantine, snapshot_path))
@@ -0,0 +1,63 @@
+from customer_doc_triage.telemetry.exporters import (
+    BatchSpanProcessor,
+    InMemorySpanExporter,
+    OtlpJsonFileExporter,
+    SpanData,
+    SpanExporter,
+    otlp_json,
+)
+from customer_doc_triage.telemetry.instruments import record_decision
+from customer_doc_triage.telemetry.metrics import (
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    serve_metrics,
+)
+from customer_doc_triage.telemetry.profiling import (
+    PROFILE_KINDS,
+    StageProfiler,
+    collapsed_cpu_stacks,
+    print_profile,
+    profile_iter,
+    profile_stage,
+    profiling,
+)
+from customer_doc_triage.telemetry.tracer import (
+    configure_tracing,
+    export_decision,
+    force_flush,
+    get_span_exporter,
+    shutdown_tracing,
+    span,
+)
+
+__all__ = [
+    "PROFILE_KINDS",
+    "REGISTRY",
+    "BatchSpanProcessor",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "InMemorySpanExporter",
+    "MetricsRegistry",
+    "OtlpJsonFileExporter",
+    "SpanData",
+    "SpanExporter",
+    "StageProfiler",
+    "collapsed_cpu_stacks",
+    "configure_tracing",
+    "export_decision",
+    "force_flush",
+    "get_span_exporter",
+    "otlp_json",
+    "print_profile",
+    "profile_iter",
+    "profile_stage",
+    "profiling",
+    "record_decision",
+    "serve_metrics",
+    "shutdown_tracing",
+    "span",
+]
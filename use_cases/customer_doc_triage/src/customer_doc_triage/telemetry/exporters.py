@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import deque
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+_logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "customer-doc-triage"
+SCOPE_NAME = "customer_doc_triage"
+_SPAN_KIND_INTERNAL = 1
+_STATUS_CODE_ERROR = 2
+
+AttributeValue = str | bool | int | float
+
+
+@dataclass
+class SpanData:
+    trace_id: int
+    span_id: int
+    name: str
+    start_unix_ns: int
+    end_unix_ns: int = 0
+    parent_span_id: int | None = None
+    attributes: dict[str, AttributeValue] = field(default_factory=dict)
+    error: str | None = None
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[SpanData]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+def _otlp_value(value: AttributeValue) -> dict[str, Any]:
+    # bool before int: bool is an int subclass. int64 values are strings in OTLP/JSON.
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: SpanData) -> dict[str, Any]:
+    payload: dict[str, Any] = {
+        "traceId": f"{span.trace_id:032x}",
+        "spanId": f"{span.span_id:016x}",
+        "name": span.name,
+        "kind": _SPAN_KIND_INTERNAL,
+        "startTimeUnixNano": str(span.start_unix_ns),
+        "endTimeUnixNano": str(span.end_unix_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)} for key, value in span.attributes.items()
+        ],
+        "status": {},
+    }
+    if span.parent_span_id is not None:
+        payload["parentSpanId"] = f"{span.parent_span_id:016x}"
+    if span.error is not None:
+        payload["status"] = {"code": _STATUS_CODE_ERROR, "message": span.error}
+    return payload
+
+
+def otlp_json(spans: Sequence[SpanData]) -> dict[str, Any]:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": _otlp_value(SERVICE_NAME)},
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SCOPE_NAME},
+                        "spans": [_otlp_span(span) for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class InMemorySpanExporter:
+    def __init__(self) -> None:
+        self.spans: list[SpanData] = []
+
+    def export(self, spans: Sequence[SpanData]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class OtlpJsonFileExporter:
+    # One OTLP/JSON ExportTraceServiceRequest per line, the layout the
+    # OpenTelemetry Collector file exporter writes and its otlpjsonfile
+    # receiver reads back. The file is opened per export so the exporter stays
+    # picklable and pool workers can append to the same path.
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def export(self, spans: Sequence[SpanData]) -> None:
+        line = json.dumps(otlp_json(spans), separators=(",", ":")) + "\n"
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class BatchSpanProcessor:
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        *,
+        max_queue_size: int = 2_048,
+        max_export_batch_size: int = 512,
+        schedule_delay_s: float = 0.5,
+    ) -> None:
+        if max_export_batch_size < 1 or max_queue_size < max_export_batch_size:
+            raise ValueError("max_queue_size must be at least max_export_batch_size >= 1")
+        if schedule_delay_s <= 0:
+            raise ValueError("schedule_delay_s must be positive")
+        self.exporter = exporter
+        self.max_queue_size = max_queue_size
+        self.max_export_batch_size = max_export_batch_size
+        self.schedule_delay_s = schedule_delay_s
+        self.dropped_spans = 0
+        self._queue: deque[SpanData] = deque()
+        self._condition = threading.Condition()
+        self._flush_requested = 0
+        self._flush_done = 0
+        self._stopping = False
+        self._thread = threading.Thread(target=self._export_loop, name="span-export", daemon=True)
+        self._thread.start()
+
+    def on_end(self, spans: Sequence[SpanData]) -> None:
+        # Runs on the request path: enqueue only, and drop rather than block
+        # when the exporter falls behind.
+        with self._condition:
+            if self._stopping:
+                return
+            room = self.max_queue_size - len(self._queue)
+            if room < len(spans):
+                self.dropped_spans += len(spans) - max(room, 0)
+                spans = spans[: max(room, 0)]
+            self._queue.extend(spans)
+            if len(self._queue) >= self.max_export_batch_size:
+                self._condition.notify()
+
+    def _ready(self) -> bool:
+        return (
+            self._stopping
+            or self._flush_requested > self._flush_done
+            or len(self._queue) >= self.max_export_batch_size
+        )
+
+    def _export_loop(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(self._ready, timeout=self.schedule_delay_s)
+                flush_target = self._flush_requested
+                stopping = self._stopping
+                pending = list(self._queue)
+                self._queue.clear()
+
+            for start in range(0, len(pending), self.max_export_batch_size):
+                try:
+                    self.exporter.export(pending[start : start + self.max_export_batch_size])
+                except Exception:
+                    _logger.exception("Dropping spans after a failed export")
+
+            with self._condition:
+                self._flush_done = flush_target
+                self._condition.notify_all()
+            if stopping:
+                return
+
+    def force_flush(self, timeout_s: float | None = 30.0) -> bool:
+        with self._condition:
+            if self._stopping:
+                return not self._thread.is_alive()
+            self._flush_requested += 1
+            target = self._flush_requested
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: self._flush_done >= target, timeout=timeout_s)
+
+    def shutdown(self) -> None:
+        with self._condition:
+            if self._stopping:
+                return
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.exporter.shutdown()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from typing import Any
+
+from customer_doc_triage.telemetry.metrics import REGISTRY
+from customer_doc_triage.triage.schemas import TriageDecision
+
+_FAIL_CLOSED_STEPS = {"escalate_fail_closed", "final_validation_fail_closed", "unexpected_exit"}
+
+DECISIONS = REGISTRY.counter(
+    "triage_decisions_total", "Triage decisions by mode and outcome.", ("mode", "outcome")
+)
+ESCALATIONS = REGISTRY.counter(
+    "triage_escalations_total", "Decisions routed to escalation.", ("mode",)
+)
+RETRIES = REGISTRY.counter(
+    "triage_retries_total", "Bounded repair retries taken before a decision.", ("mode",)
+)
+GUARDRAIL_BLOCKS = REGISTRY.counter(
+    "triage_guardrail_blocks_total",
+    "Agent runs stopped by a guardrail, by guardrail.",
+    ("mode", "guardrail"),
+)
+DECISION_LATENCY = REGISTRY.histogram(
+    "triage_decision_latency_seconds", "Wall time per triage decision.", ("mode",)
+)
+TOOL_CALLS = REGISTRY.counter("triage_tool_calls_total", "Agent tool invocations.", ("tool",))
+TOOL_SECONDS = REGISTRY.counter(
+    "triage_tool_seconds_total", "Wall time spent inside agent tools.", ("tool",)
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "triage_in_flight_documents", "Documents currently being triaged concurrently."
+)
+
+# Per-mode series resolved once, so recording a decision skips most label lookups.
+_series_by_mode: dict[str, tuple[Any, Any, Any, Any, Any]] = {}
+
+
+def decision_outcome(decision: TriageDecision) -> tuple[str, str | None]:
+    steps = decision.decision_trace.steps
+    last_step = steps[-1] if steps else ""
+    if last_step.startswith("guardrail_"):
+        return "fail_closed", last_step.split(":", 1)[0]
+    if last_step in _FAIL_CLOSED_STEPS:
+        return "fail_closed", None
+    return "ok", None
+
+
+def _mode_series(mode: str) -> tuple[Any, Any, Any, Any, Any]:
+    series = _series_by_mode.get(mode)
+    if series is None:
+        series = _series_by_mode[mode] = (
+            DECISIONS.labels(mode, "ok"),
+            DECISIONS.labels(mode, "fail_closed"),
+            ESCALATIONS.labels(mode),
+            RETRIES.labels(mode),
+            DECISION_LATENCY.labels(mode),
+        )
+    return series
+
+
+def record_decision(decision: TriageDecision) -> None:
+    trace = decision.decision_trace
+    ok, fail_closed, escalations, retries, latency = _mode_series(trace.mode)
+    outcome, guardrail = decision_outcome(decision)
+    (ok if outcome == "ok" else fail_closed).inc()
+    if guardrail is not None:
+        GUARDRAIL_BLOCKS.labels(trace.mode, guardrail).inc()
+    if decision.escalate:
+        escalations.inc()
+    if trace.retry_count:
+        retries.inc(trace.retry_count)
+    latency.observe(trace.elapsed_ns / 1_000_000_000)
+    for tool_name, stats in trace.tool_stats.items():
+        TOOL_CALLS.labels(tool_name).inc(stats.calls)
+        TOOL_SECONDS.labels(tool_name).inc(stats.elapsed_ms / 1_000)
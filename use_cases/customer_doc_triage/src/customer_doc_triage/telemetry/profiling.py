@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import tracemalloc
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Literal, TypeVar
+
+ProfileKind = Literal["cpu", "mem"]
+PROFILE_KINDS: tuple[ProfileKind, ...] = ("cpu", "mem")
+
+_T = TypeVar("_T")
+_TRACEMALLOC_FRAMES = 32
+_MAX_STACK_DEPTH = 64
+# Paths below this share of a stage's time are dropped from collapsed stacks.
+_MIN_STACK_SECONDS = 1e-6
+
+FunctionKey = tuple[str, int, str]
+
+
+def _function_label(func: FunctionKey) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({Path(filename).name}:{lineno})"
+
+
+def collapsed_cpu_stacks(stats: pstats.Stats) -> dict[str, float]:
+    # cProfile keeps caller->callee edges rather than whole stacks, so split each
+    # function's time across paths in proportion to the cumulative time of each
+    # edge, the same approximation flameprof and gprof2dot use.
+    table: dict[FunctionKey, Any] = stats.stats
+    callees: dict[FunctionKey, list[tuple[FunctionKey, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in table.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    stacks: dict[str, float] = defaultdict(float)
+
+    def walk(func: FunctionKey, path: list[FunctionKey], seconds: float) -> None:
+        _, _, tottime, cumtime, _ = table[func]
+        share = seconds / cumtime if cumtime else 0.0
+        path = path + [func]
+        stacks[";".join(_function_label(item) for item in path)] += tottime * share
+        if len(path) >= _MAX_STACK_DEPTH:
+            return
+        for callee, edge_seconds in callees.get(func, ()):
+            child_seconds = edge_seconds * share
+            if callee not in path and child_seconds >= _MIN_STACK_SECONDS:
+                walk(callee, path, child_seconds)
+
+    for func, (_, _, _, cumtime, callers) in table.items():
+        if not callers:
+            walk(func, [], cumtime)
+    return {stack: seconds for stack, seconds in stacks.items() if seconds > 0}
+
+
+def _write_collapsed(path: Path, weights: dict[str, float], scale: float) -> None:
+    # One "frame;frame;frame weight" line per stack, the input flamegraph.pl,
+    # speedscope and inferno expect.
+    lines = [
+        f"{stack} {round(weight * scale)}"
+        for stack, weight in sorted(weights.items())
+        if round(weight * scale) > 0
+    ]
+    path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+
+
+class _MemoryStage:
+    def __init__(self) -> None:
+        self.size_diff: dict[tracemalloc.Traceback, int] = defaultdict(int)
+        self.count_diff: dict[tracemalloc.Traceback, int] = defaultdict(int)
+        self.peak_bytes = 0
+        self.last_snapshot: tracemalloc.Snapshot | None = None
+
+
+class StageProfiler:
+    def __init__(self, kind: ProfileKind) -> None:
+        if kind not in PROFILE_KINDS:
+            raise ValueError(f"Unsupported profile kind: {kind}")
+        self.kind = kind
+        self.stages: list[str] = []
+        self._cpu: dict[str, cProfile.Profile] = {}
+        self._memory: dict[str, _MemoryStage] = {}
+        self._stack: list[str] = []
+        self._segment_start: tracemalloc.Snapshot | None = None
+        self._started_tracemalloc = False
+
+    def _resume(self, name: str) -> None:
+        if self.kind == "cpu":
+            self._cpu[name].enable()
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        tracemalloc.reset_peak()
+        self._segment_start = tracemalloc.take_snapshot()
+
+    def _suspend(self, name: str) -> None:
+        if self.kind == "cpu":
+            self._cpu[name].disable()
+            return
+        # Attribute the net allocations of this segment to the running stage;
+        # nested stages suspend their parent, so segments never overlap.
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        stage = self._memory[name]
+        stage.peak_bytes = max(stage.peak_bytes, peak)
+        stage.last_snapshot = snapshot
+        if self._segment_start is not None:
+            for diff in snapshot.compare_to(self._segment_start, "traceback"):
+                stage.size_diff[diff.traceback] += diff.size_diff
+                stage.count_diff[diff.traceback] += diff.count_diff
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if name not in self.stages:
+            self.stages.append(name)
+            self._cpu[name] = cProfile.Profile()
+            self._memory[name] = _MemoryStage()
+        if self._stack:
+            self._suspend(self._stack[-1])
+        self._stack.append(name)
+        self._resume(name)
+        try:
+            yield
+        finally:
+            self._suspend(name)
+            self._stack.pop()
+            if self._stack:
+                self._resume(self._stack[-1])
+
+    def close(self) -> None:
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def write(self, output_dir: Path) -> list[Path]:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written: list[Path] = []
+        for name in self.stages:
+            if self.kind == "cpu":
+                stats_path = output_dir / f"cpu-{name}.pstats"
+                self._cpu[name].dump_stats(stats_path)
+                collapsed_path = output_dir / f"cpu-{name}.collapsed"
+                stacks = collapsed_cpu_stacks(pstats.Stats(self._cpu[name]))
+                _write_collapsed(collapsed_path, stacks, scale=1_000_000)
+                written += [stats_path, collapsed_path]
+                continue
+
+            stage = self._memory[name]
+            if stage.last_snapshot is not None:
+                snapshot_path = output_dir / f"mem-{name}.tracemalloc"
+                stage.last_snapshot.dump(str(snapshot_path))
+                written.append(snapshot_path)
+            collapsed_path = output_dir / f"mem-{name}.collapsed"
+            _write_collapsed(
+                collapsed_path,
+                {
+                    ";".join(
+                        f"{Path(frame.filename).name}:{frame.lineno}"
+                        for frame in traceback
+                    ): float(size)
+                    for traceback, size in stage.size_diff.items()
+                    if size > 0
+                },
+                scale=1,
+            )
+            written.append(collapsed_path)
+        return written
+
+    def hotspots(self, top_n: int = 15) -> list[dict[str, Any]]:
+        rows: list[dict[str, Any]] = []
+        for name in self.stages:
+            if self.kind == "cpu":
+                table: dict[FunctionKey, Any] = pstats.Stats(self._cpu[name]).stats
+                for func, (_, ncalls, tottime, cumtime, _) in table.items():
+                    rows.append(
+                        {
+                            "stage": name,
+                            "location": _function_label(func),
+                            "calls": ncalls,
+                            "self": tottime,
+                            "cumulative": cumtime,
+                        }
+                    )
+                continue
+            by_line: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+            for traceback, size in self._memory[name].size_diff.items():
+                frame = traceback[-1]
+                totals = by_line[f"{Path(frame.filename).name}:{frame.lineno}"]
+                totals[0] += size
+                totals[1] += self._memory[name].count_diff[traceback]
+            for location, (size, count) in by_line.items():
+                rows.append({"stage": name, "location": location, "calls": count, "self": size})
+        rows.sort(key=lambda row: row["self"], reverse=True)
+        return rows[:top_n]
+
+    def stage_totals(self) -> dict[str, float]:
+        if self.kind == "cpu":
+            return {
+                name: pstats.Stats(self._cpu[name]).total_tt
+                for name in self.stages
+            }
+        return {name: float(self._memory[name].peak_bytes) for name in self.stages}
+
+    def hotspot_table(self, top_n: int = 15) -> str:
+        if self.kind == "cpu":
+            lines = [
+                "| Stage | Total s |",
+                "|-------|---------|",
+                *(f"| {name} | {total:.4f} |" for name, total in self.stage_totals().items()),
+                "",
+                "| Stage | Function | Calls | Self s | Cumulative s |",
+                "|-------|----------|-------|--------|--------------|",
+            ]
+            lines += [
+                f"| {row['stage']} | {row['location']} | {row['calls']} | "
+                f"{row['self']:.4f} | {row['cumulative']:.4f} |"
+                for row in self.hotspots(top_n)
+            ]
+            return "\n".join(lines)
+
+        lines = [
+            "| Stage | Peak KiB |",
+            "|-------|----------|",
+            *(f"| {name} | {peak / 1024:.1f} |" for name, peak in self.stage_totals().items()),
+            "",
+            "| Stage | Allocation site | Net blocks | Net KiB |",
+            "|-------|-----------------|------------|---------|",
+        ]
+        lines += [
+            f"| {row['stage']} | {row['location']} | {row['calls']} | {row['self'] / 1024:.1f} |"
+            for row in self.hotspots(top_n)
+        ]
+        return "\n".join(lines)
+
+
+_profiler: StageProfiler | None = None
+
+
+def _reset_after_fork() -> None:
+    # Pool workers are not profiled: stop whatever the parent was recording at
+    # fork time so the child does not pay for a profile nobody will read.
+    global _profiler
+    profiler = _profiler
+    _profiler = None
+    if profiler is None:
+        return
+    if profiler.kind == "cpu" and profiler._stack:
+        profiler._cpu[profiler._stack[-1]].disable()
+    profiler.close()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@contextmanager
+def profiling(kind: ProfileKind) -> Iterator[StageProfiler]:
+    global _profiler
+    if _profiler is not None:
+        raise RuntimeError("A stage profiler is already active")
+    _profiler = StageProfiler(kind)
+    try:
+        yield _profiler
+    finally:
+        _profiler.close()
+        _profiler = None
+
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[None]:
+    profiler = _profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name):
+        yield
+
+
+def profile_iter(name: str, items: Iterable[_T]) -> Iterator[_T]:
+    # Attributes the work of producing each item (e.g. reading and parsing a
+    # lazily streamed chunk) to the named stage.
+    iterator = iter(items)
+    while True:
+        with profile_stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def print_profile(profiler: StageProfiler, output_dir: Path, top_n: int, workers: int = 1) -> None:
+    written = profiler.write(output_dir)
+    print(profiler.hotspot_table(top_n))
+    if workers > 1:
+        print("Note: only the parent process is profiled; rerun with --workers 1 for mode stages.")
+    print({"profile": profiler.kind, "artifacts": [str(path) for path in written]})
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import atexit
+import os
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import time_ns
+from typing import Any
+
+from customer_doc_triage.telemetry.exporters import (
+    AttributeValue,
+    BatchSpanProcessor,
+    SpanData,
+    SpanExporter,
+)
+from customer_doc_triage.triage.schemas import TriageDecision
+
+_processor: BatchSpanProcessor | None = None
+_current_span: ContextVar[SpanData | None] = ContextVar("current_span", default=None)
+_ids = random.Random()
+
+
+def _new_id(bits: int) -> int:
+    return _ids.getrandbits(bits) or 1
+
+
+def configure_tracing(exporter: SpanExporter | None, **batch_options: Any) -> None:
+    global _processor
+    previous = _processor
+    _processor = BatchSpanProcessor(exporter, **batch_options) if exporter is not None else None
+    if previous is not None:
+        previous.shutdown()
+
+
+def get_span_exporter() -> SpanExporter | None:
+    return _processor.exporter if _processor is not None else None
+
+
+def force_flush(timeout_s: float | None = 30.0) -> bool:
+    return _processor.force_flush(timeout_s) if _processor is not None else True
+
+
+def shutdown_tracing() -> None:
+    configure_tracing(None)
+
+
+def _reset_after_fork() -> None:
+    # The export thread does not survive fork; children start untraced until
+    # they configure their own exporter.
+    global _processor, _ids
+    _processor = None
+    _ids = random.Random()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(shutdown_tracing)
+
+
+@contextmanager
+def span(name: str, **attributes: AttributeValue) -> Iterator[SpanData | None]:
+    processor = _processor
+    if processor is None:
+        yield None
+        return
+
+    parent = _current_span.get()
+    data = SpanData(
+        trace_id=parent.trace_id if parent is not None else _new_id(128),
+        span_id=_new_id(64),
+        parent_span_id=parent.span_id if parent is not None else None,
+        name=name,
+        start_unix_ns=time_ns(),
+        attributes=dict(attributes),
+    )
+    token = _current_span.set(data)
+    try:
+        yield data
+    except BaseException as exc:
+        data.error = f"{type(exc).__name__}: {exc}"
+        raise
+    finally:
+        _current_span.reset(token)
+        data.end_unix_ns = time_ns()
+        processor.on_end([data])
+
+
+def export_decision(decision: TriageDecision, end_unix_ns: int | None = None) -> None:
+    processor = _processor
+    if processor is None:
+        return
+
+    # DecisionTrace keeps offsets on the perf_counter clock; anchor them to wall
+    # time at the moment the decision finished.
+    trace = decision.decision_trace
+    end_unix_ns = end_unix_ns if end_unix_ns is not None else time_ns()
+    start_unix_ns = end_unix_ns - trace.elapsed_ns
+    parent = _current_span.get()
+    root = SpanData(
+        trace_id=parent.trace_id if parent is not None else _new_id(128),
+        span_id=_new_id(64),
+        parent_span_id=parent.span_id if parent is not None else None,
+        name=f"triage.{trace.mode}",
+        start_unix_ns=start_unix_ns,
+        end_unix_ns=end_unix_ns,
+        attributes={
+            "triage.doc_id": decision.doc_id,
+            "triage.doc_type": decision.doc_type,
+            "triage.recommended_queue": decision.recommended_queue,
+            "triage.escalate": decision.escalate,
+            "triage.tool_calls": trace.tool_calls,
+            "triage.retry_count": trace.retry_count,
+        },
+    )
+    spans = [root]
+    for step in trace.spans:
+        attributes: dict[str, AttributeValue] = {"triage.step": step.name}
+        if step.name.startswith("tool:"):
+            attributes["triage.tool"] = step.name.removeprefix("tool:")
+        spans.append(
+            SpanData(
+                trace_id=root.trace_id,
+                span_id=_new_id(64),
+                parent_span_id=root.span_id,
+                name=step.name,
+                start_unix_ns=start_unix_ns + step.start_ns,
+                end_unix_ns=start_unix_ns + step.start_ns + step.duration_ns,
+                attributes=attributes,
+            )
+        )
+    processor.on_end(spans)
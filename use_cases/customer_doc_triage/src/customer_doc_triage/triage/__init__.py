@@ -1,21 +1,35 @@
 from customer_doc_triage.triage.policies import (
+    PolicyOutcome,
     find_required_missing_fields,
     recommend_queue,
+    resolve_policy,
     should_escalate,
 )
-from customer_doc_triage.triage.schemas import DecisionTrace, TriageDecision, TriageInput
+from customer_doc_triage.triage.schemas import (
+    DecisionTrace,
+    StepSpan,
+    TriageDecision,
+    TriageInput,
+)
 from customer_doc_triage.triage.validation import (
     assert_valid_triage_decision,
+    configure_validation_sampling,
+    requires_validation,
     validate_triage_decision,
 )
 
 __all__ = [
     "DecisionTrace",
+    "PolicyOutcome",
+    "StepSpan",
     "TriageDecision",
     "TriageInput",
     "find_required_missing_fields",
     "recommend_queue",
+    "resolve_policy",
     "should_escalate",
     "validate_triage_decision",
     "assert_valid_triage_decision",
+    "configure_validation_sampling",
+    "requires_validation",
 ]
\ No newline at end of file
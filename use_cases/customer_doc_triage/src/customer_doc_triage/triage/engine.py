@@ -1,58 +1,29 @@
 from __future__ import annotations
 
-from time import perf_counter
-
-from customer_doc_triage.triage.policies import (
-    find_required_missing_fields,
-    recommend_queue,
-    should_escalate,
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import perf_counter, perf_counter_ns
+
+from customer_doc_triage.triage.features import TriageFeatures
+from customer_doc_triage.triage.keywords import (  # noqa: F401 - DOC_TYPE_KEYWORDS moved from here
+    DOC_TYPE_KEYWORDS,
+    best_doc_type_for_hits,
+    normalize_doc_type_hint,
+    scan_keywords,
+)
+from customer_doc_triage.triage.policies import infer_priority  # noqa: F401 - moved from here
+from customer_doc_triage.triage.schemas import (
+    DecisionTrace,
+    DocType,
+    StepSpan,
+    ToolCallStats,
+    TriageDecision,
+    TriageInput,
 )
-from customer_doc_triage.triage.schemas import DecisionTrace, DocType, TriageDecision, TriageInput
-
-DOC_TYPE_KEYWORDS: dict[DocType, tuple[str, ...]] = {
-    "incident_report": ("incident", "latency", "outage", "error rate", "request ids"),
-    "access_request": ("access", "admin", "permission", "contractor", "privileged"),
-    "security_questionnaire": ("security questionnaire", "soc2", "iso27001", "hipaa", "gdpr"),
-    "billing_dispute": ("invoice", "billing", "charge", "overage", "tax"),
-    "feature_request": ("feature request", "enhancement", "improve", "would like", "roadmap"),
-}
 
 
 def detect_doc_type(content: str, doc_type_hint: str | None = None) -> DocType:
-    normalized_hint = (doc_type_hint or "").strip().lower().replace(" ", "_")
-    if normalized_hint in DOC_TYPE_KEYWORDS:
-        return normalized_hint  # type: ignore[return-value]
-
-    content_lower = content.lower()
-    best_doc_type: DocType = "feature_request"
-    best_score = -1
-
-    for doc_type, keywords in DOC_TYPE_KEYWORDS.items():
-        score = sum(1 for keyword in keywords if keyword in content_lower)
-        if score > best_score:
-            best_doc_type = doc_type
-            best_score = score
-
-    return best_doc_type
-
-
-def infer_priority(doc_type: DocType, customer_tier: str | None, missing_fields: list[str]) -> tuple[str, int]:
-    base_priority_by_doc_type = {
-        "incident_report": "P1",
-        "access_request": "P2",
-        "security_questionnaire": "P2",
-        "billing_dispute": "P2",
-        "feature_request": "P3",
-    }
-
-    priority = base_priority_by_doc_type[doc_type]
-    if customer_tier == "enterprise" and priority == "P2":
-        priority = "P1"
-    if doc_type == "incident_report" and "request_id_examples" in missing_fields:
-        priority = "P1"
-
-    severity_by_priority = {"P1": 5, "P2": 3, "P3": 2}
-    return priority, severity_by_priority[priority]
+    return normalize_doc_type_hint(doc_type_hint) or best_doc_type_for_hits(scan_keywords(content))
 
 
 def build_decision(
@@ -69,26 +40,20 @@ def build_decision(
     rationale: str,
     doc_id_override: str | None = None,
     queue_override: str | None = None,
+    features: TriageFeatures | None = None,
+    tool_stats: dict[str, ToolCallStats] | None = None,
 ) -> TriageDecision:
-    missing_fields = find_required_missing_fields(doc_type=doc_type, metadata=triage_input.metadata)
-    priority, severity = infer_priority(doc_type, triage_input.customer_tier, missing_fields)
-    queue = queue_override or recommend_queue(doc_type)
-    escalate, escalation_reason = should_escalate(
-        doc_type=doc_type,
-        customer_tier=triage_input.customer_tier,
-        missing_fields=missing_fields,
-        priority=priority,
-    )
+    policy = (features or TriageFeatures(triage_input)).policy(doc_type)
 
     return TriageDecision(
         doc_id=doc_id_override or triage_input.doc_id,
         doc_type=doc_type,
-        priority=priority,
-        severity_score=severity,
-        recommended_queue=queue,
-        required_missing_fields=missing_fields,
-        escalate=escalate,
-        escalation_reason=escalation_reason,
+        priority=policy.priority,
+        severity_score=policy.severity,
+        recommended_queue=queue_override or policy.queue,
+        required_missing_fields=list(policy.required_missing_fields),
+        escalate=policy.escalate,
+        escalation_reason=policy.escalation_reason,
         confidence=confidence,
         rationale=rationale,
         decision_trace=DecisionTrace(
@@ -98,6 +63,7 @@ def build_decision(
             retry_count=retry_count,
             elapsed_ms=elapsed_ms,
             model_name=model_name,
+            tool_stats=tool_stats or {},
         ),
     )
 
@@ -111,18 +77,20 @@ def build_fail_closed_decision(
     retry_count: int,
     elapsed_ms: int,
     failure_reason: str,
+    features: TriageFeatures | None = None,
+    tool_stats: dict[str, ToolCallStats] | None = None,
 ) -> TriageDecision:
-    doc_type = detect_doc_type(triage_input.content, triage_input.doc_type_hint)
-    missing_fields = find_required_missing_fields(doc_type=doc_type, metadata=triage_input.metadata)
-    priority, severity = infer_priority(doc_type, triage_input.customer_tier, missing_fields)
+    features = features or TriageFeatures(triage_input)
+    doc_type = features.hinted_doc_type
+    policy = features.policy(doc_type)
 
     return TriageDecision(
         doc_id=triage_input.doc_id,
         doc_type=doc_type,
-        priority=priority,
-        severity_score=severity,
-        recommended_queue=recommend_queue(doc_type),
-        required_missing_fields=missing_fields,
+        priority=policy.priority,
+        severity_score=policy.severity,
+        recommended_queue=policy.queue,
+        required_missing_fields=list(policy.required_missing_fields),
         escalate=True,
         escalation_reason=failure_reason,
         confidence=0.0,
@@ -134,9 +102,49 @@ def build_fail_closed_decision(
             retry_count=retry_count,
             elapsed_ms=elapsed_ms,
             model_name="heuristic-v1",
+            tool_stats=tool_stats or {},
         ),
     )
 
 
 def elapsed_ms_since(start: float) -> int:
-    return max(1, int((perf_counter() - start) * 1000))
\ No newline at end of file
+    return max(1, int((perf_counter() - start) * 1000))
+
+
+def elapsed_ns_since(start: float) -> int:
+    # perf_counter() and perf_counter_ns() read the same clock.
+    return max(0, perf_counter_ns() - round(start * 1_000_000_000))
+
+
+class SpanRecorder:
+    def __init__(self, start: float) -> None:
+        self.origin_ns = round(start * 1_000_000_000)
+        self.spans: list[StepSpan] = []
+
+    def record(self, name: str, begin_ns: int, duration_ns: int) -> None:
+        self.spans.append(
+            StepSpan.model_construct(
+                name=name,
+                start_ns=max(0, begin_ns - self.origin_ns),
+                duration_ns=max(0, duration_ns),
+            )
+        )
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        begin_ns = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, begin_ns, perf_counter_ns() - begin_ns)
+
+
+def stamp_elapsed(
+    decision: TriageDecision, start: float, spans: SpanRecorder | None = None
+) -> TriageDecision:
+    elapsed_ns = elapsed_ns_since(start)
+    decision.decision_trace.elapsed_ns = elapsed_ns
+    decision.decision_trace.elapsed_ms = max(1, elapsed_ns // 1_000_000)
+    if spans is not None:
+        decision.decision_trace.spans = spans.spans
+    return decision
\ No newline at end of file
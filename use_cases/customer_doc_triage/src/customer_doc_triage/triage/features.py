@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from functools import cached_property
+
+from customer_doc_triage.triage.keywords import (
+    KEYWORD_MATCHER,
+    best_doc_type_for_hits,
+    normalize_doc_type_hint,
+)
+from customer_doc_triage.triage.policies import PolicyOutcome, present_fields_mask, resolve_policy
+from customer_doc_triage.triage.schemas import DocType, TriageInput
+
+
+class TriageFeatures:
+    def __init__(self, triage_input: TriageInput) -> None:
+        self.triage_input = triage_input
+        self._present_masks: dict[DocType, int] = {}
+
+    @cached_property
+    def content_lower(self) -> str:
+        return self.triage_input.content.lower()
+
+    @cached_property
+    def keyword_hits(self) -> frozenset[str]:
+        return KEYWORD_MATCHER.scan_lowered(self.content_lower)
+
+    @cached_property
+    def metadata_keys(self) -> frozenset[str]:
+        return frozenset(self.triage_input.metadata)
+
+    @cached_property
+    def content_doc_type(self) -> DocType:
+        return best_doc_type_for_hits(self.keyword_hits)
+
+    @cached_property
+    def hinted_doc_type(self) -> DocType:
+        return normalize_doc_type_hint(self.triage_input.doc_type_hint) or self.content_doc_type
+
+    def doc_type(self, *, use_hint: bool = True) -> DocType:
+        return self.hinted_doc_type if use_hint else self.content_doc_type
+
+    def present_mask(self, doc_type: DocType) -> int:
+        mask = self._present_masks.get(doc_type)
+        if mask is None:
+            mask = present_fields_mask(doc_type, self.metadata_keys)
+            self._present_masks[doc_type] = mask
+        return mask
+
+    def policy(self, doc_type: DocType) -> PolicyOutcome:
+        customer_tier = self.triage_input.customer_tier
+        return resolve_policy(doc_type, customer_tier, self.present_mask(doc_type))
+
+    def missing_fields(self, doc_type: DocType) -> list[str]:
+        return list(self.policy(doc_type).required_missing_fields)
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from customer_doc_triage.triage.schemas import DocType
+
+DOC_TYPE_KEYWORDS: dict[DocType, tuple[str, ...]] = {
+    "incident_report": ("incident", "latency", "outage", "error rate", "request ids"),
+    "access_request": ("access", "admin", "permission", "contractor", "privileged"),
+    "security_questionnaire": ("security questionnaire", "soc2", "iso27001", "hipaa", "gdpr"),
+    "billing_dispute": ("invoice", "billing", "charge", "overage", "tax"),
+    "feature_request": ("feature request", "enhancement", "improve", "would like", "roadmap"),
+}
+
+PRIVILEGED_PLAN_TOKENS: tuple[str, ...] = ("admin", "contractor", "privileged", "regulated")
+INCIDENT_PLAN_TOKENS: tuple[str, ...] = ("incident", "latency", "outage", "error")
+RISK_TOKENS: tuple[str, ...] = (
+    "admin",
+    "privileged",
+    "contractor",
+    "outage",
+    "incident",
+    "regulated",
+)
+
+
+class KeywordMatcher:
+    def __init__(self, keywords: Iterable[str]) -> None:
+        self.keywords = frozenset(keyword.lower() for keyword in keywords if keyword)
+        # Not a single-pass matcher: the content is lowercased once, then each
+        # keyword is one str.__contains__ check, O(len(content) * keywords). With
+        # a few dozen keywords those C-level scans beat a per-character automaton
+        # walked from Python, on short and long documents alike.
+        self._keywords = tuple(sorted(self.keywords))
+
+    def scan(self, content: str) -> frozenset[str]:
+        return self.scan_lowered(content.lower())
+
+    def scan_lowered(self, content_lower: str) -> frozenset[str]:
+        return frozenset([keyword for keyword in self._keywords if keyword in content_lower])
+
+
+KEYWORD_MATCHER = KeywordMatcher(
+    [keyword for keywords in DOC_TYPE_KEYWORDS.values() for keyword in keywords]
+    + list(PRIVILEGED_PLAN_TOKENS)
+    + list(INCIDENT_PLAN_TOKENS)
+    + list(RISK_TOKENS)
+)
+
+
+def scan_keywords(content: str) -> frozenset[str]:
+    return KEYWORD_MATCHER.scan(content)
+
+
+def normalize_doc_type_hint(doc_type_hint: str | None) -> DocType | None:
+    normalized_hint = (doc_type_hint or "").strip().lower().replace(" ", "_")
+    if normalized_hint in DOC_TYPE_KEYWORDS:
+        return normalized_hint  # type: ignore[return-value]
+    return None
+
+
+_DOC_TYPE_KEYWORD_SETS: tuple[tuple[DocType, frozenset[str]], ...] = tuple(
+    (doc_type, frozenset(keywords)) for doc_type, keywords in DOC_TYPE_KEYWORDS.items()
+)
+
+
+def best_doc_type_for_hits(keyword_hits: frozenset[str]) -> DocType:
+    best_doc_type: DocType = "feature_request"
+    best_score = -1
+
+    for doc_type, keywords in _DOC_TYPE_KEYWORD_SETS:
+        score = len(keywords & keyword_hits)
+        if score > best_score:
+            best_doc_type = doc_type
+            best_score = score
+
+    return best_doc_type
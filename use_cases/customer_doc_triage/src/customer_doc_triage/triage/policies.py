@@ -1,6 +1,10 @@
 from __future__ import annotations
 
-from customer_doc_triage.triage.schemas import DocType, Priority
+from collections.abc import Collection
+from dataclasses import dataclass
+from typing import get_args
+
+from customer_doc_triage.triage.schemas import CustomerTier, DocType, Priority
 
 REQUIRED_FIELDS_BY_DOC_TYPE: dict[DocType, tuple[str, ...]] = {
     "incident_report": ("service", "region", "request_id_examples"),
@@ -18,16 +22,56 @@ QUEUE_BY_DOC_TYPE: dict[DocType, str] = {
     "feature_request": "product_feedback",
 }
 
+BASE_PRIORITY_BY_DOC_TYPE: dict[DocType, Priority] = {
+    "incident_report": "P1",
+    "access_request": "P2",
+    "security_questionnaire": "P2",
+    "billing_dispute": "P2",
+    "feature_request": "P3",
+}
+
+SEVERITY_BY_PRIORITY: dict[Priority, int] = {"P1": 5, "P2": 3, "P3": 2}
+
+
+@dataclass(frozen=True)
+class PolicyOutcome:
+    priority: Priority
+    severity: int
+    queue: str
+    required_missing_fields: tuple[str, ...]
+    escalate: bool
+    escalation_reason: str | None
+
 
 def find_required_missing_fields(doc_type: DocType, metadata: dict[str, object]) -> list[str]:
     required = REQUIRED_FIELDS_BY_DOC_TYPE[doc_type]
     return [field for field in required if field not in metadata]
 
 
+def present_fields_mask(doc_type: DocType, metadata: Collection[str]) -> int:
+    mask = 0
+    for bit, field in enumerate(REQUIRED_FIELDS_BY_DOC_TYPE[doc_type]):
+        if field in metadata:
+            mask |= 1 << bit
+    return mask
+
+
 def recommend_queue(doc_type: DocType) -> str:
     return QUEUE_BY_DOC_TYPE[doc_type]
 
 
+def infer_priority(
+    doc_type: DocType, customer_tier: str | None, missing_fields: list[str]
+) -> tuple[Priority, int]:
+    priority = BASE_PRIORITY_BY_DOC_TYPE[doc_type]
+    if customer_tier == "enterprise" and priority == "P2":
+        priority = "P1"
+    if doc_type == "incident_report" and "request_id_examples" in missing_fields:
+        priority = "P1"
+
+    return priority, SEVERITY_BY_PRIORITY[priority]
+
+
 def should_escalate(
     doc_type: DocType,
     customer_tier: str | None,
@@ -43,4 +87,58 @@ def should_escalate(
     if len(missing_fields) >= 2:
         return True, "Multiple required fields missing for safe automated triage"
 
-    return False, None
\ No newline at end of file
+    return False, None
+
+
+def _evaluate_policy(doc_type: DocType, customer_tier: str | None, mask: int) -> PolicyOutcome:
+    required = REQUIRED_FIELDS_BY_DOC_TYPE[doc_type]
+    missing_fields = [field for bit, field in enumerate(required) if not mask & (1 << bit)]
+    priority, severity = infer_priority(doc_type, customer_tier, missing_fields)
+    escalate, escalation_reason = should_escalate(
+        doc_type=doc_type,
+        customer_tier=customer_tier,
+        missing_fields=missing_fields,
+        priority=priority,
+    )
+    return PolicyOutcome(
+        priority=priority,
+        severity=severity,
+        queue=recommend_queue(doc_type),
+        required_missing_fields=tuple(missing_fields),
+        escalate=escalate,
+        escalation_reason=escalation_reason,
+    )
+
+
+def compile_policy_table() -> dict[tuple[DocType, str | None], tuple[PolicyOutcome, ...]]:
+    tiers: list[str | None] = [*get_args(CustomerTier), None]
+    return {
+        (doc_type, tier): tuple(
+            _evaluate_policy(doc_type, tier, mask) for mask in range(1 << len(required))
+        )
+        for doc_type, required in REQUIRED_FIELDS_BY_DOC_TYPE.items()
+        for tier in tiers
+    }
+
+
+POLICY_TABLE = compile_policy_table()
+
+
+def resolve_policy(
+    doc_type: DocType, customer_tier: str | None, present_mask: int
+) -> PolicyOutcome:
+    outcomes = POLICY_TABLE.get((doc_type, customer_tier))
+    if outcomes is None:
+        return _evaluate_policy(doc_type, customer_tier, present_mask)
+    return outcomes[present_mask]
+
+
+def resolve_policy_for(
+    doc_type: DocType, customer_tier: str | None, metadata: dict[str, object]
+) -> PolicyOutcome:
+    return resolve_policy(doc_type, customer_tier, present_fields_mask(doc_type, metadata))
+
+
+def reload_policy_table() -> None:
+    global POLICY_TABLE
+    POLICY_TABLE = compile_policy_table()
@@ -33,6 +33,21 @@ class TriageInput(BaseModel):
     metadata: dict[str, Any] = Field(default_factory=dict)
 
 
+class ToolCallStats(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    calls: int = Field(default=0, ge=0)
+    elapsed_ms: float = Field(default=0.0, ge=0.0)
+
+
+class StepSpan(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    name: str = Field(min_length=1)
+    start_ns: int = Field(default=0, ge=0)
+    duration_ns: int = Field(default=0, ge=0)
+
+
 class DecisionTrace(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -41,7 +56,10 @@ class DecisionTrace(BaseModel):
     tool_calls: int = Field(default=0, ge=0)
     retry_count: int = Field(default=0, ge=0)
     elapsed_ms: int = Field(default=0, ge=0)
+    elapsed_ns: int = Field(default=0, ge=0)
     model_name: str | None = None
+    tool_stats: dict[str, ToolCallStats] = Field(default_factory=dict)
+    spans: list[StepSpan] = Field(default_factory=list)
 
 
 class TriageDecision(BaseModel):
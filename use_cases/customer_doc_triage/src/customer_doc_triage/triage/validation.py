@@ -1,26 +1,94 @@
 from __future__ import annotations
 
-from customer_doc_triage.triage.policies import (
-    find_required_missing_fields,
-    recommend_queue,
-    should_escalate,
-)
+import os
+import zlib
+from dataclasses import dataclass
+
+from customer_doc_triage.triage.features import TriageFeatures
 from customer_doc_triage.triage.schemas import TriageDecision, TriageInput
 
+VALIDATION_SAMPLE_RATE_ENV = "TRIAGE_VALIDATION_SAMPLE_RATE"
+FORCE_VALIDATION_ENV = "TRIAGE_FORCE_VALIDATION"
+
+
+@dataclass
+class ValidationSampling:
+    sample_rate: float = 0.05
+    force: bool = False
+
+
+_sampling: ValidationSampling | None = None
+
+
+def _check_sample_rate(sample_rate: float, source: str) -> float:
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError(f"{source} must be between 0.0 and 1.0, got {sample_rate!r}")
+    return sample_rate
+
+
+def _sampling_from_env() -> ValidationSampling:
+    raw_rate = os.environ.get(VALIDATION_SAMPLE_RATE_ENV, "0.05")
+    try:
+        sample_rate = float(raw_rate)
+    except ValueError:
+        raise ValueError(
+            f"{VALIDATION_SAMPLE_RATE_ENV} must be a number between 0.0 and 1.0, got {raw_rate!r}"
+        ) from None
+    return ValidationSampling(
+        sample_rate=_check_sample_rate(sample_rate, VALIDATION_SAMPLE_RATE_ENV),
+        force=os.environ.get(FORCE_VALIDATION_ENV, "").lower() in {"1", "true", "yes"},
+    )
 
-def validate_triage_decision(triage_input: TriageInput, decision: TriageDecision) -> list[str]:
+
+def _current_sampling() -> ValidationSampling:
+    # Read the environment on first use rather than at import, so a bad value
+    # fails where sampling is configured instead of on any package import.
+    global _sampling
+    if _sampling is None:
+        _sampling = _sampling_from_env()
+    return _sampling
+
+
+def configure_validation_sampling(
+    *, sample_rate: float | None = None, force: bool | None = None
+) -> ValidationSampling:
+    sampling = _current_sampling()
+    if sample_rate is not None:
+        sampling.sample_rate = _check_sample_rate(sample_rate, "sample_rate")
+    if force is not None:
+        sampling.force = force
+    return ValidationSampling(sample_rate=sampling.sample_rate, force=sampling.force)
+
+
+def requires_validation(doc_id: str) -> bool:
+    sampling = _current_sampling()
+    if sampling.force or sampling.sample_rate >= 1.0:
+        return True
+    if sampling.sample_rate <= 0.0:
+        return False
+    # Hash the doc_id rather than drawing randomly so replays sample the same cases.
+    return zlib.crc32(doc_id.encode("utf-8")) / 0x1_0000_0000 < sampling.sample_rate
+
+
+def validate_triage_decision(
+    triage_input: TriageInput,
+    decision: TriageDecision,
+    features: TriageFeatures | None = None,
+) -> list[str]:
     violations: list[str] = []
 
     if triage_input.doc_id != decision.doc_id:
         violations.append("doc_id mismatch between input and decision")
 
-    expected_queue = recommend_queue(decision.doc_type)
+    policy = (features or TriageFeatures(triage_input)).policy(decision.doc_type)
+
+    expected_queue = policy.queue
     if decision.recommended_queue != expected_queue:
         violations.append(
             f"recommended_queue mismatch: expected={expected_queue} got={decision.recommended_queue}"
         )
 
-    expected_missing = set(find_required_missing_fields(decision.doc_type, triage_input.metadata))
+    expected_missing = set(policy.required_missing_fields)
     actual_missing = set(decision.required_missing_fields)
     if expected_missing != actual_missing:
         violations.append(
@@ -28,15 +96,9 @@ def validate_triage_decision(triage_input: TriageInput, decision: TriageDecision
             f"expected={sorted(expected_missing)} got={sorted(actual_missing)}"
         )
 
-    should_escalate_flag, escalation_reason = should_escalate(
-        doc_type=decision.doc_type,
-        customer_tier=triage_input.customer_tier,
-        missing_fields=decision.required_missing_fields,
-        priority=decision.priority,
-    )
-    if should_escalate_flag and not decision.escalate:
+    if policy.escalate and not decision.escalate:
         violations.append("decision must escalate per policy")
-    if should_escalate_flag and decision.escalation_reason != escalation_reason:
+    if policy.escalate and decision.escalation_reason != policy.escalation_reason:
         violations.append("escalation_reason mismatch with policy")
 
     return violations
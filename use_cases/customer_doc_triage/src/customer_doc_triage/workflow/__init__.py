@@ -1,3 +1,3 @@
-from customer_doc_triage.workflow.pipeline import run_workflow
+from customer_doc_triage.workflow.pipeline import arun_workflow, run_workflow
 
-__all__ = ["run_workflow"]
+__all__ = ["arun_workflow", "run_workflow"]